@@ -1,8 +1,25 @@
 from __future__ import annotations
 
+import functools
+import heapq
+import itertools
 import json
+import math
 import os
 import random
+import re
+import struct
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict, deque
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsional; recommender jatuh ke Python murni
+    np = None
 
 
 class Song:
@@ -31,6 +48,10 @@ class Node:
         self.song = song
         self.prev = None
         self.next = None
+        # True setelah node dilepas dari list; prev/next tetap menunjuk ke
+        # tetangga lamanya supaya cursor yang masih memegang node ini bisa lanjut.
+        self.removed = False
+        self.seq = 0  # nomor urut saat ditambahkan (naik terus), anchor cursor halaman
 
 
 class DoublyLinkedList:
@@ -38,9 +59,19 @@ class DoublyLinkedList:
         self.head = None
         self.tail = None
         self.size = 0
+        self._nodes = {}  # song id -> node pertama dengan id tsb (lookup O(1))
+        # seq -> node (urut, termasuk node terhapus sampai dipadatkan) untuk page()
+        self._next_seq = 0
+        self._seqs = []
+        self._seq_nodes = []
+        self._tombstones = 0
 
     def add(self, song: Song):
         new_node = Node(song)
+        new_node.seq = self._next_seq
+        self._next_seq += 1
+        self._seqs.append(new_node.seq)
+        self._seq_nodes.append(new_node)
         if self.head is None:
             self.head = self.tail = new_node
         else:
@@ -48,35 +79,101 @@ class DoublyLinkedList:
             new_node.prev = self.tail
             self.tail = new_node
         self.size += 1
+        self._nodes.setdefault(song.id, new_node)
         return True
 
     def delete(self, song_id):
-        current = self.head
-        while current:
-            if current.song.id == song_id:
-                if current.prev:
-                    current.prev.next = current.next
-                else:
-                    self.head = current.next
-                if current.next:
-                    current.next.prev = current.prev
-                else:
-                    self.tail = current.prev
-                self.size -= 1
-                return True
-            current = current.next
-        return False
+        current = self._nodes.pop(song_id, None)
+        if current is None:
+            return False
+        if current.prev:
+            current.prev.next = current.next
+        else:
+            self.head = current.next
+        if current.next:
+            current.next.prev = current.prev
+        else:
+            self.tail = current.prev
+        current.removed = True
+        self.size -= 1
+        self._tombstones += 1
+        if self._tombstones > 1024 and self._tombstones > self.size:
+            self._compact_seqs()
+
+        # list berisi id ganda (jarang): daftarkan kemunculan berikutnya
+        if self.size > len(self._nodes):
+            node = current.next
+            while node:
+                if node.song.id == song_id:
+                    self._nodes[song_id] = node
+                    break
+                node = node.next
+        return True
 
     def search(self, keyword):
-        results = []
-        current = self.head
+        return list(self.iter_search(keyword))
+
+    @staticmethod
+    def matcher(keyword):
+        """Predikat search() (judul/artis/genre mengandung keyword), untuk page(match=...)."""
         keyword = keyword.lower()
+        return lambda s: (keyword in (s.title or '').lower() or keyword in (s.artist or '').lower()
+                          or keyword in (s.genre or '').lower())
+
+    def iter_search(self, keyword):
+        """Seperti search(), tapi yield hasil satu per satu (untuk output streaming)."""
+        current = self.head
+        match = self.matcher(keyword)
         while current:
-            s = current.song
-            if (keyword in (s.title or '').lower() or keyword in (s.artist or '').lower() or keyword in (s.genre or '').lower()):
-                results.append(s)
+            if match(current.song):
+                yield current.song
             current = current.next
-        return results
+
+    #  cursor pagination
+    def _compact_seqs(self):
+        live = [node for node in self._seq_nodes if not node.removed]
+        self._seq_nodes = live
+        self._seqs = [node.seq for node in live]
+        self._tombstones = 0
+
+    def _node_after(self, seq):
+        """Node hidup pertama yang ditambahkan setelah seq, O(log n)."""
+        i = bisect_right(self._seqs, seq)
+        nodes = self._seq_nodes
+        while i < len(nodes) and nodes[i].removed:
+            i += 1
+        return nodes[i] if i < len(nodes) else None
+
+    def page(self, cursor=None, limit=50, match=None, max_scan=None):
+        """Satu halaman lagu mulai setelah cursor -> (songs, next_cursor).
+
+        Cursor menunjuk posisi (urutan tambah) lagu terakhir yang sudah dilihat,
+        jadi halaman tetap stabil walau ada insert/delete di antara request:
+        lagu baru muncul di halaman belakang, lagu yang dihapus dilewati, dan
+        lagu yang menjadi anchor boleh ikut dihapus. match(song) untuk filter
+        (mis. search); max_scan membatasi jumlah node yang diperiksa per
+        halaman (hasil bisa kurang dari limit, lanjutkan dengan next_cursor).
+        next_cursor None berarti sudah habis.
+        """
+        if cursor in (None, ""):
+            node = self.head
+        else:
+            try:
+                node = self._node_after(int(cursor))
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid cursor {cursor!r}")
+        songs = []
+        last = None
+        scanned = 0
+        while node is not None and len(songs) < limit:
+            if max_scan is not None and scanned >= max_scan:
+                break
+            if match is None or match(node.song):
+                songs.append(node.song)
+            last = node
+            scanned += 1
+            node = node.next
+        return songs, (str(last.seq) if node is not None and last is not None else None)
 
     def get_all(self):
         songs = []
@@ -86,27 +183,1040 @@ class DoublyLinkedList:
             current = current.next
         return songs
 
-    def find_by_id(self, song_id):
+    #  lazy views (tanpa menyalin seluruh list)
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
         current = self.head
         while current:
-            if current.song.id == song_id:
-                return current.song
+            yield current.song
             current = current.next
+
+    def __reversed__(self):
+        current = self.tail
+        while current:
+            yield current.song
+            current = current.prev
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1, -1):
+                raise ValueError("DoublyLinkedList slices only support step 1 or -1")
+            if key.step == -1:
+                # dll[::-1] -> reversed view; start/stop dihitung dari tail
+                return ListView(self, key.start or 0, key.stop, reverse=True)
+            return ListView(self, key.start or 0, key.stop)
+        node = self._node_at(key)
+        if node is None:
+            raise IndexError("DoublyLinkedList index out of range")
+        return node.song
+
+    def view(self, start=0, stop=None, reverse=False):
+        """Jendela lazy [start:stop] (dihitung dari tail jika reverse=True)."""
+        return ListView(self, start, stop, reverse)
+
+    def _node_at(self, index, from_tail=False):
+        """Node ke-index; jalan dari ujung yang lebih dekat."""
+        n = self.size
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            return None
+        if from_tail:
+            index = n - 1 - index
+        if index <= n // 2:
+            node = self.head
+            for _ in range(index):
+                node = node.next
+        else:
+            node = self.tail
+            for _ in range(n - 1 - index):
+                node = node.prev
+        return node
+
+    def find_by_id(self, song_id):
+        node = self._nodes.get(song_id)
+        return node.song if node else None
+
+    def find_node(self, song_id):
+        return self._nodes.get(song_id)
+
+
+class ListView:
+    """Window view over a DoublyLinkedList that walks nodes on demand.
+
+    Nothing is copied; the bounds are resolved against the list's current
+    size each time the view is iterated.
+    """
+    def __init__(self, dll, start=0, stop=None, reverse=False):
+        self.dll = dll
+        self.start = start
+        self.stop = stop
+        self.reverse = reverse
+
+    def _bounds(self):
+        start, stop, _ = slice(self.start, self.stop).indices(self.dll.size)
+        return start, max(start, stop)
+
+    def __len__(self):
+        start, stop = self._bounds()
+        return stop - start
+
+    def __iter__(self):
+        start, stop = self._bounds()
+        node = self.dll._node_at(start, from_tail=self.reverse)
+        count = stop - start
+        while node is not None and count > 0:
+            if not node.removed:
+                yield node.song
+                count -= 1
+            node = node.prev if self.reverse else node.next
+
+    def __getitem__(self, index):
+        start, stop = self._bounds()
+        if index < 0:
+            index += stop - start
+        if index < 0 or start + index >= stop:
+            raise IndexError("ListView index out of range")
+        return self.dll._node_at(start + index, from_tail=self.reverse).song
+
+
+class SkipNode(Node):
+    """Node IndexableSkipList. prev/next tetap = level 0; link/width/back per level."""
+    def __init__(self, song, height):
+        # sama dengan Node.__init__, ditulis langsung karena dibuat per lagu saat load
+        self.song = song
+        self.prev = None
+        self.next = None
+        self.removed = False
+        self.seq = 0
+        self.link = [None] * height   # node berikutnya di tiap level (None = akhir list)
+        self.width = [0] * height     # jarak (jumlah node) ke link[level]
+        self.back = [None] * height   # node sebelumnya di tiap level (untuk index_of)
+
+
+class IndexableSkipList(DoublyLinkedList):
+    """List berposisi untuk playlist: skip list dengan lebar tiap pointer.
+
+    insert/move/remove_at/get/index_of rata-rata O(log n), jadi menyisipkan,
+    memindah atau lompat ke lagu ke-4000 di playlist panjang tidak perlu
+    berjalan node per node. Node level 0 tetap tersambung lewat prev/next
+    seperti DoublyLinkedList, sehingga iterasi, ListView, PlaybackCursor dan
+    ShuffleOrder berlaku tanpa perubahan. Lagu yang dipindah tetap memakai
+    node yang sama (cursor pemutaran ikut ke posisi barunya).
+    """
+    MAX_LEVEL = 16
+
+    def __init__(self, songs=(), seed=None):
+        super().__init__()
+        self._rng = random.Random(seed)
+        # head sentinel di posisi -1; width ke None = jarak ke akhir list (size - posisi)
+        self._head = SkipNode(None, self.MAX_LEVEL)
+        self._head.width[0] = 1
+        self._levels = 1
+        self._by_seq = {}  # seq -> node (termasuk yang terhapus sampai dipadatkan), anchor page()
+        self.version = 0   # naik setiap isi/urutan berubah (cache turunan, mis. IdBitmap)
+        self._bitmap = None
+        self.extend(songs)
+
+    def _random_height(self):
+        # P = 1/4: tiap pasang bit nol terbawah menaikkan satu level
+        bits = self._rng.getrandbits(2 * self.MAX_LEVEL) | (1 << (2 * self.MAX_LEVEL - 2))
+        return ((bits & -bits).bit_length() + 1) // 2
+
+    def _path(self, index):
+        """Node terakhir sebelum posisi index di tiap level, beserta posisinya."""
+        chain = [None] * self._levels
+        positions = [0] * self._levels
+        node, pos = self._head, -1
+        for level in range(self._levels - 1, -1, -1):
+            while pos + node.width[level] < index:
+                pos += node.width[level]
+                node = node.link[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def _link(self, index, node):
+        height = len(node.link)
+        if height > self._levels:
+            for level in range(self._levels, height):
+                self._head.link[level] = None
+                self._head.width[level] = self.size + 1
+            self._levels = height
+        chain, positions = self._path(index)
+        for level in range(self._levels):
+            prev = chain[level]
+            if level < height:
+                nxt = prev.link[level]
+                node.link[level] = nxt
+                node.width[level] = positions[level] + prev.width[level] + 1 - index
+                node.back[level] = prev
+                if nxt is not None:
+                    nxt.back[level] = node
+                prev.link[level] = node
+                prev.width[level] = index - positions[level]
+            else:
+                prev.width[level] += 1
+        node.prev = chain[0] if chain[0] is not self._head else None
+        node.next = node.link[0]
+        if node.prev is None:
+            self.head = node
+        else:
+            node.prev.next = node
+        if node.next is None:
+            self.tail = node
+        else:
+            node.next.prev = node
+        node.removed = False
+        self.size += 1
+        self.version += 1
+
+    def _unlink(self, index):
+        chain, _ = self._path(index)
+        node = chain[0].link[0]
+        height = len(node.link)
+        for level in range(self._levels):
+            prev = chain[level]
+            if level < height:
+                nxt = node.link[level]
+                prev.link[level] = nxt
+                prev.width[level] += node.width[level] - 1
+                if nxt is not None:
+                    nxt.back[level] = prev
+            else:
+                prev.width[level] -= 1
+        while self._levels > 1 and self._head.link[self._levels - 1] is None:
+            self._levels -= 1
+        # prev/next lama dibiarkan supaya cursor yang memegang node ini bisa lanjut
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.removed = True
+        self.size -= 1
+        self.version += 1
+        return node
+
+    def _rank(self, node):
+        """Posisi node hidup: naik lewat back pointer, jumlahkan lebarnya."""
+        rank = -1
+        while node is not self._head:
+            level = len(node.link) - 1
+            prev = node.back[level]
+            rank += prev.width[level]
+            node = prev
+        return rank
+
+    def _index(self, index, size):
+        if index < 0:
+            index += size
+        if index < 0 or index >= size:
+            raise IndexError("playlist index out of range")
+        return index
+
+    def _node_at(self, index, from_tail=False):
+        n = self.size
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            return None
+        if from_tail:
+            index = n - 1 - index
+        node, pos = self._head, -1
+        for level in range(self._levels - 1, -1, -1):
+            while pos + node.width[level] <= index:
+                pos += node.width[level]
+                node = node.link[level]
+        return node
+
+    def _add_tombstone(self):
+        self._tombstones += 1
+        if self._tombstones > 1024 and self._tombstones > self.size:
+            self._by_seq = {seq: n for seq, n in self._by_seq.items() if not n.removed}
+            self._tombstones = 0
+
+    #  operasi berposisi
+    def insert(self, index, song: Song):
+        """Sisipkan lagu sebelum posisi index (seperti list.insert, boleh negatif)."""
+        n = self.size
+        if index < 0:
+            index = max(0, index + n)
+        index = min(index, n)
+        node = SkipNode(song, self._random_height())
+        node.seq = self._next_seq
+        self._next_seq += 1
+        self._by_seq[node.seq] = node
+        self._link(index, node)
+        self._nodes.setdefault(song.id, node)
+        return True
+
+    def add(self, song: Song):
+        return self.insert(self.size, song)
+
+    def extend(self, songs):
+        """Tambah banyak lagu di akhir sekaligus, O(1) per lagu (untuk load playlist)."""
+        top = self.MAX_LEVEL
+        chain, positions = self._path(self.size)
+        chain += [self._head] * (top - self._levels)
+        positions += [-1] * (top - self._levels)
+        levels = self._levels
+        tail = self.tail
+        for song in songs:
+            height = self._random_height()
+            node = SkipNode(song, height)
+            node.seq = self._next_seq
+            self._next_seq += 1
+            self._by_seq[node.seq] = node
+            pos = self.size
+            for level in range(height):
+                prev = chain[level]
+                prev.link[level] = node
+                prev.width[level] = pos - positions[level]
+                node.back[level] = prev
+                chain[level] = node
+                positions[level] = pos
+            if height > levels:
+                levels = height
+            node.prev = tail
+            if tail is None:
+                self.head = node
+            else:
+                tail.next = node
+            tail = node
+            self.size += 1
+            self._nodes.setdefault(song.id, node)
+        self.tail = tail
+        for level in range(levels):
+            chain[level].link[level] = None
+            chain[level].width[level] = self.size - positions[level]
+        self._levels = levels
+        self.version += 1
+
+    def id_bitmap(self):
+        """IdBitmap isi playlist; dibangun ulang hanya kalau playlist berubah."""
+        cached = self._bitmap
+        if cached is None or cached[0] != self.version:
+            cached = self._bitmap = (self.version, IdBitmap.from_ids(song.id for song in self))
+        return cached[1]
+
+    def get(self, index):
+        return self._node_at(self._index(index, self.size)).song
+
+    def index_of(self, song_id):
+        """Posisi lagu dengan id tsb, atau None."""
+        node = self._nodes.get(song_id)
+        return self._rank(node) if node is not None else None
+
+    def remove_at(self, index):
+        node = self._unlink(self._index(index, self.size))
+        self._forget_id(node)
+        self._add_tombstone()
+        return node.song
+
+    def move(self, src, dst):
+        """Pindahkan lagu di posisi src ke posisi dst (dst = posisi setelah dipindah)."""
+        src = self._index(src, self.size)
+        dst = self._index(dst, self.size)
+        if src == dst:
+            return self._node_at(src).song
+        node = self._unlink(src)
+        self._link(dst, node)
+        return node.song
+
+    def delete(self, song_id):
+        node = self._nodes.get(song_id)
+        if node is None:
+            return False
+        self._unlink(self._rank(node))
+        self._forget_id(node)
+        self._add_tombstone()
+        return True
+
+    def _forget_id(self, node):
+        song_id = node.song.id
+        if self._nodes.get(song_id) is not node:
+            return
+        del self._nodes[song_id]
+        # list berisi id ganda (jarang): daftarkan kemunculan lain
+        if self.size > len(self._nodes):
+            for other in self._by_seq.values():
+                if not other.removed and other.song.id == song_id:
+                    self._nodes[song_id] = other
+                    break
+
+    def page(self, cursor=None, limit=50, match=None, max_scan=None):
+        """Seperti DoublyLinkedList.page(), dengan cursor = node terakhir yang dilihat.
+
+        Lanjut dari posisi node itu sekarang: lagu yang disisipkan/dipindah ke
+        depan cursor tidak muncul lagi, yang ke belakang ikut terbaca. Anchor
+        yang dihapus dilewati lewat pointer lamanya; setelah tombstone
+        dipadatkan cursor lama dianggap tidak valid.
+        """
+        if cursor in (None, ""):
+            node = self.head
+        else:
+            try:
+                anchor = self._by_seq[int(cursor)]
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"invalid cursor {cursor!r}")
+            node = anchor.next
+            while node is not None and node.removed:
+                node = node.next
+        songs = []
+        last = None
+        scanned = 0
+        while node is not None and len(songs) < limit:
+            if max_scan is not None and scanned >= max_scan:
+                break
+            if match is None or match(node.song):
+                songs.append(node.song)
+            last = node
+            scanned += 1
+            node = node.next
+        return songs, (str(last.seq) if node is not None and last is not None else None)
+
+
+class PlaybackCursor:
+    """Pointer ke node lagu yang sedang aktif di list (library/playlist).
+
+    next/prev cukup mengikuti node.next / node.prev (O(1)). Kalau node yang
+    dipegang ikut terhapus, pointer lamanya masih menunjuk ke tetangga,
+    jadi cursor tetap bisa lanjut dari posisi itu.
+    """
+    def __init__(self):
+        self.dll = None
+        self.node = None
+        self.reverse = False  # True jika list ditampilkan terbalik ("desc")
+
+    def seek(self, dll, song_id, reverse=False):
+        self.dll = dll
+        self.reverse = reverse
+        self.node = dll.find_node(song_id) if dll is not None else None
+        return self.node is not None
+
+    def is_at(self, dll, song):
+        return self.node is not None and self.dll is dll and self.node.song is song
+
+    def step(self, forward=True, wrap=False):
+        """Geser cursor satu lagu sesuai urutan tampilan. wrap=True untuk repeat-all."""
+        if self.node is None:
+            return None
+        towards_tail = forward != self.reverse
+        node = self.node.next if towards_tail else self.node.prev
+        while node is not None and node.removed:
+            node = node.next if towards_tail else node.prev
+        if node is None and wrap:
+            node = self.dll.head if towards_tail else self.dll.tail
+        if node is None:
+            return None
+        self.node = node
+        return node.song
+
+
+def decade_of(year):
+    """1994 / "1994" / "1990s" -> 1990; None kalau kosong/tidak valid."""
+    try:
+        return int(str(year).strip().rstrip("s")) // 10 * 10
+    except (TypeError, ValueError):
+        return None
+
+
+def duration_seconds(duration):
+    """"3:45" / "1:02:03" -> detik (int); None kalau kosong/tidak valid."""
+    try:
+        seconds = 0
+        for part in (duration or "").strip().split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds if duration else None
+    except (ValueError, AttributeError):
         return None
 
 
+def collate_text(value):
+    """Collation key teks: case-insensitive dan tanpa aksen ("Beyoncé" == "beyonce").
+    Nilai kosong diurutkan paling akhir."""
+    if not value:
+        return (1, "")
+    text = str(value).strip()
+    if text.isascii():
+        return (0, text.casefold())
+    text = unicodedata.normalize("NFKD", text)
+    return (0, "".join(ch for ch in text if not unicodedata.combining(ch)).casefold())
+
+
+def collate_number(value):
+    try:
+        return (0, int(value))
+    except (TypeError, ValueError):
+        return (1, 0)  # kosong / bukan angka -> paling akhir
+
+
+class SortedIndex:
+    """Index terurut (collation key, id) untuk satu field, berbasis bisect.
+
+    add() hanya menaruh lagu di buffer; key dihitung dan buffer digabung saat
+    query berikutnya (insort kalau sedikit, sort sekali kalau banyak, mis.
+    setelah load library). Listing terurut dan range query O(log n + k).
+    """
+    SMALL_MERGE = 64
+
+    def __init__(self, value_fn, collate):
+        self.value_fn = value_fn  # song -> nilai mentah
+        self.collate = collate    # nilai mentah -> key yang bisa dibandingkan
+        self.entries = []         # [(key, id)] terurut
+        self._pending = {}        # id -> song yang belum masuk entries
+        self._keys = {}           # id -> key, untuk hapus O(log n)
+        self._merge_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys) + len(self._pending)
+
+    def key(self, song):
+        return self.collate(self.value_fn(song))
+
+    def add(self, song):
+        if song.id not in self._keys:
+            self._pending.setdefault(song.id, song)
+
+    def discard(self, song):
+        if self._pending.pop(song.id, None) is not None:
+            return True
+        key = self._keys.pop(song.id, None)
+        if key is None:
+            return False
+        i = bisect_left(self.entries, (key, song.id))
+        if i < len(self.entries) and self.entries[i] == (key, song.id):
+            del self.entries[i]
+        return True
+
+    def _merge(self):
+        # query berjalan di bawah read lock (bisa paralel): selalu lewat lock supaya
+        # tidak ada yang membaca entries saat thread lain sedang menggabung buffer
+        with self._merge_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            new = []
+            for song_id, song in pending.items():
+                key = self.key(song)
+                self._keys[song_id] = key
+                new.append((key, song_id))
+            if len(new) <= self.SMALL_MERGE:
+                for entry in new:
+                    insort(self.entries, entry)
+            else:
+                self.entries.extend(new)
+                self.entries.sort()
+
+    def ids(self, start=0, stop=None, reverse=False):
+        """Id lagu urutan ke-start..stop (dari belakang kalau reverse)."""
+        self._merge()
+        n = len(self.entries)
+        stop = n if stop is None else min(stop, n)
+        if reverse:
+            return [self.entries[n - 1 - i][1] for i in range(start, stop)]
+        return [song_id for _key, song_id in self.entries[start:stop]]
+
+    def range_bounds(self, lo=None, hi=None):
+        """(i, j) posisi entry dengan lo <= nilai <= hi (nilai mentah, di-collate dulu)."""
+        self._merge()
+        i = 0 if lo is None else bisect_left(self.entries, (self.collate(lo),))
+        j = len(self.entries) if hi is None else bisect_right(self.entries, (self.collate(hi), math.inf))
+        return i, max(i, j)
+
+
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(x):
+        """Jumlah bit 1 di int >= 0 (int.bit_count baru ada di Python 3.10)."""
+        return bin(x).count("1")
+
+
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+class IdBitmap:
+    """Himpunan id lagu (int >= 0) sebagai bitset di atas int Python.
+
+    &, |, - dan ^ dikerjakan word per word di C oleh int (linear terhadap
+    panjang bitmap, tanpa loop Python per id). from_ids() dan ids() memakai
+    numpy kalau tersedia.
+    """
+    __slots__ = ("bits",)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, ids):
+        if np is not None:
+            arr = np.fromiter(ids, dtype=np.int64)
+            if not len(arr):
+                return cls()
+            flags = np.zeros(int(arr.max()) + 1, dtype=np.uint8)
+            flags[arr] = 1
+            return cls(int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little"))
+        buf = bytearray()
+        for song_id in ids:
+            byte = song_id >> 3
+            if byte >= len(buf):
+                buf.extend(bytes(byte + 1 - len(buf)))
+            buf[byte] |= 1 << (song_id & 7)
+        return cls(int.from_bytes(buf, "little"))
+
+    def _bytes(self):
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    CHUNK_BYTES = 1024
+
+    def ids(self, start=0, stop=None):
+        """Id di bitmap urut naik, potongan [start:stop].
+
+        Chunk yang seluruhnya sebelum start dilewati lewat popcount, jadi satu
+        halaman dari bitmap besar tidak perlu mendekode semua id.
+        """
+        if not self.bits or (stop is not None and 0 <= stop <= start):
+            return []
+        data = self._bytes()
+        if np is not None or start < 0 or (stop is not None and stop < 0):
+            return self._decode(data, 0)[start:stop]
+        want = None if stop is None else stop - start
+        out = []
+        step = self.CHUNK_BYTES
+        for offset in range(0, len(data), step):
+            chunk = data[offset:offset + step]
+            if start:
+                count = popcount(int.from_bytes(chunk, "little"))
+                if count <= start:
+                    start -= count
+                    continue
+            out.extend(self._decode(chunk, offset << 3)[start:])
+            start = 0
+            if want is not None and len(out) >= want:
+                break
+        return out if want is None else out[:want]
+
+    @staticmethod
+    def _decode(data, base):
+        if np is not None:
+            return (np.flatnonzero(np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little"))
+                    + base).tolist()
+        out = []
+        for i, byte in enumerate(data):
+            if byte:
+                first = base + (i << 3)
+                out.extend([first + bit for bit in _BYTE_BITS[byte]])
+        return out
+
+    def pick(self, songs):
+        """Lagu dari songs yang id-nya ada di bitmap, masing-masing sekali, urutan songs dipertahankan."""
+        mask = bytearray(self._bytes())
+        size = len(mask)
+        out = []
+        for song in songs:
+            song_id = song.id
+            byte, bit = song_id >> 3, 1 << (song_id & 7)
+            if byte < size and mask[byte] & bit:
+                mask[byte] &= ~bit
+                out.append(song)
+        return out
+
+    def __contains__(self, song_id):
+        return song_id >= 0 and bool(self.bits >> song_id & 1)
+
+    def __len__(self):
+        return popcount(self.bits)
+
+    def __bool__(self):
+        return bool(self.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, IdBitmap) and self.bits == other.bits
+
+    __hash__ = None
+
+    def __and__(self, other):
+        return IdBitmap(self.bits & other.bits)
+
+    def __or__(self, other):
+        return IdBitmap(self.bits | other.bits)
+
+    def __sub__(self, other):
+        return IdBitmap(self.bits & ~other.bits)
+
+    def __xor__(self, other):
+        return IdBitmap(self.bits ^ other.bits)
+
+    def __repr__(self):
+        return f"IdBitmap({len(self)} ids)"
+
+
+class BitmapIndex:
+    """Index facet (genre/artist/decade/favorit): key -> himpunan id lagu.
+
+    Key yang jarang disimpan sebagai set id; begitu lebih padat dari 1 per
+    DENSE_RATIO id dipromosikan ke bitmap bytearray (1 bit per id, diubah di
+    tempat), seperti container array/bitmap di Roaring. add/discard O(1),
+    jumlah lagu per key dijaga di counts, dan bitmap(key) memberi IdBitmap
+    (di-cache sampai key itu berubah) untuk AND/OR antar facet.
+    """
+    DENSE_RATIO = 256
+
+    def __init__(self):
+        self.containers = {}  # key -> set id | bytearray bitmap
+        self.counts = {}      # key -> jumlah lagu
+        self.labels = {}      # key -> label asli pertama (untuk tampilan)
+        self._max_id = 0
+        self._cache = {}      # key -> IdBitmap
+
+    def __len__(self):
+        return len(self.containers)
+
+    def add(self, song_id, key, label=None):
+        if key is None or key == "" or not isinstance(song_id, int) or song_id < 0:
+            return False
+        box = self.containers.get(key)
+        if type(box) is bytearray:
+            byte, bit = song_id >> 3, 1 << (song_id & 7)
+            if byte >= len(box):
+                box.extend(bytes(byte + 1 - len(box)))
+            elif box[byte] & bit:
+                return False
+            box[byte] |= bit
+        elif box is None:
+            self.containers[key] = {song_id}
+            self.counts[key] = 0
+            self.labels[key] = key if label is None else label
+        elif song_id in box:
+            return False
+        else:
+            box.add(song_id)
+            if len(box) >= 32 and len(box) * self.DENSE_RATIO > self._max_id:
+                self.containers[key] = bytearray(IdBitmap.from_ids(box)._bytes())
+        if song_id > self._max_id:
+            self._max_id = song_id
+        self.counts[key] += 1
+        if self._cache:
+            self._cache.pop(key, None)
+        return True
+
+    def discard(self, song_id, key):
+        box = self.containers.get(key)
+        if box is None:
+            return False
+        if type(box) is set:
+            if song_id not in box:
+                return False
+            box.discard(song_id)
+        else:
+            byte, bit = song_id >> 3, 1 << (song_id & 7)
+            if byte >= len(box) or not box[byte] & bit:
+                return False
+            box[byte] &= ~bit
+        self.counts[key] -= 1
+        self._cache.pop(key, None)
+        if not self.counts[key]:
+            del self.containers[key], self.counts[key], self.labels[key]
+        return True
+
+    def bitmap(self, key):
+        cached = self._cache.get(key)
+        if cached is None:
+            box = self.containers.get(key)
+            if box is None:
+                return IdBitmap()
+            cached = IdBitmap.from_ids(box) if type(box) is set else IdBitmap(int.from_bytes(box, "little"))
+            self._cache[key] = cached
+        return cached
+
+    def union(self, keys):
+        result = IdBitmap()
+        for key in keys:
+            result = result | self.bitmap(key)
+        return result
+
+    def counts_within(self, matched):
+        """Jumlah lagu per key yang juga ada di matched (IdBitmap), lewat popcount AND."""
+        bits = matched.bits
+        counts = {}
+        for key in self.containers:
+            n = popcount(self.bitmap(key).bits & bits)
+            if n:
+                counts[key] = n
+        return counts
+
+
+def edit_distance(a, b, limit):
+    """Jarak edit a-b (sisip/hapus/ganti/tukar dua huruf bersebelahan = 1), atau
+    limit + 1 kalau lebih dari limit.
+
+    Hanya diagonal selebar limit di kiri-kanan yang dihitung (sel lain pasti
+    > limit) dan berhenti begitu dua baris terakhir seluruhnya melewati limit.
+    """
+    n, m = len(a), len(b)
+    over = limit + 1
+    if abs(n - m) > limit:
+        return over
+    before = None
+    prev = [j if j <= limit else over for j in range(m + 1)]
+    prev_best = 0
+    for i in range(1, n + 1):
+        ch = a[i - 1]
+        row = [over] * (m + 1)
+        if i <= limit:
+            row[0] = i
+        best = row[0]
+        for j in range(max(1, i - limit), min(m, i + limit) + 1):
+            x = prev[j - 1] + (ch != b[j - 1])
+            y = prev[j] + 1
+            if y < x:
+                x = y
+            y = row[j - 1] + 1
+            if y < x:
+                x = y
+            if before is not None and j > 1 and ch == b[j - 2] and a[i - 2] == b[j - 1]:
+                y = before[j - 2] + 1
+                if y < x:
+                    x = y
+            if x < best:
+                best = x
+            row[j] = x if x <= limit else over
+        if best > limit and prev_best > limit:
+            return over
+        before, prev, prev_best = prev, row, best
+    return prev[m] if prev[m] <= limit else over
+
+
+class FuzzyIndex:
+    """Index kata judul/artis untuk search toleran typo ("beatels" -> "Beatles").
+
+    Kata yang berjarak edit <= k dari query pasti masih berbagi minimal
+    (#bigram query - 2k) bigram dengannya: satu edit merusak paling banyak dua
+    bigram, termasuk tukar dua huruf karena bigram dibandingkan tanpa urutan
+    ("ab" = "ba"). Bigram yang berulang diberi nomor kemunculan supaya
+    dihitung sebagai multiset. Jadi kandidat diambil dari posting bigram -> kata (per panjang
+    kata, hanya panjang n-k..n+k) dan dihitung dengan Counter, lalu hanya
+    kandidat yang lolos yang dicek dengan edit_distance() berbatas k. Kata ->
+    id lagu disimpan di BitmapIndex, jadi hasil beberapa kata digabung dengan
+    OR/AND bitmap. Kata yang tidak dipakai lagu mana pun lagi jadi tombstone di
+    posting bigram sampai dipadatkan.
+
+    Dibangun di latar (MusicPlayer.build_fuzzy_index), setelah itu dijaga per
+    tambah/hapus lagu.
+    """
+    WORD = re.compile(r"\w+")
+
+    def __init__(self):
+        self.postings = BitmapIndex()  # kata -> id lagu
+        self.grams = {}                # (panjang kata, bigram) -> [kata], bisa berisi tombstone
+        self._words = 0                # kata di posting bigram, termasuk tombstone
+        self._dead = set()             # tombstone
+
+    @classmethod
+    def tokens(cls, *texts):
+        """Kata huruf kecil; angka > 4 digit (nomor katalog, id) tidak dipakai."""
+        words = set()
+        for text in texts:
+            if text:
+                words.update(cls.WORD.findall(str(text).lower()))
+        return {word for word in words if len(word) <= 4 or not word.isdigit()}
+
+    @staticmethod
+    def bigrams(word):
+        padded = f"^{word}$"
+        seen = {}
+        grams = set()
+        for a, b in zip(padded, padded[1:]):
+            gram = a + b if a <= b else b + a
+            seen[gram] = nth = seen.get(gram, 0) + 1
+            grams.add(gram if nth == 1 else f"{gram}{nth}")  # "ab", "ab2", ...
+        return grams
+
+    @staticmethod
+    def max_distance(word, limit=2):
+        """Batas typo per kata: kata pendek dan angka harus sama persis."""
+        if len(word) <= 2 or word.isdigit():
+            return 0
+        return min(limit, 1 if len(word) <= 5 else 2)
+
+    def _add_word(self, word):
+        size = len(word)
+        for gram in self.bigrams(word):
+            self.grams.setdefault((size, gram), []).append(word)
+        self._words += 1
+
+    @staticmethod
+    def _gram_word(word):
+        """Kata yang masuk posting bigram: semua kata >= 2 huruf, terlepas dari batas
+        typo kata itu sendiri ("be" harus bisa ditemukan dari query "bee")."""
+        return len(word) >= 2
+
+    def add(self, song):
+        for word in self.tokens(song.title, song.artist):
+            # kata 1 huruf tidak terjangkau query mana pun (n - k >= 2): cukup di postings
+            if word not in self.postings.counts and self._gram_word(word):
+                if word in self._dead:
+                    self._dead.discard(word)
+                else:
+                    self._add_word(word)
+            self.postings.add(song.id, word)
+
+    def discard(self, song):
+        for word in self.tokens(song.title, song.artist):
+            if (self.postings.discard(song.id, word) and word not in self.postings.counts
+                    and self._gram_word(word)):
+                self._dead.add(word)
+        if len(self._dead) > 1024 and len(self._dead) * 2 > self._words:
+            self._compact()
+
+    def _compact(self):
+        self.grams = {}
+        self._words = 0
+        self._dead = set()
+        for word in self.postings.counts:
+            if self._gram_word(word):
+                self._add_word(word)
+
+    def similar(self, word, max_distance):
+        """[(kata, jarak)] dengan edit distance <= max_distance dari word."""
+        grams = self.bigrams(word)
+        need = len(grams) - 2 * max_distance
+        n = len(word)
+        shared = Counter()
+        for size in range(max(1, n - max_distance), n + max_distance + 1):
+            for gram in grams:
+                bucket = self.grams.get((size, gram))
+                if bucket:
+                    shared.update(bucket)
+        dead = self._dead
+        found = []
+        for candidate, count in shared.items():
+            if count >= need and candidate not in dead:
+                dist = edit_distance(word, candidate, max_distance)
+                if dist <= max_distance:
+                    found.append((candidate, dist))
+        return found
+
+    def match(self, keyword, max_distance=2):
+        """Id lagu per tingkat jarak: hasil[d] = lagu yang setiap kata keyword-nya
+        ada di judul/artis dengan jarak <= d (kumulatif, d = 0..batas terbesar)."""
+        words = self.tokens(keyword)
+        if not words:
+            return []
+        top = max(self.max_distance(word, max_distance) for word in words)
+        tiers = None
+        for word in words:
+            limit = self.max_distance(word, max_distance)
+            if limit:
+                hits = self.similar(word, limit)
+            else:
+                hits = [(word, 0)] if word in self.postings.counts else []
+            by_distance = {}
+            for hit, dist in hits:
+                by_distance.setdefault(dist, []).append(hit)
+            acc = IdBitmap()
+            cumulative = []
+            for d in range(top + 1):
+                acc = acc | self.postings.union(by_distance.get(d, ()))
+                cumulative.append(acc)
+            tiers = cumulative if tiers is None else [a & b for a, b in zip(tiers, cumulative)]
+        return tiers
+
+
+class SearchCache:
+    """LRU hasil search: query huruf kecil -> array id lagu hasil (urut library).
+
+    Dibatasi jumlah entri dan total byte (8 byte per id). Isi cache hanya
+    berlaku untuk satu generasi library: begitu MusicPlayer.generation naik
+    (lagu ditambah/dihapus) cache dikosongkan saat diakses berikutnya. Hasil
+    search substring selalu subset hasil prefix-nya, jadi query yang belum
+    ada bisa disaring dari prefix terpanjang yang ada ("beat" -> "beatl").
+    """
+    def __init__(self, max_entries=256, max_bytes=16 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # query -> array("q") id, paling lama dipakai di depan
+        self.bytes = 0
+        self.generation = None
+        # dipakai dari banyak reader sekaligus (search di bawah read lock)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _size(ids):
+        return ids.itemsize * len(ids) + 64
+
+    def _sync(self, generation):
+        if generation != self.generation:
+            self.entries.clear()
+            self.bytes = 0
+            self.generation = generation
+
+    def get(self, key, generation):
+        with self._lock:
+            self._sync(generation)
+            ids = self.entries.get(key)
+            if ids is not None:
+                self.entries.move_to_end(key)
+            return ids
+
+    def prefix(self, key, generation):
+        """Hasil di cache untuk prefix terpanjang key (tanpa key sendiri), atau None."""
+        with self._lock:
+            self._sync(generation)
+            for end in range(len(key) - 1, 0, -1):
+                ids = self.entries.get(key[:end])
+                if ids is not None:
+                    self.entries.move_to_end(key[:end])
+                    return ids
+            return None
+
+    def put(self, key, ids, generation):
+        """Simpan hasil (kalau muat) dan return sebagai array id."""
+        ids = array("q", ids)
+        size = self._size(ids)
+        with self._lock:
+            self._sync(generation)
+            if size > self.max_bytes:
+                return ids
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= self._size(old)
+            self.entries[key] = ids
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= self._size(evicted)
+        return ids
+
+
 class Queue:
     def __init__(self):
-        self.items = []
+        self.items = deque()  # popleft O(1)
+
+    def __len__(self):
+        return len(self.items)
 
     def enqueue(self, song):
         self.items.append(song)
 
+    def extend(self, songs):
+        self.items.extend(songs)
+
     def dequeue(self):
-        return self.items.pop(0) if self.items else None
+        return self.items.popleft() if self.items else None
 
     def get_all(self):
-        return self.items.copy()
+        return list(self.items)
 
 
 class Stack:
@@ -122,35 +1232,899 @@ class Stack:
         return self.items.copy()
 
 
-class MusicPlayer:
-    """Core player logic and in-memory data storage."""
+class FavoriteStore:
+    """Favorit user, urut sesuai waktu difavoritkan.
+
+    Perubahan ditulis incremental ke favorites.jsonl (satu record add/remove
+    per baris), bukan rewrite seluruh file. Saat load, log di-replay dan
+    dipadatkan kalau sudah jauh lebih panjang dari isi favorit sebenarnya.
+    """
+    def __init__(self, path="favorites.jsonl"):
+        self.path = path
+        self.songs = DoublyLinkedList()  # Song, urut waktu difavoritkan
+        self.favorited_at = {}           # song id -> timestamp
+        self._log_records = 0
+
+    def __contains__(self, song_id):
+        return song_id in self.favorited_at
+
+    def __len__(self):
+        return len(self.favorited_at)
+
+    def __iter__(self):
+        for song in self.songs:
+            yield song.id
+
+    def add(self, song: Song, ts=None):
+        if song.id in self.favorited_at:
+            return False
+        ts = time.time() if ts is None else ts
+        self.songs.add(song)
+        self.favorited_at[song.id] = ts
+        self._append({"op": "add", "id": song.id, "ts": ts})
+        return True
+
+    def discard(self, song_id):
+        if song_id not in self.favorited_at:
+            return False
+        self.songs.delete(song_id)
+        del self.favorited_at[song_id]
+        self._append({"op": "remove", "id": song_id})
+        return True
+
+    def _append(self, record):
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            self._log_records += 1
+        except Exception as e:
+            print("Failed to save favorites:", e)
+
+    def load(self, library):
+        """Replay favorites.jsonl; id yang tidak ada di library diabaikan."""
+        if not os.path.isfile(self.path):
+            return
+        entries = {}  # dict menjaga urutan add terakhir
+        records = 0
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # baris terpotong (misal app mati saat menulis)
+                    records += 1
+                    if rec.get("op") == "add":
+                        entries.pop(rec.get("id"), None)
+                        entries[rec.get("id")] = rec.get("ts")
+                    elif rec.get("op") == "remove":
+                        entries.pop(rec.get("id"), None)
+        except Exception as e:
+            print("Failed to load favorites:", e)
+            return
+
+        for song_id, ts in entries.items():
+            song = library.find_by_id(song_id)
+            if song is not None:
+                self.songs.add(song)
+                self.favorited_at[song_id] = ts
+        self._log_records = records
+        if records > 2 * len(self.favorited_at) + 100:
+            self.compact()
+
+    def compact(self):
+        """Tulis ulang log hanya dengan favorit yang masih aktif."""
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                for song in self.songs:
+                    f.write(json.dumps({"op": "add", "id": song.id, "ts": self.favorited_at[song.id]}) + "\n")
+            os.replace(tmp, self.path)
+            self._log_records = len(self.favorited_at)
+        except Exception as e:
+            print("Failed to compact favorites:", e)
+
+
+class ListeningLog:
+    """Log pemutaran append-only: (song_id, start_ts, ms_played, mode).
+
+    Record berukuran tetap (21 byte) ditulis ke segment file
+    history/segment-NNNNNN.log yang urut waktu, jadi query rentang waktu
+    cukup binary search per segment tanpa membaca seluruh log. Segment yang
+    sudah penuh disegel dan jumlah play per lagunya disimpan di
+    segment-NNNNNN.counts.json, sehingga startup hanya membaca segment aktif.
+    """
+    RECORD = struct.Struct("<qdIB")  # song_id, start_ts, ms_played, mode
+    MODES = ("library", "playlist", "view", "other")
+    CHUNK_RECORDS = 4096
+
+    def __init__(self, directory="history", segment_records=100_000):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.segments = []      # [path, first_ts, last_ts, count], urut waktu
+        self.play_counts = {}   # song id -> jumlah play
+        self.last_ts = 0.0
+
+    #  segment helpers
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"segment-{number:06d}.log")
+
+    def _counts_path(self, path):
+        return path[:-len(".log")] + ".counts.json"
+
+    def _read_record(self, f, index):
+        f.seek(index * self.RECORD.size)
+        return self.RECORD.unpack(f.read(self.RECORD.size))
+
+    def _decode(self, rec):
+        song_id, start_ts, ms_played, mode = rec
+        return song_id, start_ts, ms_played, self.MODES[mode] if mode < len(self.MODES) else "other"
+
+    def _scan_records(self, path, start=0, stop=None):
+        """Baca record [start, stop) dari satu segment per chunk."""
+        size = self.RECORD.size
+        with open(path, "rb") as f:
+            f.seek(start * size)
+            remaining = None if stop is None else stop - start
+            while remaining is None or remaining > 0:
+                n = self.CHUNK_RECORDS if remaining is None else min(self.CHUNK_RECORDS, remaining)
+                buf = f.read(n * size)
+                usable = len(buf) - len(buf) % size
+                if not usable:
+                    return
+                for rec in self.RECORD.iter_unpack(buf[:usable]):
+                    yield rec
+                if remaining is not None:
+                    remaining -= usable // size
+
+    def open(self):
+        """Muat metadata segment & play count (tanpa membaca record segment yang sudah disegel)."""
+        self.segments = []
+        self.play_counts = {}
+        if not os.path.isdir(self.directory):
+            return
+        size = self.RECORD.size
+        names = sorted(n for n in os.listdir(self.directory)
+                       if n.startswith("segment-") and n.endswith(".log"))
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                count = os.path.getsize(path) // size
+                if os.path.getsize(path) % size:
+                    # record terakhir terpotong (crash saat menulis) -> buang
+                    with open(path, "r+b") as f:
+                        f.truncate(count * size)
+                if count == 0:
+                    continue
+                with open(path, "rb") as f:
+                    first_ts = self._read_record(f, 0)[1]
+                    last_ts = self._read_record(f, count - 1)[1]
+                self.segments.append([path, first_ts, last_ts, count])
+            except Exception as e:
+                print("Failed to open history segment:", path, e)
+
+        for i, (path, _first, _last, _count) in enumerate(self.segments):
+            counts = None
+            sealed = i < len(self.segments) - 1
+            if sealed and os.path.isfile(self._counts_path(path)):
+                try:
+                    with open(self._counts_path(path), "r") as f:
+                        counts = {int(k): v for k, v in json.load(f).items()}
+                except Exception:
+                    counts = None
+            if counts is None:
+                counts = self._count_segment(path)
+                if sealed:
+                    self._write_counts(path, counts)
+            for song_id, n in counts.items():
+                self.play_counts[song_id] = self.play_counts.get(song_id, 0) + n
+        if self.segments:
+            self.last_ts = self.segments[-1][2]
+
+    def _count_segment(self, path):
+        counts = {}
+        for rec in self._scan_records(path):
+            counts[rec[0]] = counts.get(rec[0], 0) + 1
+        return counts
+
+    def _write_counts(self, path, counts):
+        try:
+            with open(self._counts_path(path), "w") as f:
+                json.dump(counts, f)
+        except Exception as e:
+            print("Failed to save history counts:", e)
+
+    #  write
+    def append(self, song_id, start_ts, ms_played=0, mode="library"):
+        return self.extend([(song_id, start_ts, ms_played, mode)]) == 1
+
+    def extend(self, records):
+        """Append banyak record (song_id, start_ts, ms_played, mode) sekaligus, buffered."""
+        written = 0
+        f = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for song_id, start_ts, ms_played, mode in records:
+                # log harus urut waktu agar binary search valid (antisipasi jam mundur)
+                start_ts = max(float(start_ts), self.last_ts)
+                ms_played = max(0, min(int(ms_played or 0), 0xFFFFFFFF))
+                mode_code = self.MODES.index(mode) if mode in self.MODES else len(self.MODES) - 1
+
+                if not self.segments or self.segments[-1][3] >= self.segment_records:
+                    if f is not None:
+                        f.close()
+                        f = None
+                    self._roll_segment(start_ts)
+                seg = self.segments[-1]
+                if f is None:
+                    f = open(seg[0], "ab")
+                f.write(self.RECORD.pack(song_id, start_ts, ms_played, mode_code))
+                seg[2] = start_ts
+                seg[3] += 1
+                self.last_ts = start_ts
+                self.play_counts[song_id] = self.play_counts.get(song_id, 0) + 1
+                written += 1
+        except Exception as e:
+            print("Failed to append history:", e)
+        finally:
+            if f is not None:
+                f.close()
+        return written
+
+    def _roll_segment(self, first_ts):
+        number = 1
+        if self.segments:
+            sealed = self.segments[-1][0]
+            self._write_counts(sealed, self._count_segment(sealed))
+            number = int(os.path.basename(sealed)[len("segment-"):-len(".log")]) + 1
+        self.segments.append([self._segment_path(number), first_ts, first_ts, 0])
+
+    #  queries
+    def __len__(self):
+        return sum(seg[3] for seg in self.segments)
+
+    def play_count(self, song_id):
+        return self.play_counts.get(song_id, 0)
+
+    def _lower_bound(self, f, count, ts):
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._read_record(f, mid)[1] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _upper_bound(self, f, count, ts):
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._read_record(f, mid)[1] <= ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def latest(self, limit, before_ts=None, skip=0):
+        """Sampai `limit` record terbaru dengan start_ts <= before_ts (semua kalau None),
+        urut dari yang terbaru; `skip` record pertama yang start_ts == before_ts dilewati
+        (sudah tampil di halaman sebelumnya). Dibaca mundur per chunk, O(log n + limit)."""
+        out = []
+        for path, first_ts, _last_ts, count in reversed(self.segments):
+            if len(out) >= limit:
+                break
+            if before_ts is not None and first_ts > before_ts:
+                continue
+            with open(path, "rb") as f:
+                hi = count if before_ts is None else self._upper_bound(f, count, before_ts)
+            while hi > 0 and len(out) < limit:
+                lo = max(0, hi - self.CHUNK_RECORDS)
+                for rec in reversed(list(self._scan_records(path, lo, hi))):
+                    if skip and rec[1] == before_ts:
+                        skip -= 1
+                        continue
+                    out.append(self._decode(rec))
+                    if len(out) >= limit:
+                        break
+                hi = lo
+        return out
+
+    def between(self, start_ts=None, end_ts=None):
+        """Yield record dengan start_ts di [start_ts, end_ts), urut waktu (streaming)."""
+        starts = [seg[1] for seg in self.segments]
+        first = 0 if start_ts is None else max(0, bisect_right(starts, start_ts) - 1)
+        for path, seg_first, seg_last, count in self.segments[first:]:
+            if end_ts is not None and seg_first >= end_ts:
+                return
+            if start_ts is not None and seg_last < start_ts:
+                continue
+            with open(path, "rb") as f:
+                lo = 0 if start_ts is None else self._lower_bound(f, count, start_ts)
+                hi = count if end_ts is None else self._lower_bound(f, count, end_ts)
+            for rec in self._scan_records(path, lo, hi):
+                yield self._decode(rec)
+
+    def tail(self, n):
+        """n record terakhir, urut waktu."""
+        out = []
+        for path, _first, _last, count in reversed(self.segments):
+            take = min(count, n - len(out))
+            out[:0] = [self._decode(rec) for rec in self._scan_records(path, count - take, count)]
+            if len(out) >= n:
+                break
+        return out
+
+    #  maintenance
+    def compact(self, keep=None, before=None):
+        """Tulis ulang log: buang record sebelum `before` atau yang keep(song_id) False,
+        lalu gabungkan ke segment penuh. Berjalan streaming."""
+        old = self.segments
+        tmp_dir = self.directory + ".compact"
+        try:
+            os.makedirs(tmp_dir, exist_ok=True)
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            new = ListeningLog(tmp_dir, self.segment_records)
+            new.extend(rec for rec in self.between(before, None) if keep is None or keep(rec[0]))
+            for path, *_rest in old:
+                os.remove(path)
+                if os.path.isfile(self._counts_path(path)):
+                    os.remove(self._counts_path(path))
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(tmp_dir):
+                os.replace(os.path.join(tmp_dir, name), os.path.join(self.directory, name))
+            os.rmdir(tmp_dir)
+        except Exception as e:
+            print("Failed to compact history:", e)
+        self.open()
+
+
+class TrendingTracker:
+    """Skor popularitas yang meluruh eksponensial + top-k yang dijaga incremental.
+
+    Skor disimpan relatif terhadap waktu referensi t0 (play di waktu t bernilai
+    e^(rate*(t - t0))), jadi skor lagu lain tidak perlu diupdate setiap ada
+    play baru; urutannya sama dengan skor yang sudah diluruhkan ke "sekarang".
+    top-k memakai min-heap berukuran ~k dengan lazy deletion: O(log k) per play.
+    """
+    def __init__(self, k=50, half_life_hours=72.0):
+        self.k = k
+        self.rate = math.log(2) / (half_life_hours * 3600.0)
+        self.t0 = None
+        self.scores = {}  # song id -> skor (skala t0)
+        self.top = {}     # song id -> skor, hanya anggota top-k
+        self.heap = []    # (skor, id); entri basi dibuang saat sampai di puncak
+
+    def record(self, song_id, ts=None):
+        ts = time.time() if ts is None else ts
+        if self.t0 is None:
+            self.t0 = ts
+        exponent = self.rate * (ts - self.t0)
+        if exponent > 50:
+            self._rebase(ts)
+            exponent = 0.0
+        score = self.scores.get(song_id, 0.0) + math.exp(exponent)
+        self.scores[song_id] = score
+        self._offer(song_id, score)
+
+    def _rebase(self, ts):
+        # cegah overflow float: geser t0 ke ts dan skalakan semua skor (jarang terjadi)
+        factor = math.exp(-self.rate * (ts - self.t0))
+        self.t0 = ts
+        self.scores = {sid: sc * factor for sid, sc in self.scores.items()}
+        self.top = {sid: self.scores[sid] for sid in self.top}
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self.heap = [(sc, sid) for sid, sc in self.top.items()]
+        heapq.heapify(self.heap)
+
+    def _prune(self):
+        heap = self.heap
+        while heap and self.top.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _offer(self, song_id, score):
+        if song_id in self.top:
+            self.top[song_id] = score
+            heapq.heappush(self.heap, (score, song_id))
+            if len(self.heap) > 2 * self.k + 16:
+                self._rebuild_heap()
+        elif len(self.top) < self.k:
+            self.top[song_id] = score
+            heapq.heappush(self.heap, (score, song_id))
+        else:
+            self._prune()
+            min_score, min_id = self.heap[0]
+            if score > min_score:
+                heapq.heapreplace(self.heap, (score, song_id))
+                del self.top[min_id]
+                self.top[song_id] = score
+
+    def discard(self, song_id):
+        self.scores.pop(song_id, None)
+        if self.top.pop(song_id, None) is None:
+            return
+        # isi slot kosong dengan kandidat terbaik di luar top-k (jarang: hanya saat delete)
+        best = heapq.nlargest(1, ((sc, sid) for sid, sc in self.scores.items() if sid not in self.top))
+        if best:
+            self.top[best[0][1]] = best[0][0]
+        self._rebuild_heap()
+
+    def top_k(self, n=None):
+        """[(song_id, skor)] urut skor tertinggi, O(k log k)."""
+        ranked = sorted(self.top.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+
+class ShuffleOrder:
+    """Shuffle tanpa pengulangan dengan Fisher-Yates inkremental.
+
+    Posisi [0, drawn) sudah diacak (urutan yang sudah/akan diputar ulang saat
+    prev), sisanya belum disentuh. Setiap next() hanya melakukan satu swap
+    acak, jadi O(1) per langkah; satu siklus selesai setelah semua lagu
+    terpilih tepat sekali.
+    """
+    def __init__(self, dll, seed=None, rng=None):
+        self.dll = dll
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.new_cycle()
+
+    def new_cycle(self, avoid_first=None):
+        # snapshot node (bukan lagu) supaya node yang dihapus bisa dilewati
+        self.nodes = list(self.dll._nodes.values())
+        self.position = {node.song.id: i for i, node in enumerate(self.nodes)}
+        self.drawn = 0
+        self.pos = 0  # jumlah lagu yang sudah dilewati; lagu aktif = nodes[pos - 1]
+        if avoid_first is not None and len(self.nodes) > 1:
+            # jangan mulai siklus baru dengan lagu yang baru saja selesai
+            i = self.position.get(avoid_first)
+            if i is not None:
+                self._swap(i, len(self.nodes) - 1)
+
+    def _swap(self, i, j):
+        nodes = self.nodes
+        nodes[i], nodes[j] = nodes[j], nodes[i]
+        self.position[nodes[i].song.id] = i
+        self.position[nodes[j].song.id] = j
+
+    def current(self):
+        return self.nodes[self.pos - 1].song if self.pos > 0 else None
+
+    def jump(self, song_id):
+        """Jadikan song_id lagu aktif (misal user klik lagu tertentu)."""
+        i = self.position.get(song_id)
+        if i is None:
+            return False
+        if i >= self.drawn:
+            self._swap(i, self.drawn)
+            self.drawn += 1
+            i = self.drawn - 1
+        self.pos = i + 1
+        return True
+
+    def next(self):
+        while self.pos < len(self.nodes):
+            if self.pos == self.drawn:
+                self._swap(self.drawn, self.rng.randrange(self.drawn, len(self.nodes)))
+                self.drawn += 1
+            node = self.nodes[self.pos]
+            self.pos += 1
+            if not node.removed:
+                return node.song
+        return None  # siklus habis
+
+    def prev(self):
+        while self.pos > 1:
+            self.pos -= 1
+            node = self.nodes[self.pos - 1]
+            if not node.removed:
+                return node.song
+        return None
+
+
+class CoPlayRecommender:
+    """Item-to-item recommender dari urutan lagu yang diputar.
+
+    Setiap play menambah bobot co-occurrence (1/jarak) antara lagu itu dan
+    `window` lagu sebelumnya, disimpan sebagai matriks sparse {id: {id: w}}.
+    Skor kandidat = jumlah baris milik lagu-lagu seed (diberi bobot menurun),
+    dihitung dengan NumPy kalau tersedia.
+    """
+    def __init__(self, window=3):
+        self.window = window
+        self.rows = {}
+        self.recent = deque(maxlen=window)
+        self._arrays = {}  # cache baris dalam bentuk (ids, weights) numpy
+
+    def observe(self, song_id):
+        for dist, prev in enumerate(reversed(self.recent), 1):
+            if prev == song_id:
+                continue
+            w = 1.0 / dist
+            row = self.rows.setdefault(prev, {})
+            row[song_id] = row.get(song_id, 0.0) + w
+            row = self.rows.setdefault(song_id, {})
+            row[prev] = row.get(prev, 0.0) + w
+            self._arrays.pop(prev, None)
+            self._arrays.pop(song_id, None)
+        self.recent.append(song_id)
+
+    def forget(self, song_id):
+        row = self.rows.pop(song_id, None) or {}
+        for other in row:
+            neighbours = self.rows.get(other)
+            if neighbours is not None:
+                neighbours.pop(song_id, None)
+            self._arrays.pop(other, None)
+        self._arrays.pop(song_id, None)
+        try:
+            self.recent.remove(song_id)
+        except ValueError:
+            pass
+
+    def _row_arrays(self, song_id):
+        arrays = self._arrays.get(song_id)
+        if arrays is None:
+            row = self.rows[song_id]
+            arrays = (np.fromiter(row.keys(), dtype=np.int64, count=len(row)),
+                      np.fromiter(row.values(), dtype=np.float64, count=len(row)))
+            self._arrays[song_id] = arrays
+        return arrays
+
+    def recommend(self, seeds=None, k=10, exclude=()):
+        """Top-k (song_id, score). seeds default: lagu-lagu terakhir yang diputar."""
+        if seeds is None:
+            seeds = list(reversed(self.recent))
+        seeds = [sid for sid in seeds if sid in self.rows]
+        if not seeds or k <= 0:
+            return []
+        exclude = set(exclude)
+
+        if np is not None:
+            ids, weights = [], []
+            for rank, sid in enumerate(seeds):
+                row_ids, row_w = self._row_arrays(sid)
+                ids.append(row_ids)
+                weights.append(row_w / (rank + 1))
+            ids = np.concatenate(ids)
+            uniq, inverse = np.unique(ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(weights))
+            if exclude:
+                scores[np.isin(uniq, np.fromiter(exclude, dtype=np.int64, count=len(exclude)))] = -1.0
+            top = min(k, len(uniq))
+            idx = np.argpartition(-scores, top - 1)[:top]
+            idx = idx[np.argsort(-scores[idx], kind="stable")]
+            return [(int(uniq[i]), float(scores[i])) for i in idx if scores[i] > 0]
+
+        scores = {}
+        for rank, sid in enumerate(seeds):
+            factor = 1.0 / (rank + 1)
+            for other, w in self.rows[sid].items():
+                if other not in exclude:
+                    scores[other] = scores.get(other, 0.0) + w * factor
+        return heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+
+
+class ReadWriteLock:
+    """Readers-writer lock reentrant: banyak pembaca sekaligus, satu penulis eksklusif.
+
+    - Thread yang memegang write lock boleh mengambil read/write lock lagi.
+    - Pembaca boleh mengambil read lock lagi (reentrant), tapi tidak bisa
+      naik ke write lock (RuntimeError, daripada deadlock diam-diam).
+    - Phase-fair: penulis yang menunggu didahulukan dari pembaca baru, tapi
+      pembaca yang sudah antre masuk duluan begitu penulis selesai, jadi
+      tidak ada pihak yang kelaparan.
+
+        with player.lock.read: ...
+        with player.lock.write: ...
+    """
     def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}  # thread id -> kedalaman read lock
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._waiting_readers = 0
+        self._write_phase = 0       # bertambah setiap write selesai
+        self._priority_readers = 0  # pembaca yang sudah antre sebelum write terakhir selesai
+        self.read = _LockGuard(self.acquire_read, self.release_read)
+        self.write = _LockGuard(self.acquire_write, self.release_write)
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            phase = self._write_phase
+            self._waiting_readers += 1
+            try:
+                while self._writer is not None or (self._waiting_writers and phase == self._write_phase):
+                    self._cond.wait()
+            finally:
+                self._waiting_readers -= 1
+                if phase != self._write_phase and self._priority_readers:
+                    self._priority_readers -= 1
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers.get(me, 0) - 1
+            if depth < 0:
+                raise RuntimeError("release_read without acquire_read")
+            if depth:
+                self._readers[me] = depth
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("cannot upgrade a read lock to a write lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers or self._priority_readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("release_write by a thread that does not hold the write lock")
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._write_phase += 1
+                self._priority_readers = self._waiting_readers
+                self._cond.notify_all()
+
+
+class _LockGuard:
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._release()
+        return False
+
+
+def reads(method):
+    """Jalankan method MusicPlayer di bawah self.lock.read."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def writes(method):
+    """Jalankan method MusicPlayer di bawah self.lock.write (eksklusif)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def write_json_atomic(path, data, indent=4):
+    """Tulis JSON ke file sementara lalu rename, jadi file lama tidak pernah setengah tertulis."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class WriteBehindPersister:
+    """Thread latar yang menyimpan store "kotor" (library, playlist) secara tertunda.
+
+    mark_dirty() hanya menandai & langsung kembali. Penulisan ditunda sampai
+    store tenang selama `delay` detik (paling lama `max_delay` sejak pertama
+    kotor), jadi sederet edit cepat hanya menghasilkan satu kali tulis per
+    store. Snapshot diambil di thread ini (di bawah read lock player), bukan
+    di thread UI.
+    """
+    def __init__(self, delay=0.5, max_delay=2.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.stores = {}   # nama -> (snapshot_fn, write_fn)
+        self._dirty = {}   # nama -> [pertama kotor, terakhir kotor]
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()  # snapshot+tulis satu per satu, urutannya terjaga
+        self._thread = None
+        self._stopping = False
+        self.writes = 0
+        self.marks = 0
+
+    def register(self, name, snapshot, write):
+        self.stores[name] = (snapshot, write)
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="groovy-persister", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def mark_dirty(self, name):
+        now = time.monotonic()
+        with self._cond:
+            self.marks += 1
+            span = self._dirty.get(name)
+            if span is None:
+                self._dirty[name] = [now, now]
+                self._cond.notify()
+            else:
+                span[1] = now
+
+    def _due(self, now):
+        """(nama yang sudah waktunya ditulis, detik sampai yang berikutnya jatuh tempo)."""
+        due, wait = [], None
+        for name, (first, last) in self._dirty.items():
+            at = min(last + self.delay, first + self.max_delay)
+            if at <= now:
+                due.append(name)
+            else:
+                wait = at - now if wait is None else min(wait, at - now)
+        return due, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    due, wait = self._due(time.monotonic())
+                    if due:
+                        for name in due:
+                            del self._dirty[name]
+                        break
+                    self._cond.wait(wait)
+            self._write(due)
+
+    def _write(self, names):
+        with self._io_lock:
+            for name in names:
+                snapshot, write = self.stores[name]
+                try:
+                    write(snapshot())
+                    self.writes += 1
+                except Exception as e:
+                    print(f"Failed to save {name}:", e)
+
+    def flush(self):
+        """Tulis semua store yang masih kotor sekarang juga (di thread pemanggil)."""
+        with self._cond:
+            names = list(self._dirty)
+            self._dirty.clear()
+        if names:
+            self._write(names)
+        return len(names)
+
+    def stop(self):
+        """Flush lalu hentikan thread latar."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+class MusicPlayer:
+    """Core player logic and in-memory data storage.
+
+    Aman dipakai dari banyak thread (GUI, API server, import di latar):
+    method yang mengubah state memegang self.lock.write, yang hanya membaca
+    memegang self.lock.read. Operasi gabungan dari luar (mis. hapus lagu +
+    cascade ke playlist) dibungkus sendiri dengan `with player.lock.write`.
+    """
+    FACETS = ("genre", "artist", "album", "decade", "favorite")
+    FACET_POPCOUNT_KEYS = 64  # facet dengan nilai sebanyak ini atau kurang dihitung ulang lewat popcount
+
+    def __init__(self, data_dir="."):
+        self.lock = ReadWriteLock()
+        # folder tempat songs.json, playlists.json, favorites.jsonl dan history/
+        self.data_dir = data_dir
         self.library = DoublyLinkedList()
 
-        # Multi-playlist: key=playlist name, value=DoublyLinkedList()
+        # Multi-playlist: key=playlist name, value=IndexableSkipList()
         self.playlists = {}
         self.current_playlist_name = "My Playlist"
 
         self.queue = Queue()
+        self._queued_song = None  # lagu terakhir yang diambil dari antrian oleh next_song
         self.history = Stack()
-        self.favorites = set()
+        self.favorites = FavoriteStore(self._path("favorites.jsonl"))
         self.current_song = None
         self.is_playing = False
         self.current_mode = "library"
         self.list_order = "asc"
+        self.cursor = PlaybackCursor()
+        self.repeat_mode = "off"  # "off" | "one" | "all"
+        self.shuffle_enabled = False
+        self.shuffle_seed = None
+        self.shuffle = None  # ShuffleOrder untuk list yang sedang aktif
+
+        # Secondary indexes, dijaga oleh add_library_song / remove_library_song
+        self.artist_index = {}  # normalized artist -> DoublyLinkedList
+        self.genre_index = {}   # normalized genre -> DoublyLinkedList
+        self._path_keys = {}          # normalized file_path -> jumlah lagu
+        self._title_artist_keys = {}  # (title, artist) normalized -> jumlah lagu
+        self.recommender = CoPlayRecommender()
+        self.trending = TrendingTracker()
+        self.view_list = DoublyLinkedList()  # lagu yang sedang tampil (mode "view")
+        # bitmap index per facet untuk filter gabungan (dijaga _index_song / _unindex_song)
+        self.facets = {name: BitmapIndex() for name in self.FACETS}
+        self.fuzzy = None  # FuzzyIndex, dibangun di latar oleh build_fuzzy_index
+        self._fuzzy_pending = None  # perubahan library selama index fuzzy dibangun
+        self._fuzzy_ready = None    # Event, di-set saat build yang sedang jalan selesai
+        self.search_cache = SearchCache()
+        self.generation = 0  # naik tiap lagu ditambah/dihapus; menandai cache search basi
+        self._fuzzy_lock = threading.Lock()
+        self._max_id = 0
+        self.persister = None  # WriteBehindPersister, aktif lewat enable_write_behind()
+        # index terurut untuk listing & range query (dijaga _index_song / _unindex_song)
+        self.sorted_indexes = {
+            "title": SortedIndex(lambda s: s.title, collate_text),
+            "artist": SortedIndex(lambda s: s.artist, collate_text),
+            "album": SortedIndex(lambda s: s.album, collate_text),
+            "year": SortedIndex(lambda s: s.year, collate_number),
+            "duration": SortedIndex(lambda s: duration_seconds(s.duration), collate_number),
+        }
+
+        # Listening log (persisted) + play yang sedang berjalan
+        self.listening_log = ListeningLog(self._path("history"))
+        self._pending_play = None
 
         # Load saved data
         self.load_library()
         self.load_playlists()   # load playlists after library so IDs resolve correctly
+        self.favorites.load(self.library)
+        for song in self.favorites.songs:
+            self._set_favorite_facet(song.id, True)
+        self.load_history()
 
         # Ensure at least one playlist exists
         if not self.playlists:
-            self.playlists[self.current_playlist_name] = DoublyLinkedList()
+            self.playlists[self.current_playlist_name] = IndexableSkipList()
             self.save_playlists()
 
+    def _path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    @reads
     def get_next_id(self):
-        songs = self.library.get_all()
-        return max([s.id for s in songs], default=0) + 1
+        # id terbesar dijaga add_library_song, jadi O(1) (id lagu yang dihapus tidak dipakai ulang)
+        return self._max_id + 1
 
     def _norm(self, v):
         try:
@@ -158,57 +2132,168 @@ class MusicPlayer:
         except Exception:
             return ""
 
-    def library_has_duplicate(self, title: str, artist: str, file_path: str):
-        """Cek duplikasi lagu di library.
-        Prioritas: file_path sama (lebih akurat), lalu title+artist sama (case-insensitive).
-        """
-        t = self._norm(title)
-        a = self._norm(artist)
+    #  library mutations (jaga index tetap sinkron)
+    @writes
+    def add_library_song(self, song: Song):
+        self.library.add(song)
+        self.generation += 1
+        if isinstance(song.id, int) and song.id > self._max_id:
+            self._max_id = song.id
+        self._index_song(song)
+        return True
 
-        fp_in = None
+    @writes
+    def remove_library_song(self, song_id):
+        song = self.library.find_by_id(song_id)
+        if song is None:
+            return False
+        self.library.delete(song_id)
+        self.generation += 1
+        self._unindex_song(song)
+        self.recommender.forget(song_id)
+        self.trending.discard(song_id)
+        self.view_list.delete(song_id)
+        return True
+
+    def _index_song(self, song: Song):
+        for index, key in ((self.artist_index, self._norm(song.artist)),
+                           (self.genre_index, self._norm(song.genre))):
+            if key:
+                index.setdefault(key, DoublyLinkedList()).add(song)
+        for keys, key in self._duplicate_keys(song.title, song.artist, song.file_path):
+            keys[key] = keys.get(key, 0) + 1
+        for index in self.sorted_indexes.values():
+            index.add(song)
+        for facet, key, label in self._facet_entries(song):
+            self.facets[facet].add(song.id, key, label)
+        if self.fuzzy is not None:
+            self.fuzzy.add(song)
+        elif self._fuzzy_pending is not None:
+            self._fuzzy_pending.append((True, song))
+
+    def _unindex_song(self, song: Song):
+        for index, key in ((self.artist_index, self._norm(song.artist)),
+                           (self.genre_index, self._norm(song.genre))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.delete(song.id)
+                if bucket.size == 0:
+                    del index[key]
+        for keys, key in self._duplicate_keys(song.title, song.artist, song.file_path):
+            if keys.get(key, 0) <= 1:
+                keys.pop(key, None)
+            else:
+                keys[key] -= 1
+        for index in self.sorted_indexes.values():
+            index.discard(song)
+        for facet, key, _label in self._facet_entries(song):
+            self.facets[facet].discard(song.id, key)
+        if self.fuzzy is not None:
+            self.fuzzy.discard(song)
+        elif self._fuzzy_pending is not None:
+            self._fuzzy_pending.append((False, song))
+
+    def _facet_entries(self, song):
+        """(facet, key, label) lagu untuk tiap facet."""
+        return (("genre", self._norm(song.genre), (song.genre or "").strip()),
+                ("artist", self._norm(song.artist), (song.artist or "").strip()),
+                ("album", self._norm(song.album), (song.album or "").strip()),
+                ("decade", decade_of(song.year), None),
+                ("favorite", song.id in self.favorites, None))
+
+    def _facet_key_fn(self, facet):
+        """song -> key facet (sama dengan _facet_entries), untuk tally satu facet saja."""
+        if facet == "decade":
+            return lambda song: decade_of(song.year)
+        if facet == "favorite":
+            return lambda song: song.id in self.favorites
+        norm, attr = self._norm, facet
+        return lambda song: norm(getattr(song, attr))
+
+    def _norm_path(self, file_path):
         try:
             if file_path:
-                fp_in = os.path.normcase(os.path.normpath(file_path))
+                return os.path.normcase(os.path.normpath(file_path))
         except Exception:
-            fp_in = None
+            pass
+        return None
 
-        for s in self.library.get_all():
-            # check file path duplicate
-            try:
-                if fp_in and s.file_path:
-                    fp2 = os.path.normcase(os.path.normpath(s.file_path))
-                    if fp2 == fp_in:
-                        return True
-            except Exception:
-                pass
-
-            # check title+artist duplicate
-            if t and a:
-                if self._norm(s.title) == t and self._norm(s.artist) == a:
-                    return True
+    def _duplicate_keys(self, title, artist, file_path):
+        """Pasangan (dict index, key) yang dipakai untuk cek duplikasi."""
+        keys = []
+        fp = self._norm_path(file_path)
+        if fp:
+            keys.append((self._path_keys, fp))
+        t = self._norm(title)
+        a = self._norm(artist)
+        if t and a:
+            keys.append((self._title_artist_keys, (t, a)))
+        return keys
 
+    @reads
+    def library_has_duplicate(self, title: str, artist: str, file_path: str):
+        """Cek duplikasi lagu di library.
+        Prioritas: file_path sama (lebih akurat), lalu title+artist sama (case-insensitive).
+        O(1) lewat index key yang dijaga add_library_song / remove_library_song.
+        """
+        for keys, key in self._duplicate_keys(title, artist, file_path):
+            if key in keys:
+                return True
         return False
 
+    #  sorted listings & range queries
+    def _sorted_index(self, field):
+        index = self.sorted_indexes.get(field)
+        if index is None:
+            raise ValueError(f"unknown sort field {field!r} (choose from {', '.join(self.sorted_indexes)})")
+        return index
+
+    @reads
+    def sorted_songs(self, field, reverse=False, start=0, stop=None):
+        """Lagu library urut field (title/artist/album/year/duration), O(log n + k) per halaman.
+        Field kosong selalu di akhir urutan naik."""
+        find = self.library.find_by_id
+        return [find(song_id) for song_id in self._sorted_index(field).ids(start, stop, reverse)]
+
+    @reads
+    def songs_in_range(self, field, lo=None, hi=None, reverse=False, limit=None):
+        """Lagu dengan lo <= field <= hi, urut field. Contoh: ("year", 1990, 1999),
+        ("duration", None, 179) untuk lagu di bawah 3 menit. O(log n + k)."""
+        index = self._sorted_index(field)
+        i, j = index.range_bounds(lo, hi)
+        if limit is not None:
+            i, j = (max(i, j - limit), j) if reverse else (i, min(j, i + limit))
+        entries = index.entries[i:j]
+        if reverse:
+            entries.reverse()
+        find = self.library.find_by_id
+        return [find(song_id) for _key, song_id in entries]
+
     #  playlist persistence (multi-playlist) 
     def save_playlists(self):
-        """Simpan semua playlist ke playlists.json sebagai dict {nama_playlist: [id_lagu, ...]}."""
+        """Simpan semua playlist ke playlists.json sebagai dict {nama_playlist: [id_lagu, ...]}.
+        Kalau write-behind aktif, hanya ditandai kotor dan ditulis thread persister."""
+        if self.persister is not None:
+            self.persister.mark_dirty("playlists")
+            return
         try:
-            data = {}
-            for name, dll in self.playlists.items():
-                data[name] = [song.id for song in dll.get_all()]
-            with open("playlists.json", "w") as f:
-                json.dump(data, f, indent=4)
+            write_json_atomic(self._path("playlists.json"), self._playlists_data())
         except Exception as e:
             print("Failed to save playlists:", e)
 
+    @reads
+    def _playlists_data(self):
+        return {name: [song.id for song in dll] for name, dll in self.playlists.items()}
+
+    @writes
     def load_playlists(self):
         """Muat semua playlist dari playlists.json. Jika hanya ada playlist.json lama, migrasikan."""
         try:
             # Migration: old single-playlist file
-            if (not os.path.isfile("playlists.json")) and os.path.isfile("playlist.json"):
-                with open("playlist.json", "r") as f:
+            if (not os.path.isfile(self._path("playlists.json"))) and os.path.isfile(self._path("playlist.json")):
+                with open(self._path("playlist.json"), "r") as f:
                     ids = json.load(f)
-                dll = DoublyLinkedList()
+                songs = []
                 seen = set()
                 for song_id in ids:
                     if song_id in seen:
@@ -216,21 +2301,22 @@ class MusicPlayer:
                     seen.add(song_id)
                     song = self.library.find_by_id(song_id)
                     if song:
-                        dll.add(song)
+                        songs.append(song)
+                dll = IndexableSkipList(songs)
                 self.playlists[self.current_playlist_name] = dll
                 # save as new format
                 self.save_playlists()
                 return
 
-            if not os.path.isfile("playlists.json"):
+            if not os.path.isfile(self._path("playlists.json")):
                 return
 
-            with open("playlists.json", "r") as f:
+            with open(self._path("playlists.json"), "r") as f:
                 data = json.load(f)
 
             # rebuild playlists using songs from library
             for name, ids in (data or {}).items():
-                dll = DoublyLinkedList()
+                songs = []
                 seen = set()
                 for song_id in ids:
                     if song_id in seen:
@@ -238,28 +2324,33 @@ class MusicPlayer:
                     seen.add(song_id)
                     song = self.library.find_by_id(song_id)
                     if song:
-                        dll.add(song)
+                        songs.append(song)
+                dll = IndexableSkipList(songs)
                 self.playlists[name] = dll
 
         except Exception as e:
             print("Failed to load playlists:", e)
 
+    @writes
     def create_playlist(self, name: str):
         name = (name or "").strip()
         if not name:
             return False
         if name not in self.playlists:
-            self.playlists[name] = DoublyLinkedList()
+            self.playlists[name] = IndexableSkipList()
             self.save_playlists()
         return True
 
+    @reads
     def get_playlist_names(self):
         return list(self.playlists.keys())
 
     def get_playlist(self, name: str):
         return self.playlists.get(name)
 
-    def add_to_playlist(self, playlist_name: str, song_id: int):
+    @writes
+    def add_to_playlist(self, playlist_name: str, song_id: int, position=None):
+        """Tambah lagu ke playlist; position=None di akhir, selain itu disisipkan di posisi tsb."""
         if playlist_name not in self.playlists:
             self.create_playlist(playlist_name)
 
@@ -274,9 +2365,27 @@ class MusicPlayer:
         except Exception:
             pass
 
-        self.playlists[playlist_name].add(song)
+        if position is None:
+            self.playlists[playlist_name].add(song)
+        else:
+            self.playlists[playlist_name].insert(position, song)
+        self.save_playlists()
+        return True
+
+    @writes
+    def move_in_playlist(self, playlist_name: str, src: int, dst: int):
+        """Pindahkan lagu di posisi src ke posisi dst (drag-to-reorder). O(log n)."""
+        pll = self.playlists.get(playlist_name)
+        if pll is None:
+            return False
+        try:
+            pll.move(src, dst)
+        except IndexError:
+            return False
         self.save_playlists()
         return True
+
+    @writes
     def remove_from_playlist(self, playlist_name: str, song_id: int):
         """Hapus lagu (by id) dari playlist tertentu."""
         if playlist_name not in self.playlists:
@@ -287,6 +2396,61 @@ class MusicPlayer:
         return ok
 
 
+    PLAYLIST_SET_OPS = ("union", "intersection", "difference")
+
+    @reads
+    def playlist_set(self, op, names, order="playlist"):
+        """Gabungan/irisan/selisih beberapa playlist -> list lagu.
+
+        difference = playlist pertama dikurangi semua playlist lainnya. Dihitung
+        dengan IdBitmap per playlist, jadi linear terhadap ukuran input (tanpa
+        cek find_by_id berpasangan). order: "playlist" (urutan kemunculan di
+        input), "id", atau field sorted index (title/artist/album/year/duration).
+        """
+        if op not in self.PLAYLIST_SET_OPS:
+            raise ValueError(f"unknown set operation {op!r} (choose from {', '.join(self.PLAYLIST_SET_OPS)})")
+        if not names:
+            raise ValueError("at least one playlist is required")
+        sources = []
+        for name in names:
+            pll = self.playlists.get(name)
+            if pll is None:
+                raise ValueError(f"playlist {name!r} not found")
+            sources.append(pll)
+        if order not in ("playlist", "id"):
+            index = self._sorted_index(order)
+        result = sources[0].id_bitmap()
+        for pll in sources[1:]:
+            other = pll.id_bitmap()
+            if op == "union":
+                result |= other
+            elif op == "intersection":
+                result &= other
+            else:
+                result -= other
+        if order == "id":
+            find = self.library.find_by_id
+            return [find(song_id) for song_id in result.ids()]
+        # irisan/selisih hanya bisa berisi lagu playlist pertama
+        songs = result.pick(itertools.chain.from_iterable(sources if op == "union" else sources[:1]))
+        if order != "playlist":
+            songs.sort(key=index.key)
+        return songs
+
+    @writes
+    def combine_playlists(self, op, names, target, order="playlist"):
+        """Simpan hasil playlist_set() sebagai playlist baru target. Return jumlah lagu."""
+        target = (target or "").strip()
+        if not target:
+            raise ValueError("target playlist name is required")
+        if target in self.playlists:
+            raise ValueError(f"playlist {target!r} already exists")
+        songs = self.playlist_set(op, names, order)
+        self.playlists[target] = IndexableSkipList(songs)
+        self.save_playlists()
+        return len(songs)
+
+    @writes
     def remove_song_from_all_playlists(self, song_id: int):
         """Hapus lagu (by id) dari semua playlist."""
         changed = False
@@ -299,28 +2463,60 @@ class MusicPlayer:
 
 #  library persistence (optional helpers) 
     def save_library(self):
-        """Simpan seluruh library ke songs.json (dipakai jika ingin persist library)."""
+        """Simpan seluruh library ke songs.json (dipakai jika ingin persist library).
+        Kalau write-behind aktif, hanya ditandai kotor dan ditulis thread persister."""
+        if self.persister is not None:
+            self.persister.mark_dirty("library")
+            return
         try:
-            data = []
-            for s in self.library.get_all():
-                data.append({
-                    "id": s.id,
-                    "title": s.title,
-                    "artist": s.artist,
-                    "genre": s.genre,
-                    "album": s.album,
-                    "year": s.year,
-                    "duration": s.duration,
-                    "file_path": s.file_path
-                })
-            with open("songs.json", "w") as f:
-                json.dump(data, f, indent=4)
+            write_json_atomic(self._path("songs.json"), self._library_data())
         except Exception as e:
             print("Failed to save library:", e)
 
+    @reads
+    def _library_data(self):
+        data = []
+        for s in self.library:
+            data.append({
+                "id": s.id,
+                "title": s.title,
+                "artist": s.artist,
+                "genre": s.genre,
+                "album": s.album,
+                "year": s.year,
+                "duration": s.duration,
+                "file_path": s.file_path
+            })
+        return data
+
+    #  write-behind persistence
+    def enable_write_behind(self, delay=0.5, max_delay=2.0):
+        """Simpan library/playlist di thread latar (coalesced). Panggil flush()/close() sebelum keluar."""
+        if self.persister is None:
+            persister = WriteBehindPersister(delay, max_delay)
+            persister.register("library", self._library_data,
+                               lambda data: write_json_atomic(self._path("songs.json"), data))
+            persister.register("playlists", self._playlists_data,
+                               lambda data: write_json_atomic(self._path("playlists.json"), data))
+            self.persister = persister.start()
+        return self.persister
+
+    def flush(self):
+        """Tulis sekarang semua perubahan yang masih tertunda."""
+        if self.persister is not None:
+            self.persister.flush()
+
+    def close(self):
+        """Tutup play yang berjalan & simpan semua yang tertunda (saat aplikasi keluar)."""
+        self.end_play()
+        if self.persister is not None:
+            self.persister.stop()
+            self.persister = None
+
+    @writes
     def load_library(self):
         try:
-            with open("songs.json", "r") as f:
+            with open(self._path("songs.json"), "r") as f:
                 data = json.load(f)
 
             for s in data:
@@ -336,62 +2532,485 @@ class MusicPlayer:
                 )
                 # avoid duplicates when loading (by id, file_path, or title+artist)
                 if self.library.find_by_id(song.id) is None and (not self.library_has_duplicate(song.title, song.artist, song.file_path)):
-                    self.library.add(song)
+                    self.add_library_song(song)
 
         except FileNotFoundError:
             pass  # tidak ada file? biarkan library kosong
         except Exception as e:
             print("Failed to load library:", e)
 
+    #  favorites
+    @writes
+    def add_favorite(self, song_id):
+        song = self.library.find_by_id(song_id)
+        if song is None:
+            return False
+        if not self.favorites.add(song):
+            return False
+        self._set_favorite_facet(song_id, True)
+        return True
+
+    @writes
+    def remove_favorite(self, song_id):
+        if not self.favorites.discard(song_id):
+            return False
+        if self.library.find_by_id(song_id) is not None:
+            self._set_favorite_facet(song_id, False)
+        return True
+
+    def _set_favorite_facet(self, song_id, favorite):
+        facet = self.facets["favorite"]
+        facet.discard(song_id, not favorite)
+        facet.add(song_id, favorite)
+
+    #  bitmap facet filter
+    def _facet_key(self, facet, value):
+        if facet == "decade":
+            return decade_of(value)
+        if facet == "favorite":
+            return bool(value)
+        return self._norm(value)
+
+    @reads
+    def filter_ids(self, **filters):
+        """IdBitmap lagu yang cocok: AND antar facet, OR antar nilai dalam satu facet.
+
+        filter_ids(genre=["pop", "rock"], decade=2000, favorite=True). Nilai None
+        berarti facet itu tidak dipakai; tanpa filter sama sekali = semua lagu.
+        """
+        result = None
+        for facet, values in filters.items():
+            index = self.facets.get(facet)
+            if index is None:
+                raise ValueError(f"unknown facet {facet!r} (choose from {', '.join(self.FACETS)})")
+            if values is None:
+                continue
+            if isinstance(values, (str, int, bool)):
+                values = [values]
+            bitmap = index.union(self._facet_key(facet, value) for value in values)
+            result = bitmap if result is None else result & bitmap
+        if result is None:
+            result = self.facets["favorite"].union([True, False])
+        return result
+
+    @reads
+    def facet_counts(self, facet, limit=None, **filters):
+        """Jumlah lagu per nilai facet -> [(key, label, count)], terbanyak dulu.
+
+        Tanpa filter langsung dari counts yang dijaga per mutasi. Dengan filter
+        dihitung ulang di subset itu: popcount AND per key untuk facet bernilai
+        sedikit (genre/dekade/favorit), atau tally lagu hasil filter untuk
+        facet besar (artist/album).
+        """
+        index = self.facets.get(facet)
+        if index is None:
+            raise ValueError(f"unknown facet {facet!r} (choose from {', '.join(self.FACETS)})")
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if not filters:
+            counts = index.counts
+        elif len(index) <= self.FACET_POPCOUNT_KEYS:
+            counts = index.counts_within(self.filter_ids(**filters))
+        else:
+            key_of = self._facet_key_fn(facet)
+            counts = {}
+            for song in self.songs_by_ids(self.filter_ids(**filters).ids()):
+                key = key_of(song)
+                if key is not None and key != "":
+                    counts[key] = counts.get(key, 0) + 1
+        count_of = lambda item: item[1]
+        if limit:
+            top = heapq.nlargest(limit, counts.items(), key=count_of)
+        else:
+            top = sorted(counts.items(), key=count_of, reverse=True)
+        labels = index.labels
+        return [(key, labels.get(key, key), n) for key, n in top]
+
+    @reads
+    def songs_by_ids(self, ids):
+        find = self.library.find_by_id
+        return [song for song in map(find, ids) if song is not None]
+
+    @reads
+    def filter_songs(self, start=0, stop=None, **filters):
+        """Lagu hasil filter_ids() urut id (= urutan ditambahkan), potongan [start:stop]."""
+        return self.songs_by_ids(self.filter_ids(**filters).ids(start, stop))
+
+    @reads
+    def search_ids(self, keyword):
+        """Id lagu yang judul/artis/genre-nya mengandung keyword, urut library.
+
+        Lewat SearchCache: query yang sama langsung dari cache, query yang
+        prefix-nya ada di cache hanya menyaring hasil prefix itu (kalau paling
+        banyak separuh library; lookup per id lebih mahal dari scan linked
+        list), sisanya scan library penuh.
+        """
+        key = keyword.lower()
+        ids = self.search_cache.get(key, self.generation)
+        if ids is None:
+            base = self.search_cache.prefix(key, self.generation)
+            if base is not None and len(base) * 2 <= self.library.size:
+                match = self.library.matcher(keyword)
+                find = self.library.find_by_id
+                ids = [song_id for song_id in base if match(find(song_id))]
+            else:
+                ids = [song.id for song in self.library.iter_search(keyword)]
+            ids = self.search_cache.put(key, ids, self.generation)
+        return ids
+
+    def build_fuzzy_index(self):
+        """Bangun index fuzzy tanpa menahan lock player selama membangun: daftar lagu
+        disalin di bawah read lock singkat, index dibangun di luar lock, lalu dipasang
+        di bawah write lock singkat bersama tambah/hapus lagu yang terjadi selama itu.
+        Kalau thread lain sedang membangun, tunggu sampai selesai. Jangan dipanggil
+        sambil memegang player.lock. Return jumlah kata yang diindex."""
+        with self.lock.read:
+            if self.fuzzy is not None:
+                return len(self.fuzzy.postings)
+            with self._fuzzy_lock:
+                building = self._fuzzy_pending is not None
+                if not building:
+                    self._fuzzy_pending = []
+                    self._fuzzy_ready = threading.Event()
+                ready = self._fuzzy_ready
+            # disalin di bawah read lock yang sama dengan mulainya pencatatan perubahan
+            songs = None if building else list(self.library)
+        if building:
+            ready.wait()
+            fuzzy = self.fuzzy
+            return len(fuzzy.postings) if fuzzy is not None else 0
+        try:
+            index = FuzzyIndex()
+            for song in songs:
+                index.add(song)
+        except BaseException:
+            with self.lock.write:
+                self._fuzzy_pending = None
+            ready.set()
+            raise
+        with self.lock.write:
+            for added, song in self._fuzzy_pending:
+                if added:
+                    index.add(song)
+                else:
+                    index.discard(song)
+            self.fuzzy = index
+            self._fuzzy_pending = None
+        ready.set()
+        return len(index.postings)
+
+    def start_fuzzy_index(self):
+        """Mulai build_fuzzy_index di thread latar kalau index belum ada/belum dibangun."""
+        with self._fuzzy_lock:
+            if self.fuzzy is not None or self._fuzzy_pending is not None:
+                return
+        threading.Thread(target=self.build_fuzzy_index, name="fuzzy-index", daemon=True).start()
+
+    @reads
+    def fuzzy_search(self, keyword, limit=50, max_distance=2):
+        """Search toleran typo di judul/artis: tiap kata keyword boleh meleset sampai
+        max_distance huruf (kata <= 5 huruf 1, kata <= 2 huruf dan angka harus persis).
+        Urut dari yang paling cocok (jarak terburuk antar kata terkecil), lalu id.
+        Selama index fuzzy belum jadi hasilnya kosong (build dimulai di latar), bukan
+        menunggu; panggil build_fuzzy_index() dulu kalau perlu hasil pasti."""
+        index = self.fuzzy
+        if index is None:
+            self.start_fuzzy_index()
+            return []
+        songs = []
+        seen = IdBitmap()
+        for tier in index.match(keyword, max_distance):
+            want = None if limit is None else limit - len(songs)
+            songs.extend(self.songs_by_ids((tier - seen).ids(0, want)))
+            if limit is not None and len(songs) >= limit:
+                break
+            seen = tier
+        return songs
+
+    @reads
+    def get_favorite_songs(self):
+        """Lagu favorit urut waktu difavoritkan, O(#favorit)."""
+        return list(self.favorites.songs)
+
+    #  play tracking & recommendations
+    @writes
+    def load_history(self, seed_plays=5000, trending_days=30):
+        """Buka listening log lalu isi ulang history, recommender & trending dari play terakhir."""
+        self.listening_log.open()
+        for song_id, _start_ts, _ms_played, _mode in self.listening_log.tail(seed_plays):
+            self.recommender.observe(song_id)
+            song = self.library.find_by_id(song_id)
+            if song is not None:
+                self.history.push(song)
+        # play yang lebih tua dari ~10 half-life kontribusinya sudah tidak berarti
+        for song_id, start_ts, _ms_played, _mode in self.listening_log.between(time.time() - trending_days * 86400):
+            if self.library.find_node(song_id) is not None:
+                self.trending.record(song_id, start_ts)
+
+    @writes
+    def record_play(self, song: Song, mode=None):
+        """Catat lagu yang mulai diputar (history + recommender).
+        Play sebelumnya ditutup dan masuk ke listening log."""
+        self.end_play()
+        self._pending_play = {
+            "song_id": song.id,
+            "start_ts": time.time(),
+            "mode": mode or self.current_mode,
+            "paused_at": None,
+            "paused": 0.0,
+        }
+        self.history.push(song)
+        self.recommender.observe(song.id)
+        self.trending.record(song.id, self._pending_play["start_ts"])
+
+    @reads
+    def trending_songs(self, n=20):
+        """Lagu trending (skor play yang meluruh), tanpa scan library."""
+        songs = []
+        for song_id, _score in self.trending.top_k(n):
+            song = self.library.find_by_id(song_id)
+            if song is not None:
+                songs.append(song)
+        return songs
+
+    @writes
+    def pause_play(self):
+        play = self._pending_play
+        if play is not None and play["paused_at"] is None:
+            play["paused_at"] = time.time()
+
+    @writes
+    def resume_play(self):
+        play = self._pending_play
+        if play is not None and play["paused_at"] is not None:
+            play["paused"] += time.time() - play["paused_at"]
+            play["paused_at"] = None
+
+    @writes
+    def end_play(self, ms_played=None):
+        """Tutup play yang sedang berjalan dan tulis ke listening log."""
+        play, self._pending_play = self._pending_play, None
+        if play is None:
+            return False
+        if ms_played is None:
+            now = time.time()
+            paused = play["paused"] + (now - play["paused_at"] if play["paused_at"] is not None else 0.0)
+            ms_played = (now - play["start_ts"] - paused) * 1000
+        return self.listening_log.append(play["song_id"], play["start_ts"], ms_played, play["mode"])
+
+    @reads
+    def play_count(self, song_id):
+        return self.listening_log.play_count(song_id)
+
+    def plays_between(self, start_ts=None, end_ts=None):
+        """Yield (song_id, start_ts, ms_played, mode) dari listening log, streaming."""
+        return self.listening_log.between(start_ts, end_ts)
+
+    @reads
+    def plays_page(self, cursor=None, limit=50):
+        """Halaman listening log dari yang terbaru -> ([(song_id, start_ts, ms, mode)], next_cursor).
+        Cursor = "timestamp:jumlah play di timestamp itu yang sudah tampil", jadi tetap
+        valid walau ada play baru atau log dipadatkan."""
+        before_ts, skip = None, 0
+        if cursor not in (None, ""):
+            try:
+                ts, _, seen = cursor.partition(":")
+                before_ts, skip = float(ts), int(seen or 0)
+            except (AttributeError, ValueError):
+                raise ValueError(f"invalid cursor {cursor!r}")
+        records = self.listening_log.latest(limit + 1, before_ts, skip)
+        more = len(records) > limit
+        records = records[:limit]
+        if not more or not records:
+            return records, None
+        last_ts = records[-1][1]
+        same = sum(1 for rec in records if rec[1] == last_ts)
+        if last_ts == before_ts:
+            same += skip
+        return records, f"{last_ts!r}:{same}"
+
+    @writes
+    def compact_history(self, before=None):
+        """Padatkan listening log; buang play lagu yang sudah tidak ada di library."""
+        self.end_play()
+        self.listening_log.compact(keep=lambda song_id: self.library.find_node(song_id) is not None,
+                                   before=before)
+
+    @reads
+    def recommend_songs(self, k=10, seed_song=None, exclude=()):
+        """Rekomendasi lagu (objek Song) berdasarkan pola pemutaran."""
+        seeds = list(reversed(self.recommender.recent))
+        if seed_song is not None:
+            seeds = [seed_song.id] + [sid for sid in seeds if sid != seed_song.id]
+        exclude = set(exclude)
+        if seed_song is not None:
+            exclude.add(seed_song.id)
+
+        songs = []
+        # minta lebih banyak untuk berjaga-jaga ada id yang sudah tidak ada di library
+        for song_id, _score in self.recommender.recommend(seeds, k * 2, exclude):
+            song = self.library.find_by_id(song_id)
+            if song is not None:
+                songs.append(song)
+                if len(songs) >= k:
+                    break
+        return songs
+
     #  navigation helpers 
+    @writes
     def find_similar_song(self, current_song):
-        songs = self.library.get_all()
-        candidates = [s for s in songs if s.id != current_song.id]
-        if not candidates:
+        # artis sama > genre sama > random
+        for index, key in ((self.artist_index, self._norm(current_song.artist)),
+                           (self.genre_index, self._norm(current_song.genre))):
+            song = self._rotate_candidate(index.get(key), current_song)
+            if song is not None:
+                return song
+
+        n = self.library.size
+        if n == 0 or (n == 1 and self.library.find_node(current_song.id)):
             return None
-        same_artist = [s for s in candidates if s.artist == current_song.artist]
-        if same_artist:
-            return same_artist[0]
-        same_genre = [s for s in candidates if s.genre == current_song.genre]
-        if same_genre:
-            return same_genre[0]
-        return random.choice(candidates)
-
-    def _get_ordered_list(self):
-        """Return list following current_mode and list_order so next/prev follow visual order."""
-        if self.current_mode == "playlist":
+        while True:
+            song = self.library[random.randrange(n)]
+            if song.id != current_song.id:
+                return song
+
+    def _rotate_candidate(self, bucket, current_song):
+        """Kandidat berikutnya setelah current_song di bucket (melingkar), O(1)."""
+        if bucket is None:
+            return None
+        node = bucket.find_node(current_song.id)
+        if node is None:
+            return bucket.head.song if bucket.head else None
+        nxt = node.next or bucket.head
+        return None if nxt is node else nxt.song
+
+    def _get_active_list(self, mode=None):
+        """List (DoublyLinkedList) yang sedang diputar sesuai current_mode."""
+        mode = mode or self.current_mode
+        if mode == "playlist":
             pll = self.playlists.get(self.current_playlist_name)
             if pll is None:
                 pll = self.playlists.get("My Playlist")
-            base = pll.get_all() if pll else []
-        else:
-            base = self.library.get_all()
-        if self.list_order == "desc":
-            return list(reversed(base))
-        return base
-
-    def next_song(self):
-        songs = self._get_ordered_list()
-        if not songs or not self.current_song:
+            return pll
+        if mode == "view":
+            return self.view_list
+        return self.library
+
+    @writes
+    def set_view(self, songs):
+        """Set daftar lagu yang sedang tampil (mode "view") agar next/prev mengikuti urutan layar."""
+        dll = DoublyLinkedList()
+        for song in songs:
+            if dll.find_node(song.id) is None:
+                dll.add(song)
+        self.view_list = dll
+        self.current_mode = "view"
+        self.list_order = "asc"
+        return dll
+
+    @writes
+    def extend_view(self, view, songs):
+        """Sambung lagu (mis. halaman berikutnya) ke list view dari set_view tanpa
+        membangun ulang; lagu yang sudah ada dilewati. O(len(songs))."""
+        for song in songs:
+            if view.find_node(song.id) is None:
+                view.add(song)
+        return view
+
+    @writes
+    def cycle_repeat_mode(self):
+        """off -> all -> one -> off"""
+        modes = ["off", "all", "one"]
+        idx = modes.index(self.repeat_mode) if self.repeat_mode in modes else 0
+        self.repeat_mode = modes[(idx + 1) % len(modes)]
+        return self.repeat_mode
+
+    @writes
+    def set_shuffle(self, enabled=True, seed=None):
+        """Aktifkan/matikan shuffle. seed opsional untuk urutan yang reproducible."""
+        self.shuffle_enabled = bool(enabled)
+        self.shuffle_seed = seed
+        self.shuffle = None
+        return self.shuffle_enabled
+
+    def _shuffle_order(self, dll):
+        if self.shuffle is None or self.shuffle.dll is not dll:
+            rng = self.shuffle.rng if self.shuffle is not None else random.Random(self.shuffle_seed)
+            self.shuffle = ShuffleOrder(dll, rng=rng)
+        return self.shuffle
+
+    @writes
+    def random_song(self, mode=None):
+        """Lagu acak dari list mode tertentu; tidak berulang sampai semua lagu terpilih."""
+        dll = self._get_active_list(mode)
+        if dll is None or dll.size == 0:
             return None
-        try:
-            idx = next(i for i, s in enumerate(songs) if s.id == self.current_song.id)
-            if idx < len(songs) - 1:
-                return songs[idx + 1]
-        except StopIteration:
-            pass
-        # fallback: similar
-        return self.find_similar_song(self.current_song) if self.current_song else None
+        order = self._shuffle_order(dll)
+        song = order.next()
+        if song is None:
+            last = order.current()
+            order.new_cycle(avoid_first=last.id if last else None)
+            song = order.next()
+        return song
 
-    def prev_song(self):
-        songs = self._get_ordered_list()
-        if not songs or not self.current_song:
+    def _shuffle_step(self, dll, forward):
+        order = self._shuffle_order(dll)
+        current = order.current()
+        if current is None or current.id != self.current_song.id:
+            order.jump(self.current_song.id)
+        if not forward:
+            return order.prev()
+        song = order.next()
+        if song is None:
+            # semua lagu sudah terpilih -> siklus baru (shuffle tidak pernah "habis")
+            order.new_cycle(avoid_first=self.current_song.id)
+            song = order.next()
+        return song
+
+    def _sync_cursor(self, dll):
+        reverse = self.list_order == "desc"
+        if not self.cursor.is_at(dll, self.current_song):
+            # lagu dari antrian tidak memindahkan cursor: setelah antrian habis, list lanjut
+            # dari posisi sebelum antrian
+            if self.cursor.dll is not dll or self.current_song is not self._queued_song:
+                self.cursor.seek(dll, self.current_song.id, reverse)
+        self.cursor.reverse = reverse
+
+    def _step(self, forward, auto=False):
+        dll = self._get_active_list()
+        if forward and self.queue.items and not (auto and self.repeat_mode == "one" and self.current_song):
+            # antrian (Up Next) diputar lebih dulu
+            if dll is not None and self.current_song is not None and not self.shuffle_enabled:
+                self._sync_cursor(dll)
+            while self.queue.items:
+                song = self.queue.dequeue()
+                if self.library.find_by_id(song.id) is song:
+                    self._queued_song = song
+                    return song
+        if dll is None or dll.size == 0 or not self.current_song:
             return None
-        try:
-            idx = next(i for i, s in enumerate(songs) if s.id == self.current_song.id)
-            if idx > 0:
-                return songs[idx - 1]
-        except StopIteration:
-            pass
-        # fallback: similar
-        return self.find_similar_song(self.current_song) if self.current_song else None
+        # repeat-one hanya berlaku saat lagu habis (auto-next), bukan saat tombol ditekan
+        if auto and self.repeat_mode == "one":
+            return self.current_song
+
+        if self.shuffle_enabled:
+            return self._shuffle_step(dll, forward) or self.find_similar_song(self.current_song)
+
+        self._sync_cursor(dll)
+
+        song = self.cursor.step(forward, wrap=self.repeat_mode == "all")
+        if song:
+            return song
+        # fallback: rekomendasi (hindari lagu yang baru saja diputar), lalu similar
+        recs = self.recommend_songs(1, seed_song=self.current_song,
+                                    exclude=self.recommender.recent)
+        if recs:
+            return recs[0]
+        return self.find_similar_song(self.current_song)
+
+    @writes
+    def next_song(self, auto=False):
+        return self._step(True, auto)
+
+    @writes
+    def prev_song(self):
+        return self._step(False)
@@ -0,0 +1,581 @@
+"""Micro-benchmark struktur data backend Groovy Player.
+
+Berjalan headless (tidak mengimpor customtkinter/pygame), mengukur operasi
+DoublyLinkedList, Queue, Stack dan MusicPlayer di beberapa ukuran library,
+lalu menghitung eksponen pertumbuhan (slope log-log) per operasi supaya
+jalur yang kuadratik langsung kelihatan.
+
+    python bench_groovy_player.py
+    python bench_groovy_player.py --sizes 1000 10000 --output bench.json
+    python bench_groovy_player.py --stress 10 --threads 16
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from backend_groovy_player import (DoublyLinkedList, FuzzyIndex, IndexableSkipList, MusicPlayer, Queue, SearchCache,
+                                   Song, Stack)
+from controller_groovy_player import AdminController, UserController
+from generate_groovy_player import song_records, write_playlists, write_songs
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SAMPLE_CALLS = 1000  # jumlah pemanggilan untuk operasi "per_call"
+
+
+class Fixture:
+    """Data uji untuk satu ukuran. Bagian yang mahal dibuat sekali saat pertama dibutuhkan."""
+    def __init__(self, n, seed, root):
+        self.n = n
+        self.seed = seed
+        self.root = os.path.join(root, f"n{n}")
+        self.rng = random.Random(seed)
+        # data Zipf dari generator, tanpa duplikat supaya id == posisi + 1
+        self.songs = [Song(**rec) for rec in song_records(n, seed, audio_dir="/music")]
+        self._library = None
+        self._player = None
+        self._data_dir = None
+
+    def sample_ids(self, k=SAMPLE_CALLS):
+        return [self.rng.randrange(1, self.n + 1) for _ in range(k)]
+
+    def library(self):
+        if self._library is None:
+            self._library = DoublyLinkedList()
+            for s in self.songs:
+                self._library.add(s)
+        return self._library
+
+    def empty_dir(self, name):
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def player(self):
+        """MusicPlayer berisi seluruh lagu fixture (dibangun lewat add_library_song)."""
+        if self._player is None:
+            self._player = MusicPlayer(self.empty_dir("player"))
+            for s in self.songs:
+                self._player.add_library_song(s)
+        return self._player
+
+    def data_dir(self):
+        """Folder berisi songs.json dan playlists.json (10 playlist x n/10 lagu acak)."""
+        if self._data_dir is None:
+            path = self.empty_dir("data")
+            write_songs(os.path.join(path, "songs.json"), (vars(s) for s in self.songs))
+            write_playlists(os.path.join(path, "playlists.json"), self.n, self.seed,
+                            playlists=10, length=max(1, self.n // 10))
+            self._data_dir = path
+        return self._data_dir
+
+
+#  benchmarks: fungsi(fixture) -> (detik, jumlah_panggilan)
+BENCHMARKS = []
+
+
+def benchmark(name, kind="total"):
+    """kind "total": waktu seluruh operasi atas n lagu; "per_call": rata-rata per panggilan."""
+    def register(fn):
+        BENCHMARKS.append((name, kind, fn))
+        return fn
+    return register
+
+
+@benchmark("dll_add")
+def bench_dll_add(fx):
+    dll = DoublyLinkedList()
+    t = time.perf_counter()
+    for s in fx.songs:
+        dll.add(s)
+    return time.perf_counter() - t, 1
+
+
+@benchmark("dll_iterate")
+def bench_dll_iterate(fx):
+    lib = fx.library()
+    t = time.perf_counter()
+    for _ in lib:
+        pass
+    return time.perf_counter() - t, 1
+
+
+@benchmark("dll_get_all")
+def bench_dll_get_all(fx):
+    lib = fx.library()
+    t = time.perf_counter()
+    lib.get_all()
+    return time.perf_counter() - t, 1
+
+
+@benchmark("dll_find_by_id", "per_call")
+def bench_dll_find_by_id(fx):
+    lib = fx.library()
+    ids = fx.sample_ids()
+    t = time.perf_counter()
+    for song_id in ids:
+        lib.find_by_id(song_id)
+    return time.perf_counter() - t, len(ids)
+
+
+@benchmark("dll_delete", "per_call")
+def bench_dll_delete(fx):
+    lib = fx.library()
+    ids = list(dict.fromkeys(fx.sample_ids()))
+    t = time.perf_counter()
+    for song_id in ids:
+        lib.delete(song_id)
+    elapsed = time.perf_counter() - t
+    for song_id in ids:  # kembalikan (masuk lagi di tail)
+        lib.add(fx.songs[song_id - 1])
+    return elapsed, len(ids)
+
+
+@benchmark("dll_search", "per_call")
+def bench_dll_search(fx):
+    lib = fx.library()
+    keywords = ["midnight rain", "42", "jazz", "tidak ada"]
+    t = time.perf_counter()
+    for kw in keywords:
+        lib.search(kw)
+    return time.perf_counter() - t, len(keywords)
+
+
+@benchmark("queue_enqueue_dequeue")
+def bench_queue(fx):
+    q = Queue()
+    t = time.perf_counter()
+    for s in fx.songs:
+        q.enqueue(s)
+    while q.dequeue() is not None:
+        pass
+    return time.perf_counter() - t, 1
+
+
+@benchmark("stack_push")
+def bench_stack(fx):
+    st = Stack()
+    t = time.perf_counter()
+    for s in fx.songs:
+        st.push(s)
+    return time.perf_counter() - t, 1
+
+
+@benchmark("load_library")
+def bench_load_library(fx):
+    player = MusicPlayer(fx.empty_dir("load_library"))
+    player.data_dir = fx.data_dir()
+    t = time.perf_counter()
+    player.load_library()
+    return time.perf_counter() - t, 1
+
+
+@benchmark("load_playlists")
+def bench_load_playlists(fx):
+    player = fx.player()
+    own_dir = player.data_dir
+    player.data_dir = fx.data_dir()
+    saved, player.playlists = player.playlists, {}
+    try:
+        t = time.perf_counter()
+        player.load_playlists()
+        return time.perf_counter() - t, 1
+    finally:
+        player.data_dir = own_dir
+        player.playlists = saved
+
+
+@benchmark("search", "per_call")
+def bench_search(fx):
+    player = fx.player()
+    keywords = ["midnight rain", "42", "jazz", "tidak ada"]
+    t = time.perf_counter()
+    for kw in keywords:
+        player.library.search(kw)
+    return time.perf_counter() - t, len(keywords)
+
+
+@benchmark("search_cached", "per_call")
+def bench_search_cached(fx):
+    """Seperti search-as-you-type: "mid", "midn", ... (refinement prefix), lalu diulang (cache hit)."""
+    player = fx.player()
+    player.search_cache = SearchCache()  # mulai dingin di tiap pengulangan
+    typed = ["midnight rain"[:end] for end in range(3, 14)] + ["jazz", "tidak ada"]
+    t = time.perf_counter()
+    for kw in typed + typed:
+        player.search_ids(kw)
+    return time.perf_counter() - t, 2 * len(typed)
+
+
+@benchmark("next_song", "per_call")
+def bench_next_song(fx):
+    player = fx.player()
+    player.current_mode = "library"
+    player.list_order = "asc"
+    player.current_song = player.library.head.song
+    t = time.perf_counter()
+    for _ in range(SAMPLE_CALLS):
+        player.current_song = player.next_song()
+    return time.perf_counter() - t, SAMPLE_CALLS
+
+
+@benchmark("library_has_duplicate", "per_call")
+def bench_library_has_duplicate(fx):
+    player = fx.player()
+    calls = 20
+    t = time.perf_counter()
+    for i in range(calls):
+        # bukan duplikat -> worst case (harus cek semuanya)
+        player.library_has_duplicate(f"Lagu Baru {i}", "Artis Baru", f"/baru/{i}.mp3")
+    return time.perf_counter() - t, calls
+
+
+@benchmark("sorted_page", "per_call")
+def bench_sorted_page(fx):
+    player = fx.player()
+    player.sorted_songs("title", stop=1)  # gabung buffer index di luar pengukuran
+    starts = [fx.rng.randrange(fx.n) for _ in range(200)]
+    t = time.perf_counter()
+    for start in starts:
+        player.sorted_songs("title", start=start, stop=start + 30)
+    return time.perf_counter() - t, len(starts)
+
+
+@benchmark("range_query", "per_call")
+def bench_range_query(fx):
+    player = fx.player()
+    player.songs_in_range("year", 2000, 2000, limit=1)
+    years = [fx.rng.randrange(1950, 2026) for _ in range(200)]
+    t = time.perf_counter()
+    for year in years:
+        player.songs_in_range("year", year, year + 9, limit=30)
+    return time.perf_counter() - t, len(years)
+
+
+@benchmark("facet_filter", "per_call")
+def bench_facet_filter(fx):
+    player = fx.player()
+    genres = sorted(player.facets["genre"].counts)
+    decades = sorted(player.facets["decade"].counts)
+    queries = [(fx.rng.choice(genres), fx.rng.choice(decades)) for _ in range(50)]
+    t = time.perf_counter()
+    for genre, decade in queries:
+        player.filter_songs(0, 50, genre=genre, decade=[decade, decade + 10], favorite=False)
+    return time.perf_counter() - t, len(queries)
+
+
+@benchmark("facet_counts", "per_call")
+def bench_facet_counts(fx):
+    """Drill-down Browse: jumlah per dekade & artis di dalam satu genre."""
+    player = fx.player()
+    genres = sorted(player.facets["genre"].counts)
+    picks = [fx.rng.choice(genres) for _ in range(10)]
+    t = time.perf_counter()
+    for genre in picks:
+        player.facet_counts("decade", None, genre=genre)
+        player.facet_counts("artist", 100, genre=genre)
+    return time.perf_counter() - t, len(picks)
+
+
+@benchmark("fuzzy_search", "per_call")
+def bench_fuzzy_search(fx):
+    """Query dengan satu typo (ganti/tukar huruf) per kata; index dibangun di luar waktu ukur."""
+    player = fx.player()
+    player.build_fuzzy_index()
+    # regresi: kata 2 huruf harus terjangkau dari query 3 huruf dengan 1 typo
+    probe = FuzzyIndex()
+    probe.add(Song(1, "Let It Be", "The Beatles", "rock", ""))
+    tiers = probe.match("let it bee")
+    if not tiers or list(tiers[-1].ids()) != [1]:
+        raise AssertionError("fuzzy 'let it bee' does not find 'Let It Be'")
+    queries = []
+    for song in fx.rng.sample(fx.songs, 50):
+        words = [w for w in song.title.lower().split() if len(w) > 3 and not w.isdigit()][:2]
+        typo = []
+        for word in words:
+            i = fx.rng.randrange(len(word) - 1)
+            typo.append(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+        queries.append(" ".join(typo) or song.artist)
+    t = time.perf_counter()
+    for query in queries:
+        player.fuzzy_search(query, 20)
+    return time.perf_counter() - t, len(queries)
+
+
+@benchmark("playlist_move", "per_call")
+def bench_playlist_move(fx):
+    pll = IndexableSkipList(fx.songs, seed=fx.n)
+    moves = [(fx.rng.randrange(fx.n), fx.rng.randrange(fx.n)) for _ in range(200)]
+    t = time.perf_counter()
+    for src, dst in moves:
+        pll.move(src, dst)
+        pll.get(dst)
+    return time.perf_counter() - t, len(moves)
+
+
+#  runner
+def growth_exponent(points):
+    """Slope regresi log(waktu) terhadap log(n); None kalau titik < 2."""
+    pts = [(math.log(n), math.log(t)) for n, t in points if t and t > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    den = sum((x - mx) ** 2 for x, _ in pts)
+    if den == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in pts) / den
+
+
+def classify(exponent, kind):
+    if exponent is None:
+        return "?"
+    labels = ["O(1)", "O(n)", "O(n^2)", "O(n^3)"]
+    if kind == "per_call":
+        labels = ["O(1)/call", "O(n)/call", "O(n^2)/call", "O(n^3)/call"]
+    return labels[max(0, min(len(labels) - 1, int(round(exponent))))]
+
+
+def run(sizes, seed=0, budget=30.0, only=None, log=sys.stderr, fixture_factory=None):
+    """Jalankan semua benchmark. Ukuran berikutnya dilewati kalau perkiraan
+    waktunya (dari pertumbuhan yang teramati) melebihi budget detik."""
+    benches = [b for b in BENCHMARKS if not only or b[0] in only]
+    results = {name: {"kind": kind, "unit": "seconds", "times": {}, "wall": {}}
+               for name, kind, _fn in benches}
+    with tempfile.TemporaryDirectory(prefix="groovy-bench-") as root:
+        for n in sorted(sizes):
+            t0 = time.perf_counter()
+            fx = fixture_factory(n, seed, root) if fixture_factory else Fixture(n, seed, root)
+            print(f"[n={n}] fixture ready in {time.perf_counter() - t0:.2f}s", file=log)
+            for name, kind, fn in benches:
+                res = results[name]
+                if any(v is None for v in res["times"].values()):
+                    res["times"][str(n)] = None  # sudah dilewati di ukuran sebelumnya
+                    continue
+                if res["wall"]:
+                    last_n = max(res["wall"])
+                    exp = growth_exponent([(int(k), v) for k, v in res["wall"].items()]) or 1.0
+                    estimate = res["wall"][last_n] * (n / last_n) ** max(1.0, exp)
+                    if estimate > budget:
+                        print(f"  {name:<24} skipped (estimated {estimate:.0f}s > budget {budget:.0f}s)", file=log)
+                        res["times"][str(n)] = None
+                        continue
+                best = None
+                wall = time.perf_counter()
+                repeats = max(1, min(5, 20_000 // n))
+                for _ in range(repeats):
+                    elapsed, calls = fn(fx)
+                    value = elapsed / calls
+                    best = value if best is None else min(best, value)
+                res["wall"][n] = (time.perf_counter() - wall) / repeats
+                res["times"][str(n)] = best
+                print(f"  {name:<24} {best:.6g}s{'/call' if kind == 'per_call' else ''}", file=log)
+            del fx
+
+    for name, res in results.items():
+        points = [(int(k), v) for k, v in res["times"].items() if v is not None]
+        res["exponent"] = growth_exponent(points)
+        res["growth"] = classify(res["exponent"], res["kind"])
+        del res["wall"]
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sorted(sizes),
+            "seed": seed,
+            "budget_seconds": budget,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def format_summary(report):
+    sizes = report["meta"]["sizes"]
+    header = f"{'operation':<24}{'kind':<10}" + "".join(f"{n:>12}" for n in sizes) + f"{'exp':>8}  growth"
+    lines = [header, "-" * len(header)]
+    for name, res in report["results"].items():
+        cells = []
+        for n in sizes:
+            v = res["times"].get(str(n))
+            cells.append(f"{'skip':>12}" if v is None else f"{v:>12.3g}")
+        exp = res["exponent"]
+        # per_call seharusnya ~O(1), total seharusnya ~O(n)
+        flag = "  <-- check" if exp is not None and exp > (0.5 if res["kind"] == "per_call" else 1.5) else ""
+        lines.append(f"{name:<24}{res['kind']:<10}" + "".join(cells)
+                     + f"{'' if exp is None else format(exp, '.2f'):>8}  {res['growth']}{flag}")
+    return "\n".join(lines)
+
+
+#  stress test thread-safety
+def check_consistency(player):
+    """Cek invariant library/index/playlist/favorit. Return daftar masalah (kosong = OK)."""
+    problems = []
+    with player.lock.read:
+        songs = list(player.library)
+        ids = {s.id for s in songs}
+        if len(songs) != player.library.size or len(ids) != len(songs):
+            problems.append(f"library size {player.library.size} != {len(songs)} nodes / {len(ids)} ids")
+        for index_name in ("artist_index", "genre_index"):
+            index = getattr(player, index_name)
+            indexed = sum(bucket.size for bucket in index.values())
+            expected = sum(1 for s in songs if player._norm(s.artist if index_name == "artist_index" else s.genre))
+            if indexed != expected:
+                problems.append(f"{index_name} holds {indexed} songs, expected {expected}")
+        facet_total = sum(player.facets["favorite"].counts.values())
+        if facet_total != len(songs) or len(player.facets["favorite"].bitmap(True)) != len(player.favorites):
+            problems.append(f"favorite facet holds {facet_total} songs, expected {len(songs)}")
+        if player.facets["genre"].counts != {key: bucket.size for key, bucket in player.genre_index.items()}:
+            problems.append("genre facet counts out of sync")
+        for keyword in ("rain", "rai", "pop"):
+            if list(player.search_ids(keyword)) != [s.id for s in player.library.iter_search(keyword)]:
+                problems.append(f"cached search {keyword!r} out of sync")
+        if player.fuzzy is not None:
+            words = sum(len(FuzzyIndex.tokens(s.title, s.artist)) for s in songs)
+            if sum(player.fuzzy.postings.counts.values()) != words:
+                problems.append("fuzzy index word postings out of sync")
+        if sum(player._path_keys.values()) != sum(1 for s in songs if player._norm_path(s.file_path)):
+            problems.append("_path_keys count mismatch")
+        for name, pll in player.playlists.items():
+            missing = [s.id for s in pll if s.id not in ids]
+            if missing:
+                problems.append(f"playlist {name!r} references deleted songs {missing[:5]}")
+            order = [s.id for s in pll]
+            if len(order) != pll.size or any(pll.index_of(song_id) != i for i, song_id in enumerate(order[:200])):
+                problems.append(f"playlist {name!r} positions out of sync")
+        missing = [song_id for song_id in player.favorites if song_id not in ids]
+        if missing:
+            problems.append(f"favorites reference deleted songs {missing[:5]}")
+    return problems
+
+
+def stress(seconds=5.0, threads=8, n=5000, seed=0, log=sys.stderr):
+    """Hantam MusicPlayer dari banyak thread (pembaca + penulis) lalu cek konsistensinya."""
+    with tempfile.TemporaryDirectory(prefix="groovy-stress-") as root:
+        fx = Fixture(n, seed, root)
+        player = fx.player()
+        # seperti GUI/server/CLI: simpan lewat write-behind, bukan tulis+fsync di bawah write lock
+        player.enable_write_behind()
+        admin, user = AdminController(player), UserController(player)
+        for name in ("A", "B", "C"):
+            player.create_playlist(name)
+            for song in fx.songs[: n // 10]:
+                player.add_to_playlist(name, song.id)
+        errors = []
+        counts = {}
+        stop = threading.Event()
+        keywords = ["rain", "midnight", "pop", "1", "tidak ada"]
+
+        def reader(i):
+            rng = random.Random(f"{seed}-r{i}")
+            done = 0
+            while not stop.is_set():
+                op = rng.randrange(6)
+                if op == 0:
+                    user.search(rng.choice(keywords))
+                elif op == 5:
+                    user.fuzzy_search(rng.choice(keywords) + "x")
+                elif op == 1:
+                    for _ in user.iter_search(rng.choice(keywords)):
+                        pass
+                elif op == 2:
+                    user.get_playlist_songs(rng.choice("ABC"))
+                elif op == 3:
+                    player.library_has_duplicate("x", "y", f"/none/{done}")
+                else:
+                    user.get_favorites()
+                done += 1
+            return done
+
+        def writer(i):
+            rng = random.Random(f"{seed}-w{i}")
+            done = 0
+            while not stop.is_set():
+                op = rng.randrange(7)
+                song_id = rng.randrange(1, n + 1)
+                if op == 0:
+                    admin.delete_song(song_id)
+                elif op == 1:
+                    admin.add_song(f"Stress {i}-{done}", f"Artist {i}", "pop", "", 2024, "3:00",
+                                   f"/stress/{i}/{done}.mp3")
+                elif op == 2:
+                    user.add_to_playlist(song_id, rng.choice("ABC"), rng.choice([None, 0, n // 20]))
+                elif op == 3:
+                    user.toggle_favorite(song_id)
+                elif op == 4:
+                    song = player.next_song() or player.random_song("library")
+                    if song:
+                        player.record_play(song, "library")
+                elif op == 5:
+                    user.remove_from_playlist(song_id, rng.choice("ABC"))
+                else:
+                    user.move_in_playlist(rng.choice("ABC"), rng.randrange(n // 10), rng.randrange(n // 10))
+                done += 1
+            return done
+
+        def run(kind, fn, i):
+            try:
+                counts[f"{kind}-{i}"] = fn(i)
+            except Exception as e:
+                errors.append(f"{kind}-{i}: {type(e).__name__}: {e}")
+                stop.set()
+
+        writers = max(1, threads // 4)
+        pool = [threading.Thread(target=run, args=("writer", writer, i)) for i in range(writers)]
+        pool += [threading.Thread(target=run, args=("reader", reader, i)) for i in range(threads - writers)]
+        print(f"stress: {threads} threads ({writers} writers) for {seconds:.0f}s on {n} songs", file=log)
+        for t in pool:
+            t.start()
+        stop.wait(seconds)
+        stop.set()
+        for t in pool:
+            t.join()
+        player.build_fuzzy_index()  # tunggu build latar (dipicu fuzzy search) lalu ikut dicek
+        player.close()  # end_play + tulis perubahan yang masih tertunda
+        problems = errors + check_consistency(player)
+        reads = sum(v for k, v in counts.items() if k.startswith("reader"))
+        writes = sum(v for k, v in counts.items() if k.startswith("writer"))
+        print(f"stress: {reads} reads, {writes} writes, {len(problems)} problems", file=log)
+        for problem in problems:
+            print("  " + problem, file=log)
+        return {"reads": reads, "writes": writes, "problems": problems}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark struktur data backend Groovy Player (headless).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="lewati ukuran berikutnya jika perkiraan waktu per operasi melebihi ini (detik)")
+    parser.add_argument("--only", nargs="+", help="hanya jalankan operasi tertentu")
+    parser.add_argument("--output", help="tulis hasil JSON ke file (default: stdout)")
+    parser.add_argument("--stress", type=float, metavar="SECONDS",
+                        help="jalankan stress test thread-safety selama SECONDS, bukan benchmark")
+    parser.add_argument("--threads", type=int, default=8, help="jumlah thread untuk --stress")
+    args = parser.parse_args(argv)
+
+    if args.stress:
+        report = stress(args.stress, args.threads, seed=args.seed)
+        return 1 if report["problems"] else 0
+
+    report = run(args.sizes, seed=args.seed, budget=args.budget, only=args.only)
+    print(format_summary(report), file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
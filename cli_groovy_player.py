@@ -0,0 +1,304 @@
+"""Command line Groovy Player (headless, tanpa customtkinter/pygame).
+
+Membangun MusicPlayer + AdminController + UserController langsung di atas
+folder data, untuk operasi massal/terjadwal di server tanpa display. Output
+ditulis baris per baris (streaming), jadi aman di-pipe ke head/grep.
+
+    python cli_groovy_player.py --data-dir data import lagu.csv
+    python cli_groovy_player.py search "hujan" --limit 20
+    python cli_groovy_player.py search "beatels" --fuzzy
+    python cli_groovy_player.py export --format jsonl > backup.jsonl
+    python cli_groovy_player.py dedupe --apply
+    python cli_groovy_player.py playlist add "Road Trip" 12 15 18
+    python cli_groovy_player.py combine difference "Workout tanpa Chill" Workout Chill
+    python cli_groovy_player.py stats
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+from backend_groovy_player import MusicPlayer
+from controller_groovy_player import AdminController, UserController
+
+FIELDS = ["id", "title", "artist", "genre", "album", "year", "duration", "file_path"]
+
+
+def song_dict(song):
+    return {field: getattr(song, field) for field in FIELDS}
+
+
+def read_records(path):
+    """Yield dict lagu dari .json (array songs.json), .jsonl atau .csv; "-" = JSONL dari stdin."""
+    if path == "-":
+        for line in sys.stdin:
+            if line.strip():
+                yield json.loads(line)
+        return
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="" if ext == ".csv" else None) as f:
+        if ext == ".csv":
+            yield from csv.DictReader(f)
+        elif ext == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def write_songs(songs, fmt, out):
+    """Tulis lagu satu per satu dalam format json (array), jsonl, csv atau text. Return jumlah."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+    elif fmt == "json":
+        out.write("[")
+    for song in songs:
+        if fmt == "csv":
+            writer.writerow(song_dict(song))
+        elif fmt == "json":
+            out.write(("," if count else "") + "\n" + json.dumps(song_dict(song)))
+        elif fmt == "jsonl":
+            out.write(json.dumps(song_dict(song)) + "\n")
+        else:
+            out.write(f"{song}\n")
+        count += 1
+    if fmt == "json":
+        out.write("\n]\n")
+    return count
+
+
+def progress(records, every, log):
+    for i, rec in enumerate(records, 1):
+        if every and i % every == 0:
+            print(f"  {i} records read", file=log)
+        yield rec
+
+
+#  subcommands: fungsi(args, player, admin, user) -> exit code
+def cmd_import(args, player, admin, user):
+    total_added = total_skipped = 0
+    for path in args.files:
+        records = progress(read_records(path), args.progress, sys.stderr)
+        try:
+            added, skipped = admin.import_songs(records, save=False)
+        except Exception as e:
+            print(f"Failed to import {path}: {e}", file=sys.stderr)
+            return 1
+        total_added += added
+        total_skipped += skipped
+        print(f"{path}: {added} added, {skipped} skipped (duplicate/invalid)")
+    if total_added and not args.dry_run:
+        player.save_library()
+    print(f"total: {total_added} added, {total_skipped} skipped"
+          + (" (dry run, nothing saved)" if args.dry_run else ""))
+    return 0
+
+
+def cmd_export(args, player, admin, user):
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        count = write_songs(player.library, args.format, out)
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} songs exported", file=sys.stderr)
+    return 0
+
+
+def cmd_search(args, player, admin, user):
+    if args.fuzzy:
+        player.build_fuzzy_index()
+        results = user.fuzzy_search(args.keyword, args.limit)
+    else:
+        results = user.iter_search(args.keyword)
+    if args.limit:
+        results = itertools.islice(results, args.limit)
+    count = write_songs(results, args.format, sys.stdout)
+    print(f"{count} results", file=sys.stderr)
+    return 0
+
+
+def cmd_dedupe(args, player, admin, user):
+    """Lagu di songs.json yang dibuang saat load (id/file/judul+artis duplikat)."""
+    path = player._path("songs.json")
+    if not os.path.isfile(path):
+        print("songs.json not found", file=sys.stderr)
+        return 1
+    kept = set()
+    duplicates = 0
+    for rec in read_records(path):
+        song = player.library.find_by_id(rec.get("id"))
+        if (song is not None and song.id not in kept and song.title == rec.get("title")
+                and song.artist == rec.get("artist") and song.file_path == rec.get("file_path")):
+            kept.add(song.id)
+            continue
+        duplicates += 1
+        print(f"duplicate: {rec.get('id')}: {rec.get('title')} - {rec.get('artist')} ({rec.get('file_path')})")
+    if duplicates and args.apply:
+        player.save_library()
+        player.save_playlists()  # buang id yang sudah tidak ada di library
+        print(f"{duplicates} duplicates removed from songs.json", file=sys.stderr)
+    else:
+        print(f"{duplicates} duplicates found" + (" (use --apply to remove)" if duplicates else ""),
+              file=sys.stderr)
+    return 0
+
+
+def cmd_playlist(args, player, admin, user):
+    if args.action == "list":
+        for name in user.get_playlists():
+            print(f"{name}\t{len(player.get_playlist(name))}")
+        return 0
+    if not args.name:
+        print("playlist name is required", file=sys.stderr)
+        return 2
+    if args.action == "show":
+        if player.get_playlist(args.name) is None:
+            print(f"playlist not found: {args.name}", file=sys.stderr)
+            return 1
+        write_songs(player.get_playlist(args.name), args.format, sys.stdout)
+        return 0
+    if args.action == "create":
+        return 0 if user.create_playlist(args.name) else 1
+
+    # add/remove banyak id sekaligus lewat controller (lock & validasi seperti API);
+    # write-behind menggabungkan penyimpanan jadi sekali tulis saat close()
+    name = args.name.strip()
+    if args.action == "remove" and player.get_playlist(name) is None:
+        print(f"playlist not found: {name}", file=sys.stderr)
+        return 1
+    if args.action == "add" and not user.create_playlist(name):
+        print(f"invalid playlist name: {args.name!r}", file=sys.stderr)
+        return 1
+    player.enable_write_behind()
+    changed = 0
+    try:
+        for song_id in args.ids:
+            if args.action == "add":
+                ok = user.add_to_playlist(song_id, name)
+            else:
+                ok = user.remove_from_playlist(song_id, name)
+            if not ok:
+                print(f"skipped {song_id}", file=sys.stderr)
+                continue
+            changed += 1
+    finally:
+        player.close()
+    print(f"{changed} songs {'added to' if args.action == 'add' else 'removed from'} {name}")
+    return 0
+
+
+def cmd_combine(args, player, admin, user):
+    ok, msg = user.combine_playlists(args.op, args.sources, args.target, args.order)
+    print(msg, file=sys.stdout if ok else sys.stderr)
+    return 0 if ok else 1
+
+
+def cmd_stats(args, player, admin, user):
+    def top(facet, n=10):
+        return [[label, count] for key, label, count in user.get_facet_counts(facet, n)]
+
+    stats = {
+        "songs": len(player.library),
+        "artists": len(player.facets["artist"].counts),
+        "albums": len(player.facets["album"].counts),
+        "genres": len(player.facets["genre"].counts),
+        "playlists": {name: len(pll) for name, pll in player.playlists.items()},
+        "favorites": len(player.favorites),
+        "plays": len(player.listening_log),
+        "top_genres": top("genre"),
+        "top_artists": top("artist"),
+        "top_albums": top("album"),
+        "decades": sorted(top("decade", None)),
+        "trending": [[s.id, s.title, s.artist] for s in user.get_trending(10)],
+    }
+    if args.json:
+        json.dump(stats, sys.stdout, indent=2)
+        print()
+        return 0
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for name, size in value.items():
+                print(f"  {name}: {size}")
+        elif isinstance(value, list):
+            print(f"{key}:")
+            for row in value:
+                print("  " + " | ".join(str(v) for v in row))
+        else:
+            print(f"{key}: {value}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Groovy Player headless CLI.")
+    parser.add_argument("--data-dir", default=".", help="folder songs.json/playlists.json (default: .)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    formats = ["text", "json", "jsonl", "csv"]
+
+    p = sub.add_parser("import", help="import lagu dari .json/.jsonl/.csv ('-' = JSONL stdin)")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--dry-run", action="store_true", help="cek saja, jangan simpan songs.json")
+    p.add_argument("--progress", type=int, default=100_000, help="laporan progres tiap N record (0 = mati)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="export library")
+    p.add_argument("--format", choices=formats, default="json")
+    p.add_argument("-o", "--output", help="file output (default: stdout)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("search", help="cari judul/artis/genre")
+    p.add_argument("keyword")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--fuzzy", action="store_true", help="toleran typo di judul/artis, paling cocok dulu")
+    p.add_argument("--format", choices=formats, default="text")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("dedupe", help="laporkan (dan buang) lagu duplikat di songs.json")
+    p.add_argument("--apply", action="store_true", help="tulis ulang songs.json tanpa duplikat")
+    p.set_defaults(func=cmd_dedupe)
+
+    p = sub.add_parser("playlist", help="list/show/create/add/remove playlist")
+    p.add_argument("action", choices=["list", "show", "create", "add", "remove"])
+    p.add_argument("name", nargs="?")
+    p.add_argument("ids", nargs="*", type=int)
+    p.add_argument("--format", choices=formats, default="text")
+    p.set_defaults(func=cmd_playlist)
+
+    p = sub.add_parser("combine", help="playlist baru dari union/intersection/difference playlist lain")
+    p.add_argument("op", choices=list(MusicPlayer.PLAYLIST_SET_OPS))
+    p.add_argument("target", help="nama playlist baru")
+    p.add_argument("sources", nargs="+", help="playlist sumber (difference: pertama dikurangi sisanya)")
+    p.add_argument("--order", default="playlist",
+                   help="playlist (urutan sumber), id, atau title/artist/album/year/duration")
+    p.set_defaults(func=cmd_combine)
+
+    p = sub.add_parser("stats", help="ringkasan library, playlist & history")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.data_dir):
+        print(f"data dir not found: {args.data_dir}", file=sys.stderr)
+        return 1
+    player = MusicPlayer(args.data_dir)
+    try:
+        return args.func(args, player, AdminController(player), UserController(player))
+    except BrokenPipeError:
+        # output di-pipe ke head dsb. yang sudah ditutup
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
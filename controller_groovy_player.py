@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import itertools
+
 from backend_groovy_player import MusicPlayer, Song
 
 
@@ -7,10 +9,18 @@ class AdminController:
     def __init__(self, player: MusicPlayer):
         self.player = player
 
-    def list_songs(self):
-        return self.player.library.get_all()
+    def list_songs(self, sort_by=None, reverse=False):
+        """Semua lagu; sort_by None = urutan ditambahkan, atau title/artist/album/year/duration."""
+        if sort_by:
+            return self.player.sorted_songs(sort_by, reverse)
+        with self.player.lock.read:
+            return list(reversed(self.player.library)) if reverse else self.player.library.get_all()
 
     def add_song(self, title, artist, genre, album, year, duration, file_path):
+        with self.player.lock.write:  # cek duplikat + ambil id + tambah harus atomik
+            return self._add_song(title, artist, genre, album, year, duration, file_path)
+
+    def _add_song(self, title, artist, genre, album, year, duration, file_path):
         # Prevent duplicate songs in library
         try:
             if self.player.library_has_duplicate(title, artist, file_path):
@@ -22,7 +32,7 @@ class AdminController:
         try:
             song = Song(self.player.get_next_id(), title, artist, genre, album,
                         int(year) if year else None, duration, file_path)
-            self.player.library.add(song)
+            self.player.add_library_song(song)
             # persist library
             try:
                 self.player.save_library()
@@ -32,8 +42,48 @@ class AdminController:
         except Exception as e:
             return False, str(e)
 
+    def list_songs_page(self, cursor=None, limit=50):
+        """(songs, next_cursor) urut ditambahkan; next_cursor None = halaman terakhir."""
+        with self.player.lock.read:
+            return self.player.library.page(cursor, limit)
+
+    def import_songs(self, records, save=True, batch=1000):
+        """Bulk import dict lagu (format songs.json; id diabaikan). Duplikat dilewati.
+        Write lock dipegang per batch supaya pencarian tetap jalan selama import besar.
+        Library disimpan sekali di akhir, bukan per lagu. Return (added, skipped)."""
+        added = skipped = 0
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, batch))
+            if not chunk:
+                break
+            with self.player.lock.write:
+                for rec in chunk:
+                    try:
+                        title, artist, file_path = rec.get("title"), rec.get("artist"), rec.get("file_path")
+                        if not title or self.player.library_has_duplicate(title, artist, file_path):
+                            skipped += 1
+                            continue
+                        year = rec.get("year")
+                        song = Song(self.player.get_next_id(), title, artist, rec.get("genre"),
+                                    rec.get("album"), int(year) if year else None,
+                                    rec.get("duration"), file_path)
+                    except Exception:
+                        skipped += 1
+                        continue
+                    self.player.add_library_song(song)
+                    added += 1
+        if save and added:
+            self.player.save_library()
+        return added, skipped
+
     def delete_song(self, song_id):
-        ok = self.player.library.delete(song_id)
+        # library + playlist + favorit dihapus sebagai satu operasi atomik
+        with self.player.lock.write:
+            return self._delete_song(song_id)
+
+    def _delete_song(self, song_id):
+        ok = self.player.remove_library_song(song_id)
 
         # also remove from ALL playlists (ignore if not present)
         try:
@@ -41,6 +91,12 @@ class AdminController:
         except Exception:
             pass
 
+        # and from favorites (O(1), persisted as a single remove record)
+        try:
+            self.player.remove_favorite(song_id)
+        except Exception:
+            pass
+
         # persist library
         try:
             self.player.save_library()
@@ -48,6 +104,9 @@ class AdminController:
             pass
         return ok
 
+    def compact_history(self, before=None):
+        return self.player.compact_history(before)
+
 
 class UserController:
     """Contains user-facing operations (search, playlists, favs, history)."""
@@ -55,7 +114,81 @@ class UserController:
         self.player = player
 
     def search(self, keyword):
-        return self.player.library.search(keyword)
+        with self.player.lock.read:
+            return self.player.songs_by_ids(self.player.search_ids(keyword))
+
+    def fuzzy_search(self, keyword, limit=50):
+        """Search toleran typo ("beatels" -> Beatles), paling cocok dulu."""
+        return self.player.fuzzy_search(keyword, limit)
+
+    def iter_search(self, keyword, batch=500):
+        """Hasil search streaming; read lock hanya dipegang selama mengambil tiap batch.
+        Node yang dihapus di sela batch tetap menunjuk ke node berikutnya, jadi iterasi aman."""
+        results = self.player.library.iter_search(keyword)
+        while True:
+            with self.player.lock.read:
+                chunk = list(itertools.islice(results, batch))
+            if not chunk:
+                return
+            yield from chunk
+
+    def search_chunks(self, keyword, chunk=20, max_scan=10_000):
+        """Hasil search bertahap untuk search-as-you-type: tiap next() memeriksa paling
+        banyak max_scan lagu (read lock hanya selama itu) dan memberi list hasil, boleh
+        kosong. Query yang sudah basi dibatalkan cukup dengan berhenti memanggil next().
+
+        Memakai cache search player: hasil yang sudah ada dipotong langsung, hasil
+        prefix yang ada disaring, dan hasil yang selesai dihitung ikut disimpan.
+        """
+        player = self.player
+        key = keyword.lower()
+        match = player.library.matcher(keyword)
+        with player.lock.read:
+            generation = player.generation
+            cached = player.search_cache.get(key, generation)
+            base = player.search_cache.prefix(key, generation) if cached is None else None
+            if base is not None and len(base) * 2 > player.library.size:
+                base = None  # hampir seluruh library: scan biasa lebih murah
+        if cached is not None:
+            for start in range(0, len(cached), chunk):
+                with player.lock.read:
+                    songs = player.songs_by_ids(cached[start:start + chunk])
+                yield songs
+            return
+
+        found = []
+        if base is not None:
+            for start in range(0, len(base), max_scan):
+                with player.lock.read:
+                    songs = [s for s in player.songs_by_ids(base[start:start + max_scan]) if match(s)]
+                found.extend(s.id for s in songs)
+                for i in range(0, len(songs), chunk):
+                    yield songs[i:i + chunk]
+                if not songs:
+                    yield []
+        else:
+            cursor = None
+            while True:
+                with player.lock.read:
+                    songs, cursor = player.library.page(cursor, chunk, match, max_scan)
+                found.extend(s.id for s in songs)
+                yield songs
+                if cursor is None:
+                    break
+        with player.lock.read:
+            # library berubah di sela potongan: hasilnya campuran dua generasi, jangan disimpan
+            if player.generation == generation:
+                player.search_cache.put(key, found, generation)
+
+    def search_page(self, keyword, cursor=None, limit=50, max_scan=None):
+        """Satu halaman hasil search -> (songs, next_cursor). max_scan membatasi jumlah lagu
+        yang diperiksa per panggilan supaya latensi tetap kecil di library besar."""
+        with self.player.lock.read:
+            return self.player.library.page(cursor, limit, self.player.library.matcher(keyword), max_scan)
+
+    def songs_in_range(self, field, lo=None, hi=None, reverse=False, limit=None):
+        """Mis. ("year", 1990, 1999) atau ("duration", None, 179) untuk lagu < 3 menit."""
+        return self.player.songs_in_range(field, lo, hi, reverse, limit)
 
     # ---- multi-playlist operations ----
     def create_playlist(self, name: str):
@@ -64,26 +197,102 @@ class UserController:
     def get_playlists(self):
         return self.player.get_playlist_names()
 
-    def get_playlist_songs(self, playlist_name: str):
-        pll = self.player.get_playlist(playlist_name)
-        return pll.get_all() if pll else []
+    def get_playlist_songs(self, playlist_name: str, start=0, stop=None):
+        """Lagu playlist di posisi [start:stop] (default semua); lompat ke posisi O(log n)."""
+        with self.player.lock.read:
+            pll = self.player.get_playlist(playlist_name)
+            if not pll:
+                return []
+            return pll.get_all() if start == 0 and stop is None else list(pll.view(start, stop))
+
+    def get_playlist_page(self, playlist_name: str, cursor=None, limit=50):
+        with self.player.lock.read:
+            pll = self.player.get_playlist(playlist_name)
+            return pll.page(cursor, limit) if pll else ([], None)
 
-    def add_to_playlist(self, song_id, playlist_name="My Playlist"):
-        return self.player.add_to_playlist(playlist_name, song_id)
+    def add_to_playlist(self, song_id, playlist_name="My Playlist", position=None):
+        return self.player.add_to_playlist(playlist_name, song_id, position)
+    def move_in_playlist(self, playlist_name, src, dst):
+        return self.player.move_in_playlist(playlist_name, src, dst)
     def remove_from_playlist(self, song_id, playlist_name):
         return self.player.remove_from_playlist(playlist_name, song_id)
+    def combine_playlists(self, op, names, target, order="playlist"):
+        """Playlist baru dari union/intersection/difference beberapa playlist -> (ok, msg)."""
+        try:
+            count = self.player.combine_playlists(op, names, target, order)
+        except ValueError as e:
+            return False, str(e)
+        return True, f"{count} songs saved to '{target.strip()}'"
+
+
+    # ---- queue ----
+    def add_to_queue(self, song_id):
+        with self.player.lock.write:
+            song = self.player.library.find_by_id(song_id)
+            if song is None:
+                return False
+            self.player.queue.enqueue(song)
+            return True
+
+    def get_queue(self):
+        with self.player.lock.read:
+            return self.player.queue.get_all()
+
+    # ---- filter facet (genre/artist/decade/favorite) ----
+    def filter_songs(self, start=0, stop=None, **filters):
+        """filter_songs(genre="pop", decade=2000, favorite=True) -> lagu urut id, [start:stop]."""
+        return self.player.filter_songs(start, stop, **filters)
 
+    def count_filtered(self, **filters):
+        return len(self.player.filter_ids(**filters))
+
+    def get_facet_counts(self, facet, limit=None, **filters):
+        """[(key, label, jumlah)] per nilai facet, dihitung di dalam filter (kalau ada)."""
+        return self.player.facet_counts(facet, limit, **filters)
+
+    def queue_filtered(self, limit=None, **filters):
+        """Masukkan hasil filter ke antrian (diputar next_song lebih dulu). Return jumlah lagu."""
+        with self.player.lock.write:
+            songs = self.player.filter_songs(0, limit, **filters)
+            self.player.queue.extend(songs)
+            return len(songs)
 
     # ---- favorites & history ----
     def toggle_favorite(self, song_id):
-        if song_id in self.player.favorites:
-            self.player.favorites.remove(song_id)
-            return False
-        self.player.favorites.add(song_id)
-        return True
+        with self.player.lock.write:
+            if song_id in self.player.favorites:
+                self.player.remove_favorite(song_id)
+                return False
+            return self.player.add_favorite(song_id)
 
     def get_favorites(self):
-        return [s for s in self.player.library.get_all() if s.id in self.player.favorites]
+        return self.player.get_favorite_songs()
+
+    def get_favorites_page(self, cursor=None, limit=50):
+        """Favorit urut waktu difavoritkan -> (songs, next_cursor)."""
+        with self.player.lock.read:
+            return self.player.favorites.songs.page(cursor, limit)
 
     def get_history(self):
         return list(reversed(self.player.history.get_all()))
+
+    def get_history_page(self, cursor=None, limit=50):
+        """Riwayat dari listening log, terbaru dulu -> ([(song, start_ts, ms_played, mode)], next_cursor).
+        song None jika sudah dihapus dari library."""
+        records, next_cursor = self.player.plays_page(cursor, limit)
+        find = self.player.library.find_by_id
+        return [(find(song_id), ts, ms, mode) for song_id, ts, ms, mode in records], next_cursor
+
+    def get_play_count(self, song_id):
+        return self.player.play_count(song_id)
+
+    def get_plays_between(self, start_ts=None, end_ts=None):
+        """Yield (song, start_ts, ms_played, mode); song None jika sudah dihapus dari library."""
+        for song_id, start_ts, ms_played, mode in self.player.plays_between(start_ts, end_ts):
+            yield self.player.library.find_by_id(song_id), start_ts, ms_played, mode
+
+    def get_trending(self, n=20):
+        return self.player.trending_songs(n)
+
+    def get_recommendations(self, k=20):
+        return self.player.recommend_songs(k)
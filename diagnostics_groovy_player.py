@@ -0,0 +1,287 @@
+"""Diagnostik runtime Groovy Player: instrumentasi latensi method dan watchdog
+main loop Tk.
+
+Instrumentasi opt-in: set GROOVY_INSTRUMENT=1 sebelum menjalankan GUI, atau
+aktifkan dari panel diagnostik (Ctrl+Shift+D). Tidak mengimpor GUI/pygame, jadi
+bisa dipakai juga dari script headless.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class LatencyHistogram:
+    """Histogram latensi dengan bucket logaritmik (8 sub-bucket per kelipatan 2, error <13%).
+
+    Index bucket dihitung dari bit_length (tanpa log/float), memori tetap
+    kecil berapa pun jumlah sampelnya, dan record() O(1).
+    """
+    SUB_BITS = 3
+
+    def __init__(self):
+        self.buckets = [0] * (64 << self.SUB_BITS)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        bits = ns.bit_length()
+        if bits > self.SUB_BITS:
+            idx = (bits << self.SUB_BITS) | ((ns >> (bits - 1 - self.SUB_BITS)) & ((1 << self.SUB_BITS) - 1))
+        else:
+            idx = ns if ns > 0 else 0
+        self.buckets[idx] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def _bucket_upper(self, idx):
+        bits = idx >> self.SUB_BITS
+        if bits <= self.SUB_BITS:
+            return idx
+        sub = idx & ((1 << self.SUB_BITS) - 1)
+        return ((1 << self.SUB_BITS) + sub + 1) << (bits - 1 - self.SUB_BITS)
+
+    def percentile(self, p):
+        """Perkiraan persentil p (0-100) dalam nanodetik (batas atas bucket)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for idx, n in enumerate(self.buckets):
+            if n:
+                seen += n
+                if seen >= rank:
+                    return float(min(self._bucket_upper(idx), self.max_ns))
+        return float(self.max_ns)
+
+    def summary(self):
+        ms = 1e-6
+        return {
+            "count": self.count,
+            "mean_ms": (self.total_ns / self.count * ms) if self.count else 0.0,
+            "p50_ms": self.percentile(50) * ms,
+            "p95_ms": self.percentile(95) * ms,
+            "p99_ms": self.percentile(99) * ms,
+            "max_ms": self.max_ns * ms,
+            "total_ms": self.total_ns * ms,
+        }
+
+
+class Instrumentation:
+    """Bungkus method publik sebuah object untuk mencatat jumlah panggilan & latensi.
+
+    Pencatatan tidak memakai lock supaya overhead per panggilan kecil; di bawah
+    kontensi thread yang berat hitungannya bisa meleset sedikit (cukup untuk diagnostik).
+    """
+    def __init__(self):
+        self.histograms = {}  # "Class.method" -> LatencyHistogram
+        self._wrapped = []    # (object, [nama method])
+
+    def _histogram(self, key):
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LatencyHistogram()
+        return hist
+
+    def _timed(self, key, method):
+        clock = time.perf_counter_ns
+        instr = self
+
+        if inspect.isgeneratorfunction(method):
+            # generator: yang diukur adalah total waktu iterasi (termasuk jeda konsumen)
+            @functools.wraps(method)
+            def gen_wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    yield from method(*args, **kwargs)
+                finally:
+                    instr._histogram(key).record(clock() - start)
+            return gen_wrapper
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                instr._histogram(key).record(clock() - start)
+        return wrapper
+
+    def wrap(self, obj, name=None):
+        """Pasang wrapper di instance (class aslinya tidak diubah). Return jumlah method."""
+        name = name or type(obj).__name__
+        names = []
+        for attr, member in inspect.getmembers(type(obj), inspect.isfunction):
+            if attr.startswith("_") or attr in obj.__dict__:
+                continue
+            setattr(obj, attr, self._timed(f"{name}.{attr}", getattr(obj, attr)))
+            names.append(attr)
+        self._wrapped.append((obj, names))
+        return len(names)
+
+    def unwrap_all(self):
+        for obj, names in self._wrapped:
+            for attr in names:
+                obj.__dict__.pop(attr, None)
+        self._wrapped = []
+
+    @property
+    def enabled(self):
+        return bool(self._wrapped)
+
+    def stats(self):
+        """{"Class.method": {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, total_ms}}"""
+        return {key: hist.summary() for key, hist in sorted(self.histograms.items()) if hist.count}
+
+    def reset(self):
+        self.histograms = {}
+
+
+def format_stats(stats, sort_by="total_ms", limit=None):
+    """Tabel teks dari Instrumentation.stats(), urut dari yang paling mahal."""
+    rows = sorted(stats.items(), key=lambda kv: kv[1][sort_by], reverse=True)
+    if limit:
+        rows = rows[:limit]
+    header = f"{'operation':<42}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'total ms':>11}"
+    lines = [header, "-" * len(header)]
+    for key, st in rows:
+        lines.append(f"{key:<42}{st['count']:>8}{st['p50_ms']:>10.3f}{st['p95_ms']:>10.3f}"
+                     f"{st['p99_ms']:>10.3f}{st['max_ms']:>10.3f}{st['total_ms']:>11.1f}")
+    if not rows:
+        lines.append("(no calls recorded yet)")
+    return "\n".join(lines)
+
+
+class StallWatchdog:
+    """Deteksi main loop Tk yang macet (callback terlalu lama).
+
+    Heartbeat dijadwalkan lewat window.after setiap interval_ms dan lag
+    penjadwalannya diukur. Thread latar memantau heartbeat terakhir; kalau
+    terlambat lebih dari threshold_ms, stack main thread diambil lewat
+    sys._current_frames() selagi masih macet. Setelah main loop jalan lagi,
+    stall dicatat (callback, durasi, stack) ke self.stalls dan ke log.
+    """
+    def __init__(self, window, threshold_ms=200, interval_ms=100, log_path=None, keep=50):
+        self.window = window
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.log_path = log_path
+        self.stalls = deque(maxlen=keep)  # stall terbaru untuk panel diagnostik
+        self.lag = LatencyHistogram()     # lag heartbeat (ns), termasuk yang normal
+        self._main_id = None
+        self._expected = 0.0
+        self._last_beat = 0.0
+        self._captured = None             # (waktu ambil, stack) untuk stall yang sedang berjalan
+        self._job = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Panggil dari thread Tk (main thread)."""
+        if self.running:
+            return
+        self._main_id = threading.get_ident()
+        self._stop.clear()
+        self._last_beat = time.monotonic()
+        self._schedule()
+        self._thread = threading.Thread(target=self._monitor, name="tk-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._job is not None:
+            try:
+                self.window.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _schedule(self):
+        self._expected = time.monotonic() + self.interval
+        self._job = self.window.after(int(self.interval * 1000), self._beat)
+
+    def _beat(self):
+        now = time.monotonic()
+        lag = max(0.0, now - self._expected)
+        self.lag.record(int(lag * 1e9))
+        captured, self._captured = self._captured, None
+        self._last_beat = now
+        if lag >= self.threshold:
+            self._report(lag, captured[1] if captured else None)
+        if not self._stop.is_set():
+            self._schedule()
+
+    def _monitor(self):
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            late = time.monotonic() - self._last_beat - self.interval
+            if late < self.threshold or self._captured is not None:
+                continue
+            frame = sys._current_frames().get(self._main_id)
+            if frame is None:
+                continue
+            self._captured = (time.monotonic(), traceback.extract_stack(frame))
+            del frame
+
+    @staticmethod
+    def culprit(stack):
+        """Callback Tk yang sedang berjalan: frame pertama setelah dispatcher tkinter,
+        atau frame aplikasi terdalam kalau dispatcher tidak ditemukan."""
+        if not stack:
+            return "?"
+        start = None
+        for i, fs in enumerate(stack):
+            if os.path.basename(os.path.dirname(fs.filename)) == "tkinter" and fs.name in ("__call__", "callit"):
+                start = i + 1
+        if start is not None and start < len(stack):
+            fs = stack[start]
+        else:
+            app = [fs for fs in stack if fs.filename.endswith("_groovy_player.py")]
+            fs = app[-1] if app else stack[-1]
+        return f"{fs.name} ({os.path.basename(fs.filename)}:{fs.lineno})"
+
+    def _report(self, lag, stack):
+        stall = {
+            "ts": time.time(),
+            "duration_ms": round(lag * 1000.0, 1),
+            "callback": self.culprit(stack) if stack else "? (stall lebih pendek dari interval pantau)",
+            "stack": "".join(traceback.format_list(stack)) if stack else "",
+        }
+        self.stalls.append(stall)
+        text = (f"[watchdog] Tk main loop stalled {stall['duration_ms']:.0f} ms in {stall['callback']}\n"
+                + stall["stack"])
+        print(text.rstrip(), file=sys.stderr)
+        if self.log_path:
+            try:
+                with open(self.log_path, "a") as f:
+                    f.write(time.strftime("%Y-%m-%d %H:%M:%S ", time.localtime(stall["ts"])) + text + "\n")
+            except Exception as e:
+                print("Failed to write stall log:", e)
+
+
+def format_stalls(watchdog, limit=10):
+    """Ringkasan stall terbaru (paling baru di atas) untuk panel diagnostik."""
+    lag = watchdog.lag.summary()
+    lines = [f"main loop lag: p50 {lag['p50_ms']:.1f} ms  p99 {lag['p99_ms']:.1f} ms  "
+             f"max {lag['max_ms']:.1f} ms  ({len(watchdog.stalls)} stalls >= "
+             f"{watchdog.threshold * 1000:.0f} ms)"]
+    for stall in list(watchdog.stalls)[::-1][:limit]:
+        when = time.strftime("%H:%M:%S", time.localtime(stall["ts"]))
+        lines.append(f"{when}  {stall['duration_ms']:>8.0f} ms  {stall['callback']}")
+    return "\n".join(lines)
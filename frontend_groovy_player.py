@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import os
-import random
+import threading
+import time
 from typing import Optional
 
 import customtkinter as ctk
 import pygame
-from tkinter import messagebox, filedialog, simpledialog, StringVar
+from tkinter import messagebox, filedialog, simpledialog, StringVar, BooleanVar
 
 from backend_groovy_player import MusicPlayer, User, Song
 from controller_groovy_player import AdminController, UserController
+from server_groovy_player import ApiServer
+from diagnostics_groovy_player import Instrumentation, StallWatchdog, format_stalls, format_stats
 
 # safer init for pygame mixer
 try:
@@ -20,25 +23,80 @@ except Exception:
 
 
 
+class GuiTransport:
+    """Transport untuk ApiServer: perintah dari thread API dijalankan di thread Tk
+    (lewat window.after) supaya pygame & widget hanya disentuh dari main loop."""
+    def __init__(self, gui, timeout=5.0):
+        self.gui = gui
+        self.timeout = timeout
+
+    def _call(self, fn, *args):
+        done = threading.Event()
+
+        def run():
+            try:
+                fn(*args)
+            finally:
+                done.set()
+
+        self.gui.window.after(0, run)
+        done.wait(self.timeout)
+
+    def play(self, song, mode=None):
+        self._call(self.gui.play_song, song, mode or self.gui.player.current_mode)
+
+    def pause(self):
+        self._call(self.gui.pause_current)
+
+    def resume(self):
+        self._call(self.gui.resume_current)
+
+    def next(self):
+        self._call(self.gui.play_next)
+
+    def prev(self):
+        self._call(self.gui.play_prev)
+
+    def stop(self):
+        self._call(self.gui.stop_current)
+
+
 class MusicPlayerGUI:
     """The GUI composes the player and controllers. UI/UX methods are kept here."""
+    ADMIN_PAGE_SIZE = 200
+    BROWSE_KEYS = 100  # tombol nilai facet per tab Browse (terbanyak dulu)
+    LIVE_SEARCH_DELAY_MS = 250  # jeda ketikan sebelum search bar atas mulai mencari
+    LIVE_SEARCH_LIMIT = 100     # kartu hasil maksimum dari search bar atas
+    SORT_OPTIONS = {"Date added": None, "Title": "title", "Artist": "artist", "Album": "album",
+                    "Year": "year", "Duration": "duration"}
+
     def __init__(self):
         self.player = MusicPlayer()
+        # simpan library/playlist di thread latar supaya klik tidak menunggu disk
+        self.player.enable_write_behind()
         self.admin = AdminController(self.player)
         self.user = UserController(self.player)
         self.current_user = None
         self.play_buttons = {}
         self.admin_play_buttons = {}
+        self.admin_sort = (None, False)  # (field, descending) untuk daftar lagu admin
 
         # Bottom player widgets
         self.bottom_player_frame = None
         self.btn_play_toggle = None
+        self.btn_repeat = None
+        self.btn_shuffle = None
         self.users = {
             "ade": User("ade", "Ade Tian"),
             "guest": User("guest", "Guest User"),
             "admin": User("admin", "Administrator"),
         }
 
+        # Search-as-you-type (search bar atas)
+        self._live_search_job = None
+        self._live_search_gen = 0  # naik tiap ketikan baru; query dengan gen lama ditinggalkan
+        self._live_text = ""
+
         # Progress tracking
         self._progress_update_job = None
         self.current_song_length = 0.0  # seconds
@@ -58,6 +116,21 @@ class MusicPlayerGUI:
         self.progress_label_elapsed = None
         self.progress_label_total = None
 
+        # Diagnostik (opt-in): GROOVY_INSTRUMENT=1 atau tombol di panel Ctrl+Shift+D
+        self.instrumentation = Instrumentation()
+        self.diagnostics_window = None
+        if os.environ.get("GROOVY_INSTRUMENT"):
+            self.enable_instrumentation()
+        self.window.bind_all("<Control-D>", lambda e: self.show_diagnostics())
+        # Watchdog: catat callback yang membuat main loop macet ke stalls.log
+        self.watchdog = StallWatchdog(self.window, log_path=self.player._path("stalls.log"))
+        self.watchdog.start()
+
+        # HTTP/JSON API lokal (opt-in): GROOVY_API_PORT=8765
+        self.api_server = None
+        if os.environ.get("GROOVY_API_PORT"):
+            self.start_api_server(int(os.environ["GROOVY_API_PORT"]))
+
         self.show_login()
 
     #  helpers 
@@ -67,6 +140,8 @@ class MusicPlayerGUI:
         # reset references to destroyed widgets
         self.bottom_player_frame = None
         self.btn_play_toggle = None
+        self.btn_repeat = None
+        self.btn_shuffle = None
         self.now_playing = None
         self.now_artist = None
         self.progress_bar = None
@@ -313,6 +388,7 @@ class MusicPlayerGUI:
             pygame.mixer.music.stop()
         except Exception:
             pass
+        self.player.end_play()
 
         # Reset state so admin/user next login starts clean
         self.player.is_playing = False
@@ -320,7 +396,10 @@ class MusicPlayerGUI:
         self.player.current_mode = "library"
         self.player.list_order = "asc"
         self.player.current_playlist_name = "My Playlist"
-        
+        self.player.repeat_mode = "off"
+        self.player.set_shuffle(False)
+        self.player.flush()
+
         # Stop progress updates
         if self._progress_update_job:
             try:
@@ -427,22 +506,89 @@ class MusicPlayerGUI:
 
         self.admin_play_buttons = {}
 
-        ctk.CTkLabel(self.content, text="Library (Admin)", font=("Arial", 28, "bold"), text_color="#ffffff")            .pack(anchor="w", pady=(10, 15))
-
-        # admin mode: library asc agar next/prev konsisten
-        self.player.current_mode = "library"
-        self.player.list_order = "asc"
-
-        songs = self.admin.list_songs()
+        header = ctk.CTkFrame(self.content, fg_color="transparent")
+        header.pack(fill="x", pady=(10, 15))
+        ctk.CTkLabel(header, text="Library (Admin)", font=("Arial", 28, "bold"), text_color="#ffffff")            .pack(side="left")
+
+        # urutan tampilan dari index terurut (tidak men-sort ulang library)
+        sort_by, reverse = self.admin_sort
+        ctk.CTkButton(header, text="↓" if reverse else "↑", width=36, height=32,
+                      command=lambda: self._set_admin_sort(sort_by, not reverse)).pack(side="right", padx=(6, 0))
+        sort_menu = ctk.CTkOptionMenu(header, values=list(self.SORT_OPTIONS), width=140, height=32,
+                                      command=lambda label: self._set_admin_sort(self.SORT_OPTIONS[label], reverse))
+        sort_menu.set(next(label for label, field in self.SORT_OPTIONS.items() if field == sort_by))
+        sort_menu.pack(side="right")
+        ctk.CTkLabel(header, text="Sort by", font=("Arial", 13), text_color="#94a3b8").pack(side="right", padx=8)
+
+        # next/prev mengikuti urutan di layar: urutan tambah pakai library (asc/desc),
+        # urutan index terurut pakai lagu yang sudah tampil sebagai list "view"
+        if not sort_by:
+            self.player.current_mode = "library"
+            self.player.list_order = "desc" if reverse else "asc"
+
+        # render per halaman; halaman berikutnya diambil saat "Load more" ditekan
+        pages = self._admin_song_pages(sort_by, reverse)
+        songs = next(pages, [])
         if not songs:
             ctk.CTkLabel(self.content, text="Library is empty", font=("Arial", 13), text_color="#64748b").pack(pady=30)
         else:
             for song in songs:
                 self.create_song_card_admin(self.content, song)
+            if len(songs) >= self.ADMIN_PAGE_SIZE:
+                self._add_load_more(self.content, pages, self.create_song_card_admin)
 
         # sync ikon sesuai state saat ini
         self._update_all_play_icons()
 
+    def _admin_song_pages(self, sort_by, reverse):
+        """Generator halaman lagu untuk daftar admin (ADMIN_PAGE_SIZE per halaman)."""
+        size = self.ADMIN_PAGE_SIZE
+        if sort_by or reverse:
+            start = 0
+            view = None
+            while True:
+                if sort_by:
+                    songs = self.player.sorted_songs(sort_by, reverse, start, start + size)
+                else:
+                    with self.player.lock.read:
+                        songs = list(self.player.library.view(start, start + size, reverse=True))
+                if not songs:
+                    return
+                if sort_by:
+                    # halaman baru disambung ke list view, tidak membangun ulang
+                    if view is None:
+                        view = self.player.set_view(songs)
+                    else:
+                        self.player.extend_view(view, songs)
+                yield songs
+                start += size
+        else:
+            # cursor: halaman tetap benar walau ada lagu ditambah/dihapus di antaranya
+            cursor = None
+            while True:
+                songs, cursor = self.admin.list_songs_page(cursor, size)
+                if songs:
+                    yield songs
+                if cursor is None:
+                    return
+
+    def _add_load_more(self, parent, pages, make_card):
+        def load_more():
+            btn.destroy()
+            songs = next(pages, [])
+            for song in songs:
+                make_card(parent, song)
+            if len(songs) >= self.ADMIN_PAGE_SIZE:
+                self._add_load_more(parent, pages, make_card)
+            self._update_all_play_icons()
+
+        btn = ctk.CTkButton(parent, text="Load more", width=160, height=34, command=load_more)
+        btn.pack(pady=12)
+
+    def _set_admin_sort(self, sort_by, reverse):
+        self.admin_sort = (sort_by, reverse)
+        self.admin_view_songs()
+
     def admin_add_song(self):
         for w in self.content.winfo_children():
             w.destroy()
@@ -517,6 +663,7 @@ class MusicPlayerGUI:
                 except Exception:
                     pass
                 self.player.is_playing = False
+                self.player.pause_play()
 
                 # ubah tombol jadi play (resume)
                 if song.id in self.admin_play_buttons:
@@ -533,6 +680,7 @@ class MusicPlayerGUI:
                 except Exception:
                     pass
                 self.player.is_playing = True
+                self.player.resume_play()
 
                 if song.id in self.admin_play_buttons:
                     try:
@@ -631,6 +779,9 @@ class MusicPlayerGUI:
             ("🏠 Home", self.user_home),
             ("🔍 Search", self.user_search),
             ("📝 Playlist", self.user_playlist),
+            ("📚 Browse", self.user_browse),
+            ("🎛 Filter", self.user_filter),
+            ("✨ Recommended", self.user_recommended),
             ("⭐ Favorites", self.user_favorites),
             ("📜 History", self.user_history)
         ]
@@ -659,6 +810,10 @@ class MusicPlayerGUI:
             corner_radius=20, fg_color="#1a1a1a", border_width=0
         )
         self.search_entry.pack(side="left")
+        self._live_text = ""
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
+        # index fuzzy (fallback search tanpa hasil persis) dibangun di latar
+        self.player.start_fuzzy_index()
 
         # Logout button (top-right)
         logout_btn = ctk.CTkButton(
@@ -745,8 +900,23 @@ class MusicPlayerGUI:
         )
         btn_next.pack(side="left", padx=8)
 
+        # Repeat mode toggle (off -> all -> one)
+        self.btn_repeat = ctk.CTkButton(
+            controls, text="🔁", width=45, height=45, font=("Arial", 16), corner_radius=25,
+            fg_color="#1e293b", hover_color="#4f46e5", command=self.toggle_repeat_mode
+        )
+        self.btn_repeat.pack(side="left", padx=8)
+
+        # Shuffle toggle
+        self.btn_shuffle = ctk.CTkButton(
+            controls, text="🔀", width=45, height=45, font=("Arial", 16), corner_radius=25,
+            fg_color="#1e293b", hover_color="#4f46e5", command=self.toggle_shuffle
+        )
+        self.btn_shuffle.pack(side="left", padx=8)
+
         # sync icon state
         self._sync_bottom_play_icon()
+        self._sync_repeat_icon()
 
     def create_song_card(self, parent, song, show_remove_from_playlist=False, playlist_name=None):
         card = ctk.CTkFrame(parent, fg_color="#1a1a1a", corner_radius=8, height=70)
@@ -788,6 +958,7 @@ class MusicPlayerGUI:
                 fg_color="#1e293b", hover_color="#334155",
                 command=lambda s=song: self.add_playlist_and_notify(s)
             ).pack(side="left", padx=2)
+        return card
 
     
     def create_song_card_admin(self, parent, song):
@@ -821,19 +992,25 @@ class MusicPlayerGUI:
     # USER PAGE SCREENS (HOME, SEARCH, PLAYLIST, FAVORITE, HISTORY)
     # --------------------------------------------------
     def user_home(self):
-        # Trending: show newest first (desc). We set player.list_order accordingly.
+        # Trending (skor play yang meluruh) + lagu terbaru. next/prev mengikuti urutan di layar.
         for w in self.content.winfo_children():
             w.destroy()
         ctk.CTkLabel(self.content, text="Trending Now", font=("Arial", 28, "bold"), text_color="#ffffff").pack(anchor="w", pady=(10, 20))
-        # AMBIL SEMUA LAGU & URUTKAN BERDASARKAN YANG TERBARU
-        # set ordering so Next will go to visual "below" item
-        self.player.current_mode = "library"
-        self.player.list_order = "desc"
 
-        songs = list(reversed(self.player.library.get_all()))  # newest first for display
-        for song in songs:
+        trending = self.user.get_trending(20)
+        if not trending:
+            ctk.CTkLabel(self.content, text="No plays yet", font=("Arial", 13), text_color="#64748b").pack(anchor="w", pady=(0, 10))
+        for song in trending:
+            self.create_song_card(self.content, song)
+
+        ctk.CTkLabel(self.content, text="Recently Added", font=("Arial", 20, "bold"), text_color="#ffffff").pack(anchor="w", pady=(25, 15))
+        trending_ids = {s.id for s in trending}
+        newest = [s for s in self.player.library.view(0, 50, reverse=True) if s.id not in trending_ids]
+        for song in newest:  # newest first for display
             self.create_song_card(self.content, song)
 
+        self.player.set_view(trending + newest)
+
     def user_search(self):
         for w in self.content.winfo_children():
             w.destroy()
@@ -846,13 +1023,20 @@ class MusicPlayerGUI:
 
         result = ctk.CTkFrame(self.content, fg_color="transparent")
         result.pack(fill="both", expand=True, pady=10)
+        fuzzy_var = BooleanVar(value=False)
 
         def do_search():
             for w in result.winfo_children():
                 w.destroy()
             keyword = entry.get()
             if keyword:
-                songs = self.user.search(keyword)
+                songs = self.user.fuzzy_search(keyword) if fuzzy_var.get() else self.user.search(keyword)
+                if not songs and not fuzzy_var.get():
+                    # tidak ada yang persis: tawarkan judul/artis yang mirip (typo)
+                    songs = self.user.fuzzy_search(keyword)
+                    if songs:
+                        ctk.CTkLabel(result, text=f"No exact match for \"{keyword}\" — similar titles/artists:",
+                                     font=("Arial", 12), text_color="#94a3b8").pack(anchor="w", pady=(0, 6))
                 # for search results, set ordering to asc (natural)
                 self.player.current_mode = "library"
                 self.player.list_order = "asc"
@@ -860,6 +1044,85 @@ class MusicPlayerGUI:
                     self.create_song_card(result, s)
 
         ctk.CTkButton(search_frame, text="Search", width=100, height=40, fg_color="#6366f1", hover_color="#4f46e5", command=do_search).pack(side="left")
+        ctk.CTkCheckBox(search_frame, text="Typo-tolerant", variable=fuzzy_var).pack(side="left", padx=10)
+
+    def _on_search_key(self, event=None):
+        """Search-as-you-type: search baru dijalankan setelah ketikan berhenti sejenak
+        (Enter langsung); search yang masih berjalan ditinggalkan begitu teks berubah."""
+        text = self.search_entry.get().strip()
+        force = event is not None and event.keysym in ("Return", "KP_Enter")
+        if text == self._live_text and not force:
+            return  # panah, shift, dsb.
+        self._live_text = text
+        self._live_search_gen += 1
+        if self._live_search_job is not None:
+            self.window.after_cancel(self._live_search_job)
+            self._live_search_job = None
+        if text:
+            gen = self._live_search_gen
+            self._live_search_job = self.window.after(0 if force else self.LIVE_SEARCH_DELAY_MS,
+                                                      lambda: self._run_live_search(text, gen))
+
+    def _run_live_search(self, keyword, gen):
+        self._live_search_job = None
+        if gen != self._live_search_gen:
+            return
+        for w in self.content.winfo_children():
+            w.destroy()
+        ctk.CTkLabel(self.content, text=f"Results for \"{keyword}\"", font=("Arial", 28, "bold"),
+                     text_color="#ffffff").pack(anchor="w", pady=(10, 5))
+        status = ctk.CTkLabel(self.content, text="Searching…", font=("Arial", 12), text_color="#94a3b8")
+        status.pack(anchor="w")
+        result = ctk.CTkFrame(self.content, fg_color="transparent")
+        result.pack(fill="both", expand=True, pady=10)
+        self.player.current_mode = "library"
+        self.player.list_order = "asc"
+        chunks = self.user.search_chunks(keyword)
+        shown = 0
+
+        def step():
+            # satu potongan per giliran main loop, jadi ketikan berikutnya tetap diproses
+            nonlocal shown
+            if gen != self._live_search_gen or not result.winfo_exists():
+                chunks.close()  # query basi
+                return
+            if shown >= self.LIVE_SEARCH_LIMIT:
+                # kartu sudah penuh: lanjut hitung tanpa render (~10 ms per giliran), supaya
+                # total akurat dan hasil lengkapnya masuk cache untuk ketikan berikutnya
+                deadline = time.perf_counter() + 0.01
+                while time.perf_counter() < deadline:
+                    songs = next(chunks, None)
+                    if songs is None:
+                        return finish()
+                    shown += len(songs)
+                status.configure(text=f"First {self.LIVE_SEARCH_LIMIT} of {shown:,}+ results, counting…")
+                self.window.after(1, step)
+                return
+            songs = next(chunks, None)
+            if songs is None:
+                return finish()
+            for song in songs[:self.LIVE_SEARCH_LIMIT - shown]:
+                self.create_song_card(result, song)
+            shown += len(songs)
+            if shown >= self.LIVE_SEARCH_LIMIT:
+                self._update_all_play_icons()
+            status.configure(text=f"{shown} results, searching…")
+            self.window.after(1, step)
+
+        def finish():
+            if not shown:
+                songs = self.user.fuzzy_search(keyword, self.LIVE_SEARCH_LIMIT)
+                for song in songs:
+                    self.create_song_card(result, song)
+                status.configure(text=f"No exact match — {len(songs)} similar titles/artists" if songs
+                                 else "No songs found")
+            elif shown > self.LIVE_SEARCH_LIMIT:
+                status.configure(text=f"First {self.LIVE_SEARCH_LIMIT} of {shown:,} results — use 🔍 Search for all")
+            else:
+                status.configure(text=f"{shown:,} results")
+            self._update_all_play_icons()
+
+        step()
 
     def user_playlist(self):
         for w in self.content.winfo_children():
@@ -886,7 +1149,10 @@ class MusicPlayerGUI:
         songs_area = ctk.CTkFrame(self.content, fg_color="transparent")
         songs_area.pack(fill="both", expand=True)
 
-        def render_playlist():
+        cards = []  # kartu yang tampil, urut posisi (cards[i] = lagu di posisi offset + i)
+        offset = [0]
+
+        def render_playlist(start=0):
             # set mode agar tombol play mengikuti konteks playlist
             name = playlist_var.get()
             self.player.current_mode = "playlist"
@@ -895,13 +1161,41 @@ class MusicPlayerGUI:
 
             for ww in songs_area.winfo_children():
                 ww.destroy()
-
-            songs = self.user.get_playlist_songs(name)
+            cards.clear()
+            offset[0] = start
+
+            # playlist panjang: dirender per halaman, mulai dari posisi start (lompat O(log n))
+            def pages(pos):
+                while True:
+                    songs = self.user.get_playlist_songs(name, pos, pos + self.ADMIN_PAGE_SIZE)
+                    if not songs:
+                        return
+                    yield songs
+                    pos += len(songs)
+
+            def make_card(parent, song):
+                card = self.create_song_card(parent, song, show_remove_from_playlist=True, playlist_name=name)
+                cards.append(card)
+                self._enable_drag_reorder(card, cards, lambda src, dst: self.user.move_in_playlist(
+                    name, offset[0] + src, offset[0] + dst))
+
+            page_iter = pages(start)
+            songs = next(page_iter, [])
             if not songs:
                 ctk.CTkLabel(songs_area, text="Playlist is empty", font=("Arial", 13), text_color="#64748b").pack(pady=30)
             else:
                 for song in songs:
-                    self.create_song_card(songs_area, song, show_remove_from_playlist=True, playlist_name=name)
+                    make_card(songs_area, song)
+                if len(songs) >= self.ADMIN_PAGE_SIZE:
+                    self._add_load_more(songs_area, page_iter, make_card)
+            self._update_all_play_icons()
+
+        def jump():
+            try:
+                pos = max(1, int(jump_entry.get())) - 1
+            except ValueError:
+                return
+            render_playlist(pos)
 
         dropdown = ctk.CTkOptionMenu(
             top,
@@ -928,8 +1222,251 @@ class MusicPlayerGUI:
         ctk.CTkButton(top, text="🔄 Refresh", width=110, fg_color="#1e293b", hover_color="#334155",
                      command=render_playlist).pack(side="left")
 
+        ctk.CTkButton(top, text="🔀 Combine", width=110, fg_color="#1e293b", hover_color="#334155",
+                     command=self.combine_playlists_dialog).pack(side="left", padx=(10, 0))
+
+        jump_entry = ctk.CTkEntry(top, width=70, placeholder_text="#")
+        jump_entry.pack(side="left", padx=(10, 4))
+        jump_entry.bind("<Return>", lambda _e: jump())
+        ctk.CTkButton(top, text="Go to", width=60, fg_color="#1e293b", hover_color="#334155",
+                     command=jump).pack(side="left")
+
         render_playlist()
 
+    def combine_playlists_dialog(self):
+        """Popup: playlist baru dari union/intersection/difference playlist yang dicentang."""
+        playlists = self.user.get_playlists()
+        popup = ctk.CTkToplevel(self.window)
+        popup.title("Combine Playlists")
+        popup.geometry("340x480")
+        popup.transient(self.window)
+        popup.grab_set()
+
+        op_var = StringVar(value="union")
+        order_var = StringVar(value="playlist")
+        ctk.CTkLabel(popup, text="Operasi:", font=("Arial", 13, "bold")).pack(pady=(15, 5))
+        ctk.CTkOptionMenu(popup, variable=op_var, values=list(self.player.PLAYLIST_SET_OPS)).pack()
+        ctk.CTkLabel(popup, text="Playlist (difference: yang pertama dikurangi sisanya):",
+                     font=("Arial", 11), text_color="#94a3b8", wraplength=300).pack(pady=(12, 4))
+
+        box = ctk.CTkScrollableFrame(popup, height=160)
+        box.pack(fill="x", padx=20)
+        checks = []
+        for name in playlists:
+            var = BooleanVar(value=False)
+            ctk.CTkCheckBox(box, text=name, variable=var).pack(anchor="w", pady=2)
+            checks.append((name, var))
+
+        ctk.CTkLabel(popup, text="Urutan:", font=("Arial", 11), text_color="#94a3b8").pack(pady=(10, 4))
+        ctk.CTkOptionMenu(popup, variable=order_var,
+                          values=["playlist", "id"] + list(self.player.sorted_indexes)).pack()
+        name_entry = ctk.CTkEntry(popup, width=260, placeholder_text="Nama playlist baru")
+        name_entry.pack(pady=12)
+
+        def combine():
+            names = [name for name, var in checks if var.get()]
+            target = name_entry.get().strip()
+            ok, msg = self.user.combine_playlists(op_var.get(), names, target, order_var.get())
+            if not ok:
+                messagebox.showwarning("Gagal", msg, parent=popup)
+                return
+            popup.destroy()
+            messagebox.showinfo("Berhasil", msg)
+            self.player.current_playlist_name = target
+            self.user_playlist()
+
+        ctk.CTkButton(popup, text="Buat Playlist", height=36, fg_color="#6366f1", hover_color="#4f46e5",
+                      command=combine).pack(pady=5)
+
+    def _enable_drag_reorder(self, card, cards, on_move):
+        """Drag kartu lewat handle ⠿ ke posisi lain. Saat dilepas on_move(src, dst) dipanggil
+        (indeks di cards) dan kartunya dipindah di tempat, tanpa merender ulang daftar."""
+        handle = ctk.CTkLabel(card, text="⠿", width=18, font=("Arial", 16), text_color="#64748b", cursor="fleur")
+        handle.pack(side="left", padx=(10, 0), before=card.winfo_children()[0])
+
+        def target(y_root):
+            # posisi baru = jumlah kartu lain yang titik tengahnya di atas pointer
+            return sum(1 for other in cards
+                       if other is not card and other.winfo_rooty() + other.winfo_height() / 2 < y_root)
+
+        def press(_e):
+            card.configure(fg_color="#27272a")
+
+        def release(e):
+            card.configure(fg_color="#1a1a1a")
+            src, dst = cards.index(card), target(e.y_root)
+            if src == dst or not on_move(src, dst):
+                return
+            cards.insert(dst, cards.pop(src))
+            card.pack_forget()
+            if dst > 0:
+                card.pack(fill="x", pady=3, after=cards[dst - 1])
+            else:
+                card.pack(fill="x", pady=3, before=cards[1])
+
+        handle.bind("<ButtonPress-1>", press)
+        handle.bind("<ButtonRelease-1>", release)
+
+    def _render_filtered(self, result, status, filters):
+        """Render lagu hasil filter facet ke frame result per halaman (Load more);
+        hasil yang tampil jadi list "view" untuk next/prev."""
+        for w in result.winfo_children():
+            w.destroy()
+        total = self.user.count_filtered(**filters)
+        status.configure(text=f"{total:,} songs")
+
+        def pages():
+            start = 0
+            view = None
+            while True:
+                songs = self.user.filter_songs(start, start + self.ADMIN_PAGE_SIZE, **filters)
+                if not songs:
+                    return
+                # next/prev mengikuti hasil yang tampil; halaman baru disambung ke view
+                if view is None:
+                    view = self.player.set_view(songs)
+                else:
+                    self.player.extend_view(view, songs)
+                yield songs
+                start += len(songs)
+
+        page_iter = pages()
+        songs = next(page_iter, [])
+        if not songs:
+            ctk.CTkLabel(result, text="No songs match", font=("Arial", 13), text_color="#64748b").pack(pady=30)
+            return
+        for song in songs:
+            self.create_song_card(result, song)
+        if len(songs) >= self.ADMIN_PAGE_SIZE:
+            self._add_load_more(result, page_iter, self.create_song_card)
+        self._update_all_play_icons()
+
+    def user_browse(self):
+        """Jelajah library per genre/artis/album/dekade. Jumlah per nilai dibaca dari
+        index facet (tanpa scan); memilih satu nilai menyaring lagu dan menghitung
+        ulang facet lain di dalam pilihan itu (drill-down)."""
+        for w in self.content.winfo_children():
+            w.destroy()
+        ctk.CTkLabel(self.content, text="Browse", font=("Arial", 28, "bold"), text_color="#ffffff").pack(anchor="w", pady=(10, 15))
+
+        tabs = {"Genre": "genre", "Artist": "artist", "Album": "album", "Decade": "decade"}
+        tab_var = StringVar(value="Genre")
+        selected = {}  # facet -> key yang dipilih
+
+        bar = ctk.CTkFrame(self.content, fg_color="transparent")
+        bar.pack(fill="x", pady=(0, 8))
+        crumbs = ctk.CTkFrame(self.content, fg_color="transparent")
+        crumbs.pack(fill="x")
+        keys_frame = ctk.CTkFrame(self.content, fg_color="transparent")
+        keys_frame.pack(fill="x", pady=8)
+        status = ctk.CTkLabel(self.content, text="", font=("Arial", 12), text_color="#94a3b8")
+        status.pack(anchor="w")
+        result = ctk.CTkFrame(self.content, fg_color="transparent")
+        result.pack(fill="both", expand=True, pady=10)
+
+        def label_of(facet, label):
+            return f"{label}s" if facet == "decade" else str(label)
+
+        def pick(facet, key):
+            if key is None:
+                selected.pop(facet, None)
+            else:
+                selected[facet] = key
+            refresh()
+
+        def show_keys():
+            for w in keys_frame.winfo_children():
+                w.destroy()
+            facet = tabs[tab_var.get()]
+            # hitung di dalam pilihan facet lain; facet tab ini sendiri tidak ikut menyaring
+            within = {f: key for f, key in selected.items() if f != facet}
+            counts = self.user.get_facet_counts(facet, self.BROWSE_KEYS, **within)
+            if facet == "decade":
+                counts.sort(reverse=True)
+            if not counts:
+                ctk.CTkLabel(keys_frame, text="Nothing here", font=("Arial", 13), text_color="#64748b").pack(pady=10)
+                return
+            for i, (key, label, count) in enumerate(counts):
+                active = selected.get(facet) == key
+                ctk.CTkButton(keys_frame, text=f"{label_of(facet, label)} ({count:,})", height=28,
+                              fg_color="#6366f1" if active else "#1e293b", hover_color="#334155",
+                              command=lambda k=key: pick(facet, None if selected.get(facet) == k else k)
+                              ).grid(row=i // 4, column=i % 4, padx=3, pady=3, sticky="ew")
+            for col in range(4):
+                keys_frame.grid_columnconfigure(col, weight=1)
+
+        def show_crumbs():
+            for w in crumbs.winfo_children():
+                w.destroy()
+            for facet, key in selected.items():
+                label = self.player.facets[facet].labels.get(key, key)
+                ctk.CTkButton(crumbs, text=f"{label_of(facet, label)}  ✕", width=60, height=24,
+                              fg_color="#4f46e5", hover_color="#dc2626",
+                              command=lambda f=facet: pick(f, None)).pack(side="left", padx=(0, 6))
+
+        def refresh():
+            show_crumbs()
+            show_keys()
+            if selected:
+                self._render_filtered(result, status, dict(selected))
+            else:
+                for w in result.winfo_children():
+                    w.destroy()
+                status.configure(text=f"{len(self.player.library):,} songs — pick a value to browse")
+
+        ctk.CTkSegmentedButton(bar, values=list(tabs), variable=tab_var,
+                               command=lambda _: show_keys()).pack(side="left")
+        refresh()
+
+    def user_filter(self):
+        """Filter gabungan genre/artis/dekade/favorit lewat bitmap index; hasil jadi list "view"
+        (next/prev mengikuti hasil) dan bisa dimasukkan ke antrian."""
+        for w in self.content.winfo_children():
+            w.destroy()
+        ctk.CTkLabel(self.content, text="Filter", font=("Arial", 28, "bold"), text_color="#ffffff").pack(anchor="w", pady=(10, 15))
+
+        # genre terbanyak dulu; label asli -> key index
+        genres = {label: key for key, label, _ in self.user.get_facet_counts("genre", 50)}
+        decades = [f"{key}s" for key in sorted((key for key, _, _ in self.user.get_facet_counts("decade")),
+                                               reverse=True)]
+        genre_var = StringVar(value="All genres")
+        decade_var = StringVar(value="All decades")
+        fav_var = BooleanVar(value=False)
+
+        bar = ctk.CTkFrame(self.content, fg_color="transparent")
+        bar.pack(fill="x", pady=(0, 10))
+        ctk.CTkOptionMenu(bar, variable=genre_var, values=["All genres"] + list(genres), width=160).pack(side="left")
+        ctk.CTkOptionMenu(bar, variable=decade_var, values=["All decades"] + decades, width=130).pack(side="left", padx=8)
+        artist_entry = ctk.CTkEntry(bar, width=180, placeholder_text="Artist (exact)")
+        artist_entry.pack(side="left")
+        ctk.CTkCheckBox(bar, text="Favorites only", variable=fav_var).pack(side="left", padx=8)
+
+        status = ctk.CTkLabel(self.content, text="", font=("Arial", 12), text_color="#94a3b8")
+        status.pack(anchor="w")
+        result = ctk.CTkFrame(self.content, fg_color="transparent")
+        result.pack(fill="both", expand=True, pady=10)
+
+        def current_filters():
+            return {
+                "genre": genres.get(genre_var.get()),
+                "decade": None if decade_var.get() == "All decades" else decade_var.get(),
+                "artist": artist_entry.get().strip() or None,
+                "favorite": True if fav_var.get() else None,
+            }
+
+        def apply():
+            self._render_filtered(result, status, current_filters())
+
+        def queue_all():
+            added = self.user.queue_filtered(None, **current_filters())
+            messagebox.showinfo("Queue", f"{added} lagu ditambahkan ke antrian")
+
+        ctk.CTkButton(bar, text="Apply", width=80, fg_color="#6366f1", hover_color="#4f46e5",
+                      command=apply).pack(side="left", padx=(4, 0))
+        ctk.CTkButton(bar, text="➕ Queue all", width=110, fg_color="#1e293b", hover_color="#334155",
+                      command=queue_all).pack(side="left", padx=8)
+        apply()
+
     def user_favorites(self):
         for w in self.content.winfo_children():
             w.destroy()
@@ -944,6 +1481,20 @@ class MusicPlayerGUI:
             for s in favs:
                 self.create_song_card(self.content, s)
 
+    def user_recommended(self):
+        for w in self.content.winfo_children():
+            w.destroy()
+        ctk.CTkLabel(self.content, text="Recommended for You", font=("Arial", 28, "bold"), text_color="#ffffff").pack(anchor="w", pady=(10, 20))
+        songs = self.user.get_recommendations(20)
+        if not songs:
+            self.player.current_mode = "library"
+            self.player.list_order = "asc"
+            ctk.CTkLabel(self.content, text="Play some songs to get recommendations", font=("Arial", 13), text_color="#64748b").pack(pady=30)
+        else:
+            for s in songs:
+                self.create_song_card(self.content, s)
+            self.player.set_view(songs)  # next/prev mengikuti rekomendasi yang tampil
+
     def user_history(self):
         for w in self.content.winfo_children():
             w.destroy()
@@ -1064,6 +1615,29 @@ class MusicPlayerGUI:
         except Exception:
             pass
 
+    def _sync_repeat_icon(self):
+        """Update tombol repeat & shuffle sesuai state player."""
+        if self.btn_repeat is None:
+            return
+        mode = self.player.repeat_mode
+        try:
+            self.btn_repeat.configure(
+                text="🔂" if mode == "one" else "🔁",
+                fg_color="#1e293b" if mode == "off" else "#6366f1"
+            )
+            if self.btn_shuffle is not None:
+                self.btn_shuffle.configure(fg_color="#6366f1" if self.player.shuffle_enabled else "#1e293b")
+        except Exception:
+            pass
+
+    def toggle_repeat_mode(self):
+        self.player.cycle_repeat_mode()
+        self._sync_repeat_icon()
+
+    def toggle_shuffle(self):
+        self.player.set_shuffle(not self.player.shuffle_enabled)
+        self._sync_repeat_icon()
+
     def _update_all_play_icons(self):
         """Update ikon tombol play pada kartu lagu (user & admin) agar konsisten."""
         # reset semua tombol
@@ -1095,25 +1669,6 @@ class MusicPlayerGUI:
 
         self._sync_bottom_play_icon()
 
-    def _get_ordered_songs_for_mode(self, mode: str):
-        """Ambil list lagu sesuai mode tanpa mengubah state.
-        mode: 'library' | 'playlist'
-        """
-        try:
-            if mode == "playlist":
-                pll = self.player.playlists.get(self.player.current_playlist_name)
-                if pll is None:
-                    pll = self.player.playlists.get("My Playlist")
-                base = pll.get_all() if pll else []
-            else:
-                base = self.player.library.get_all()
-
-            if self.player.list_order == "desc":
-                return list(reversed(base))
-            return list(base)
-        except Exception:
-            return []
-
     def play_random(self, prefer_mode: Optional[str] = None):
         """Play lagu random (dipakai saat belum ada lagu yang diputar).
 
@@ -1132,9 +1687,9 @@ class MusicPlayerGUI:
             modes_to_try.append("playlist")
 
         for mode in modes_to_try:
-            songs = self._get_ordered_songs_for_mode(mode)
-            if songs:
-                song = random.choice(songs)
+            # pilihan random lewat shuffle order player -> tidak berulang sampai semua lagu terpilih
+            song = self.player.random_song(mode)
+            if song:
                 self.play_song(song, mode)
                 return True
         return False
@@ -1170,7 +1725,7 @@ class MusicPlayerGUI:
 
         # track mode & history
         self.player.current_mode = mode
-        self.player.history.push(song)
+        self.player.record_play(song, mode)
 
         # update UI if present
         if hasattr(self, 'now_playing') and self.now_playing is not None:
@@ -1244,6 +1799,7 @@ class MusicPlayerGUI:
         except Exception:
             # ignore if device unavailable
             self.player.is_playing = False
+        self.player.pause_play()
         self._update_all_play_icons()
 
     def resume_current(self):
@@ -1255,6 +1811,7 @@ class MusicPlayerGUI:
             self.player.is_playing = True
         except Exception:
             self.player.is_playing = True
+        self.player.resume_play()
         self._update_all_play_icons()
 
     def stop_current(self):
@@ -1263,6 +1820,7 @@ class MusicPlayerGUI:
         except Exception:
             pass
 
+        self.player.end_play()
         self.player.is_playing = False
         self.player.current_song = None
 
@@ -1382,7 +1940,7 @@ class MusicPlayerGUI:
         # If not busy but elapsed > 0 and fraction near 1 => ended
         if not busy and total > 0 and fraction >= 0.98:
             # move to next
-            nxt = self.player.next_song()
+            nxt = self.player.next_song(auto=True)
             if nxt:
                 # small delay to avoid immediate re-entrancy
                 self.window.after(200, lambda: self.play_song(nxt, self.player.current_mode))
@@ -1396,8 +1954,63 @@ class MusicPlayerGUI:
         self._progress_update_job = self.window.after(500, self._update_progress)
 
 
+    #  Local API
+    def start_api_server(self, port, host="127.0.0.1"):
+        self.api_server = ApiServer(self.player, self.admin, self.user, GuiTransport(self), host, port)
+        port = self.api_server.start_in_thread()
+        print(f"Groovy API listening on http://{host}:{port}")
+        return port
+
+    #  Diagnostics
+    def enable_instrumentation(self):
+        if self.instrumentation.enabled:
+            return
+        self.instrumentation.wrap(self.player, "MusicPlayer")
+        self.instrumentation.wrap(self.admin, "AdminController")
+        self.instrumentation.wrap(self.user, "UserController")
+
+    def stats(self):
+        """Statistik latensi per operasi (kosong kalau instrumentasi belum aktif)."""
+        return self.instrumentation.stats()
+
+    def show_diagnostics(self):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.focus()
+            return
+        win = ctk.CTkToplevel(self.window)
+        win.title("Diagnostics")
+        win.geometry("860x480")
+        self.diagnostics_window = win
+
+        top = ctk.CTkFrame(win, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=(10, 0))
+        status = ctk.CTkLabel(top, text="", font=("Arial", 12))
+        status.pack(side="left")
+        ctk.CTkButton(top, text="Reset", width=80,
+                      command=self.instrumentation.reset).pack(side="right", padx=4)
+        ctk.CTkButton(top, text="Enable", width=80,
+                      command=self.enable_instrumentation).pack(side="right", padx=4)
+
+        box = ctk.CTkTextbox(win, font=("Courier", 12), wrap="none")
+        box.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            status.configure(text="Instrumentation: " + ("ON" if self.instrumentation.enabled else "OFF"))
+            box.delete("1.0", "end")
+            box.insert("1.0", format_stalls(self.watchdog) + "\n\n" + format_stats(self.stats()))
+            win.after(1000, refresh)
+
+        refresh()
+
     def run(self):
         self.window.mainloop()
+        self.watchdog.stop()
+        if self.api_server is not None:
+            self.api_server.stop()
+        # window ditutup -> simpan play terakhir & semua perubahan yang masih tertunda
+        self.player.close()
 
 
 
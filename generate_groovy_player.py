@@ -0,0 +1,236 @@
+"""Generator data sintetis untuk uji beban Groovy Player.
+
+Menulis songs.json, playlists.json, favorites.jsonl dan history/ dengan format
+yang sama persis seperti yang dibaca MusicPlayer, pada ukuran berapa pun
+(10k - 5M lagu). Artis dan genre mengikuti distribusi Zipf, sebagian lagu
+sengaja dibuat duplikat, playlist bisa sangat panjang, dan sebagian lagu
+diberi file audio WAV pendek (header valid) supaya bisa diputar.
+Seed yang sama selalu menghasilkan file yang sama.
+
+    python generate_groovy_player.py --songs 100000 --out fixtures/100k
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import wave
+from bisect import bisect_left
+
+from backend_groovy_player import ListeningLog
+
+GENRES = ["pop", "rock", "hip hop", "indie", "edm", "r&b", "dangdut", "jazz", "k-pop",
+          "metal", "folk", "soul", "reggae", "blues", "classical", "country", "punk",
+          "funk", "ambient", "keroncong", "latin", "disco", "gospel", "house", "techno",
+          "trap", "lo-fi", "grunge", "ska", "opera"]
+WORDS = ["midnight", "rain", "golden", "heart", "city", "fire", "ocean", "dream", "neon",
+         "summer", "shadow", "river", "electric", "velvet", "wild", "silent", "paper",
+         "moon", "sugar", "broken", "blue", "starlight", "echo", "highway", "cherry",
+         "thunder", "honey", "ghost", "crystal", "lonely", "senja", "rindu", "hujan",
+         "langit", "cahaya", "pulang", "bintang", "malam", "jalan", "laut"]
+MODES = ["library", "playlist", "view"]
+
+
+def zipf_cum_weights(n, s):
+    """Bobot kumulatif Zipf untuk rank 1..n (untuk random.choices)."""
+    total = 0.0
+    cum = []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cum.append(total)
+    return cum
+
+
+def zipf_pick(rng, cum):
+    return bisect_left(cum, rng.random() * cum[-1])
+
+
+def make_name(rng, words=2):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).title()
+
+
+def scatter(rank, n):
+    """Petakan rank popularitas ke id lagu supaya lagu populer tidak berurutan."""
+    return (rank * 2_654_435_761) % n + 1
+
+
+def song_records(n, seed=0, artists=None, genres=len(GENRES), zipf_s=1.1,
+                 dup_rate=0.0, audio_dir="audio"):
+    """Yield dict lagu (format songs.json) satu per satu, id 1..n."""
+    rng = random.Random(seed)
+    artists = artists or max(1, n // 20)
+    artist_cum = zipf_cum_weights(artists, zipf_s)
+    genre_cum = zipf_cum_weights(min(genres, len(GENRES)), zipf_s)
+    # nama artis dibuat deterministik dari indeksnya
+    artist_names = {}
+    recent = []  # sampel lagu sebelumnya untuk membuat duplikat
+
+    for song_id in range(1, n + 1):
+        if recent and rng.random() < dup_rate:
+            src = rng.choice(recent)
+            rec = dict(src, id=song_id)
+            if rng.random() < 0.5:
+                # duplikat judul+artis dengan file berbeda
+                rec["file_path"] = os.path.join(audio_dir, f"{song_id}.wav")
+            yield rec
+            continue
+
+        a = zipf_pick(rng, artist_cum)
+        if a not in artist_names:
+            artist_names[a] = make_name(random.Random(f"{seed}-artist-{a}"), 2) + f" {a}"
+        minutes = max(1, min(9, int(rng.gauss(3.6, 0.9))))
+        rec = {
+            "id": song_id,
+            "title": make_name(rng, rng.randint(1, 3)) + f" {song_id}",
+            "artist": artist_names[a],
+            "genre": GENRES[zipf_pick(rng, genre_cum)],
+            "album": f"{artist_names[a]} Vol. {rng.randint(1, 8)}",
+            "year": min(2025, int(2025 - abs(rng.gauss(0, 15)))),
+            "duration": f"{minutes}:{rng.randrange(60):02d}",
+            "file_path": os.path.join(audio_dir, f"{song_id}.wav"),
+        }
+        if len(recent) < 10_000:
+            recent.append(rec)
+        else:
+            recent[rng.randrange(len(recent))] = rec
+        yield rec
+
+
+def write_songs(path, records):
+    """Tulis songs.json secara streaming (satu record per baris). Return jumlah lagu."""
+    count = 0
+    with open(path, "w") as f:
+        f.write("[\n")
+        for rec in records:
+            if count:
+                f.write(",\n")
+            f.write(json.dumps(rec))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def write_playlists(path, n, seed=0, playlists=10, length=1000):
+    rng = random.Random(f"{seed}-playlists")
+    length = min(length, n)
+    data = {}
+    for p in range(playlists):
+        data[f"{make_name(rng, 2)} {p + 1}"] = rng.sample(range(1, n + 1), length)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return sum(len(ids) for ids in data.values())
+
+
+def write_favorites(path, n, seed=0, count=100, end_ts=None):
+    rng = random.Random(f"{seed}-favorites")
+    end_ts = end_ts if end_ts is not None else time.time()
+    ids = rng.sample(range(1, n + 1), min(count, n))
+    with open(path, "w") as f:
+        for i, song_id in enumerate(ids):
+            ts = end_ts - (len(ids) - i) * 3600.0
+            f.write(json.dumps({"op": "add", "id": song_id, "ts": ts}) + "\n")
+    return len(ids)
+
+
+def history_records(n, seed=0, plays=1000, days=365, end_ts=None, zipf_s=1.1):
+    """Yield (song_id, start_ts, ms_played, mode) urut waktu.
+    Lagu dipilih Zipf (lagu populer sering diputar), kadang lanjut ke id berikutnya
+    (seperti mendengarkan satu album) supaya recommender punya pola."""
+    rng = random.Random(f"{seed}-history")
+    end_ts = end_ts if end_ts is not None else time.time()
+    ts = end_ts - days * 86400.0
+    step = days * 86400.0 / max(1, plays)
+    cum = zipf_cum_weights(min(n, 100_000), zipf_s)
+    song_id = 1
+    for _ in range(plays):
+        if rng.random() < 0.4:
+            song_id = song_id % n + 1
+        else:
+            song_id = scatter(zipf_pick(rng, cum), n)
+        ts += rng.random() * 2 * step
+        yield song_id, min(ts, end_ts), int(rng.uniform(5, 300) * 1000), rng.choice(MODES)
+
+
+def write_wav(path, seconds=1.0, rate=8000):
+    """File WAV mono 8-bit berisi hening (header valid, bisa dibuka pygame)."""
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(1)
+        w.setframerate(rate)
+        w.writeframes(b"\x80" * int(rate * seconds))
+
+
+def generate(out, songs, seed=0, artists=None, genres=len(GENRES), zipf_s=1.1, dup_rate=0.01,
+             playlists=10, playlist_length=1000, favorites=100, history=10_000,
+             history_days=365, audio_files=100, end_ts=None, log=sys.stderr):
+    os.makedirs(out, exist_ok=True)
+    end_ts = end_ts if end_ts is not None else time.time()
+    summary = {"out": out, "seed": seed}
+    t0 = time.perf_counter()
+
+    audio_dir = os.path.abspath(os.path.join(out, "audio"))
+    summary["songs"] = write_songs(
+        os.path.join(out, "songs.json"),
+        song_records(songs, seed, artists, genres, zipf_s, dup_rate, audio_dir))
+    print(f"songs.json: {summary['songs']} songs ({time.perf_counter() - t0:.1f}s)", file=log)
+
+    summary["playlist_entries"] = write_playlists(
+        os.path.join(out, "playlists.json"), songs, seed, playlists, playlist_length)
+    summary["favorites"] = write_favorites(
+        os.path.join(out, "favorites.jsonl"), songs, seed, favorites, end_ts)
+
+    log_dir = os.path.join(out, "history")
+    if os.path.isdir(log_dir):
+        for name in os.listdir(log_dir):
+            os.remove(os.path.join(log_dir, name))
+    history_log = ListeningLog(log_dir)
+    summary["plays"] = history_log.extend(
+        history_records(songs, seed, history, history_days, end_ts, zipf_s))
+    print(f"history: {summary['plays']} plays ({time.perf_counter() - t0:.1f}s)", file=log)
+
+    if audio_files:
+        os.makedirs(audio_dir, exist_ok=True)
+        for song_id in range(1, min(audio_files, songs) + 1):
+            write_wav(os.path.join(audio_dir, f"{song_id}.wav"))
+    summary["audio_files"] = min(audio_files, songs)
+    summary["seconds"] = round(time.perf_counter() - t0, 2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate data sintetis Groovy Player untuk uji beban.")
+    parser.add_argument("--songs", type=int, required=True, help="jumlah lagu (10k - 5M)")
+    parser.add_argument("--out", required=True, help="folder output (dipakai sebagai data_dir MusicPlayer)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--artists", type=int, help="jumlah artis (default: songs / 20)")
+    parser.add_argument("--genres", type=int, default=len(GENRES))
+    parser.add_argument("--zipf", type=float, default=1.1, help="eksponen Zipf untuk artis/genre/popularitas")
+    parser.add_argument("--dup-rate", type=float, default=0.01, help="proporsi lagu duplikat (0-1)")
+    parser.add_argument("--playlists", type=int, default=10)
+    parser.add_argument("--playlist-length", type=int, default=1000)
+    parser.add_argument("--favorites", type=int, default=100)
+    parser.add_argument("--history", type=int, default=10_000, help="jumlah play di listening log")
+    parser.add_argument("--history-days", type=float, default=365)
+    parser.add_argument("--audio-files", type=int, default=100,
+                        help="jumlah lagu pertama yang diberi file WAV sungguhan")
+    parser.add_argument("--end-ts", type=float,
+                        help="timestamp akhir history/favorit (default: hari ini 00:00 UTC)")
+    args = parser.parse_args(argv)
+
+    end_ts = args.end_ts
+    if end_ts is None:
+        end_ts = math.floor(time.time() / 86400) * 86400.0
+    summary = generate(args.out, args.songs, args.seed, args.artists, args.genres, args.zipf,
+                       args.dup_rate, args.playlists, args.playlist_length, args.favorites,
+                       args.history, args.history_days, args.audio_files, end_ts)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+"""HTTP/JSON API lokal untuk Groovy Player (asyncio, tanpa dependency tambahan).
+
+Dipakai oleh tool lain di jaringan lokal (remote web, home automation).
+Server berjalan di event loop sendiri di thread latar, jadi bisa hidup
+berdampingan dengan GUI (set GROOVY_API_PORT) atau dijalankan headless:
+
+    python server_groovy_player.py --data-dir . --port 8765
+
+Listing besar dipaginasi dengan cursor (?cursor=&limit=, ikuti next_cursor;
+stabil walau library berubah di antara request), offset (?offset=&limit=),
+atau di-stream sebagai NDJSON dengan chunked transfer (?stream=1). Kontrol pemutaran lewat objek
+transport: headless memakai PlayerTransport (hanya state, tanpa audio),
+GUI memasang adapter yang menjalankan perintah di thread Tk.
+
+    GET    /songs                      ?offset&limit | ?stream=1
+                                       ?sort=title|artist|album|year|duration&order=desc
+                                       ?sort=year&min=1990&max=1999 (range, inklusif)
+                                       ?genre=pop&genre=rock&decade=2000&favorite=1&artist=...
+                                       (AND antar facet, OR antar nilai yang sama)
+    POST   /songs                      {title, artist, genre, album, year, duration, file_path}
+    DELETE /songs/<id>
+    GET    /search?q=...               ?offset&limit | ?stream=1
+                                       ?fuzzy=1 (toleran typo, paling cocok dulu; offset&limit;
+                                       kosong selama index fuzzy masih dibangun saat start)
+    GET    /playlists
+    POST   /playlists                  {name}
+    POST   /playlists/combine          {op: union|intersection|difference, playlists, name, order?}
+    GET    /playlists/<name>           ?offset&limit | ?stream=1
+    POST   /playlists/<name>/songs     {id, position?} (position: sisipkan di posisi tsb)
+    POST   /playlists/<name>/move      {from, to}
+    DELETE /playlists/<name>/songs/<id>
+    GET    /facets/<facet>             ?limit&genre=pop&... -> [{key, label, count}] (terbanyak dulu,
+                                       dihitung di dalam filter facet lain)
+    GET    /queue
+    POST   /queue                      {id} | {filter: {genre, artist, decade, favorite}, limit}
+    GET    /favorites                  ?cursor&limit | ?offset&limit
+    GET    /history                    ?cursor&limit (terbaru dulu)
+    POST   /favorites/<id>             (toggle)
+    GET    /player
+    POST   /player/<play|pause|resume|next|prev|stop>   (play: {id, mode})
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from backend_groovy_player import MusicPlayer, duration_seconds
+from controller_groovy_player import AdminController, UserController
+
+DEFAULT_PORT = 8765
+MAX_LIMIT = 1000      # batas item per halaman
+STREAM_CHUNK = 500    # lagu per chunk NDJSON
+MAX_BODY = 1 << 20
+IDLE_TIMEOUT = 30.0   # detik, untuk koneksi keep-alive yang diam
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Streamed:
+    """Respons NDJSON yang dikirim per chunk (Transfer-Encoding: chunked)."""
+    def __init__(self, items):
+        self.items = items
+
+
+def song_dict(song):
+    if song is None:
+        return None
+    return {"id": song.id, "title": song.title, "artist": song.artist, "genre": song.genre,
+            "album": song.album, "year": song.year, "duration": song.duration,
+            "file_path": song.file_path}
+
+
+class PlayerTransport:
+    """Kontrol pemutaran tanpa audio: hanya mengubah state MusicPlayer (mode headless).
+    Dipanggil tanpa lock dari ApiServer, jadi tiap perintah mengambil write lock sendiri."""
+    def __init__(self, player: MusicPlayer):
+        self.player = player
+
+    def play(self, song, mode=None):
+        with self.player.lock.write:
+            self.player.current_song = song
+            self.player.is_playing = True
+            self.player.current_mode = mode or self.player.current_mode
+            self.player.record_play(song, self.player.current_mode)
+
+    def pause(self):
+        with self.player.lock.write:
+            if self.player.current_song is not None:
+                self.player.is_playing = False
+                self.player.pause_play()
+
+    def resume(self):
+        with self.player.lock.write:
+            if self.player.current_song is not None:
+                self.player.is_playing = True
+                self.player.resume_play()
+
+    def next(self):
+        with self.player.lock.write:
+            song = self.player.next_song() if self.player.current_song else self.player.random_song()
+            if song:
+                self.play(song)
+
+    def prev(self):
+        with self.player.lock.write:
+            song = self.player.prev_song() if self.player.current_song else self.player.random_song()
+            if song:
+                self.play(song)
+
+    def stop(self):
+        with self.player.lock.write:
+            self.player.end_play()
+            self.player.is_playing = False
+            self.player.current_song = None
+
+
+class ApiServer:
+    def __init__(self, player: MusicPlayer, admin=None, user=None, transport=None,
+                 host="127.0.0.1", port=DEFAULT_PORT, workers=4):
+        self.player = player
+        self.admin = admin or AdminController(player)
+        self.user = user or UserController(player)
+        self.transport = transport or PlayerTransport(player)
+        self.host = host
+        self.port = port
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        # handler controller dijalankan di thread pool (event loop tetap bebas menerima
+        # koneksi & mengirim data); GET di bawah read lock player, selainnya write lock,
+        # kecuali handler di self.unlocked yang mengatur lock-nya sendiri
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groovy-api-worker")
+        self.routes = [
+            ("GET", r"/songs", self.list_songs),
+            ("POST", r"/songs", self.add_song),
+            ("DELETE", r"/songs/(\d+)", self.delete_song),
+            ("GET", r"/search", self.search),
+            ("GET", r"/playlists", self.list_playlists),
+            ("POST", r"/playlists", self.create_playlist),
+            ("POST", r"/playlists/combine", self.combine_playlists),
+            ("GET", r"/playlists/([^/]+)", self.playlist_songs),
+            ("POST", r"/playlists/([^/]+)/songs", self.add_to_playlist),
+            ("POST", r"/playlists/([^/]+)/move", self.move_in_playlist),
+            ("DELETE", r"/playlists/([^/]+)/songs/(\d+)", self.remove_from_playlist),
+            ("GET", r"/facets/(\w+)", self.facets),
+            ("GET", r"/queue", self.get_queue),
+            ("POST", r"/queue", self.enqueue),
+            ("GET", r"/favorites", self.get_favorites),
+            ("POST", r"/favorites/(\d+)", self.toggle_favorite),
+            ("GET", r"/history", self.history),
+            ("GET", r"/player", self.status),
+            ("POST", r"/player/(play|pause|resume|next|prev|stop)", self.control),
+        ]
+        self.routes = [(method, re.compile(pattern + "$"), fn) for method, pattern, fn in self.routes]
+        # transport (GuiTransport) menunggu thread Tk yang juga butuh write lock:
+        # perintah player tidak boleh dijalankan sambil memegang lock
+        self.unlocked = {self.control}
+
+    #  helpers
+    @staticmethod
+    def _int(query, name, default):
+        try:
+            return int(query.get(name, [default])[0])
+        except (TypeError, ValueError):
+            raise ApiError(400, f"invalid {name}")
+
+    def _limit(self, query):
+        return max(1, min(MAX_LIMIT, self._int(query, "limit", 100)))
+
+    def _cursor_page(self, fetch, query):
+        """{items, next_cursor} dari fungsi page(cursor, limit) -> (items, next_cursor)."""
+        try:
+            items, next_cursor = fetch(query["cursor"][0], self._limit(query))
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return {"items": [song_dict(s) for s in items], "next_cursor": next_cursor}
+
+    def _listing(self, songs, query, total=None):
+        """Halaman {items, next_cursor} (?cursor=), {items, offset, limit, total, next_offset}
+        atau stream NDJSON."""
+        if query.get("stream", ["0"])[0] not in ("0", "", "false"):
+            return Streamed(song_dict(s) for s in songs)
+        if "cursor" in query and hasattr(songs, "page"):
+            return self._cursor_page(songs.page, query)
+        offset = max(0, self._int(query, "offset", 0))
+        limit = self._limit(query)
+        if hasattr(songs, "view"):
+            page = list(songs.view(offset, offset + limit))
+        else:
+            page = list(itertools.islice(songs, offset, offset + limit))
+        if total is None and hasattr(songs, "__len__"):
+            total = len(songs)
+        more = len(page) == limit and (total is None or offset + limit < total)
+        return {"items": [song_dict(s) for s in page], "offset": offset, "limit": limit,
+                "total": total, "next_offset": offset + limit if more else None}
+
+    def _song(self, song_id):
+        try:
+            song_id = int(song_id)
+        except (TypeError, ValueError):
+            raise ApiError(400, "invalid song id")
+        song = self.player.library.find_by_id(song_id)
+        if song is None:
+            raise ApiError(404, f"song {song_id} not found")
+        return song
+
+    def _playlist(self, name):
+        pll = self.player.get_playlist(name)
+        if pll is None:
+            raise ApiError(404, f"playlist {name!r} not found")
+        return pll
+
+    #  handlers: (query, body, *path_params) -> dict/list | Streamed | (status, payload)
+    def _facet_filters(self, query):
+        filters = {facet: query[facet] for facet in self.player.FACETS if facet in query}
+        if "favorite" in filters:
+            filters["favorite"] = [value not in ("0", "", "false") for value in filters["favorite"]]
+        return filters
+
+    def list_songs(self, query, body):
+        filters = self._facet_filters(query)
+        if filters:
+            return self._filtered(filters, query)
+        sort = query.get("sort", [None])[0]
+        if not sort:
+            return self._listing(self.player.library, query)
+        if sort not in self.player.sorted_indexes:
+            raise ApiError(400, f"invalid sort {sort!r}")
+        reverse = query.get("order", ["asc"])[0] == "desc"
+        lo, hi = query.get("min", [None])[0], query.get("max", [None])[0]
+        if lo is not None or hi is not None:
+            if sort == "duration":  # boleh "3:00" atau detik
+                lo, hi = (duration_seconds(v) if v and ":" in v else v for v in (lo, hi))
+            return self._listing(self.user.songs_in_range(sort, lo, hi, reverse), query)
+        if query.get("stream", ["0"])[0] not in ("0", "", "false"):
+            return Streamed(song_dict(s) for s in self.player.sorted_songs(sort, reverse))
+        # halaman langsung dari index terurut: O(log n + limit)
+        offset = max(0, self._int(query, "offset", 0))
+        limit = max(1, min(MAX_LIMIT, self._int(query, "limit", 100)))
+        page = self.player.sorted_songs(sort, reverse, offset, offset + limit)
+        total = len(self.player.library)
+        return {"items": [song_dict(s) for s in page], "offset": offset, "limit": limit, "total": total,
+                "next_offset": offset + limit if offset + limit < total else None}
+
+    def _filtered(self, filters, query):
+        """Hasil filter bitmap facet, urut id; halaman didekode langsung dari bitmap."""
+        matched = self.player.filter_ids(**filters)
+        if query.get("stream", ["0"])[0] not in ("0", "", "false"):
+            return Streamed(song_dict(s) for s in self.player.songs_by_ids(matched.ids()))
+        offset = max(0, self._int(query, "offset", 0))
+        limit = self._limit(query)
+        total = len(matched)
+        page = self.player.songs_by_ids(matched.ids(offset, offset + limit))
+        return {"items": [song_dict(s) for s in page], "offset": offset, "limit": limit, "total": total,
+                "next_offset": offset + limit if offset + limit < total else None}
+
+    def facets(self, query, body, facet):
+        if facet not in self.player.FACETS:
+            raise ApiError(404, f"unknown facet {facet!r}")
+        limit = self._int(query, "limit", 0) or None
+        try:
+            counts = self.user.get_facet_counts(facet, limit, **self._facet_filters(query))
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return [{"key": key, "label": label, "count": count} for key, label, count in counts]
+
+    def add_song(self, query, body):
+        body = body or {}
+        if not body.get("title"):
+            raise ApiError(400, "title is required")
+        ok, msg = self.admin.add_song(body.get("title"), body.get("artist"), body.get("genre"),
+                                      body.get("album"), body.get("year"), body.get("duration"),
+                                      body.get("file_path"))
+        if not ok:
+            raise ApiError(400, msg)
+        return 201, {"ok": True, "message": msg, "song": song_dict(self.player.library.tail.song)}
+
+    def delete_song(self, query, body, song_id):
+        if not self.admin.delete_song(int(song_id)):
+            raise ApiError(404, f"song {song_id} not found")
+        return {"ok": True}
+
+    def search(self, query, body):
+        keyword = query.get("q", [""])[0]
+        if not keyword:
+            raise ApiError(400, "q is required")
+        if query.get("fuzzy", ["0"])[0] not in ("0", "", "false"):
+            offset = max(0, self._int(query, "offset", 0))
+            limit = self._limit(query)
+            songs = self.user.fuzzy_search(keyword, offset + limit + 1)
+            return {"items": [song_dict(s) for s in songs[offset:offset + limit]], "offset": offset,
+                    "limit": limit, "next_offset": offset + limit if len(songs) > offset + limit else None}
+        if "cursor" in query:
+            # max_scan: satu request tidak pernah memindai seluruh library besar
+            return self._cursor_page(lambda cursor, limit: self.user.search_page(
+                keyword, cursor, limit, max_scan=50_000), query)
+        if query.get("stream", ["0"])[0] not in ("0", "", "false"):
+            return Streamed(song_dict(s) for s in self.user.iter_search(keyword))
+        # halaman dari id hasil yang di-cache: membuka halaman berikutnya tidak scan ulang
+        ids = self.player.search_ids(keyword)
+        offset = max(0, self._int(query, "offset", 0))
+        limit = self._limit(query)
+        page = self.player.songs_by_ids(ids[offset:offset + limit])
+        return {"items": [song_dict(s) for s in page], "offset": offset, "limit": limit, "total": len(ids),
+                "next_offset": offset + limit if offset + limit < len(ids) else None}
+
+    def list_playlists(self, query, body):
+        return [{"name": name, "songs": len(self.player.get_playlist(name))}
+                for name in self.user.get_playlists()]
+
+    def create_playlist(self, query, body):
+        name = (body or {}).get("name")
+        if not self.user.create_playlist(name):
+            raise ApiError(400, "name is required")
+        return 201, {"ok": True, "name": name.strip()}
+
+    def combine_playlists(self, query, body):
+        body = body or {}
+        names = body.get("playlists")
+        if not isinstance(names, list):
+            raise ApiError(400, "playlists must be a list of names")
+        ok, msg = self.user.combine_playlists(body.get("op"), names, body.get("name"),
+                                              body.get("order") or "playlist")
+        if not ok:
+            raise ApiError(400, msg)
+        return 201, {"ok": True, "message": msg, "name": body["name"].strip()}
+
+    def playlist_songs(self, query, body, name):
+        return self._listing(self._playlist(name), query)
+
+    def add_to_playlist(self, query, body, name):
+        body = body or {}
+        song = self._song(body.get("id", 0))
+        self._playlist(name)
+        position = body.get("position")
+        if position is not None and not isinstance(position, int):
+            raise ApiError(400, "invalid position")
+        return {"ok": bool(self.user.add_to_playlist(song.id, name, position))}
+
+    def move_in_playlist(self, query, body, name):
+        body = body or {}
+        src, dst = body.get("from"), body.get("to")
+        if not isinstance(src, int) or not isinstance(dst, int):
+            raise ApiError(400, "from and to are required")
+        self._playlist(name)
+        if not self.user.move_in_playlist(name, src, dst):
+            raise ApiError(400, "position out of range")
+        return {"ok": True}
+
+    def remove_from_playlist(self, query, body, name, song_id):
+        self._playlist(name)
+        return {"ok": bool(self.user.remove_from_playlist(int(song_id), name))}
+
+    def get_queue(self, query, body):
+        return [song_dict(s) for s in self.user.get_queue()]
+
+    def enqueue(self, query, body):
+        body = body or {}
+        if isinstance(body.get("filter"), dict):
+            limit = body.get("limit")
+            if limit is not None and not isinstance(limit, int):
+                raise ApiError(400, "invalid limit")
+            try:
+                added = self.user.queue_filtered(limit, **body["filter"])
+            except (TypeError, ValueError) as e:
+                raise ApiError(400, str(e))
+            return {"ok": True, "added": added, "length": len(self.user.get_queue())}
+        song = self._song(body.get("id", 0))
+        self.user.add_to_queue(song.id)
+        return {"ok": True, "length": len(self.user.get_queue())}
+
+    def get_favorites(self, query, body):
+        if "cursor" in query:
+            return self._cursor_page(self.user.get_favorites_page, query)
+        return self._listing(self.user.get_favorites(), query)
+
+    def history(self, query, body):
+        try:
+            plays, next_cursor = self.user.get_history_page(query.get("cursor", [None])[0], self._limit(query))
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return {"items": [{"song": song_dict(song), "start_ts": ts, "ms_played": ms, "mode": mode}
+                          for song, ts, ms, mode in plays],
+                "next_cursor": next_cursor}
+
+    def toggle_favorite(self, query, body, song_id):
+        self._song(song_id)
+        return {"favorite": bool(self.user.toggle_favorite(int(song_id)))}
+
+    def status(self, query, body):
+        p = self.player
+        return {"song": song_dict(p.current_song), "playing": p.is_playing, "mode": p.current_mode,
+                "repeat": p.repeat_mode, "shuffle": p.shuffle_enabled}
+
+    def control(self, query, body, action):
+        # tanpa lock dari dispatch: lagu dipilih di bawah write lock (random_song mengubah
+        # state shuffle), perintah transport dijalankan setelah lock dilepas
+        if action == "play":
+            body = body or {}
+            with self.player.lock.write:
+                song = self._song(body.get("id", 0)) if body.get("id") is not None else None
+                if song is None:
+                    song = self.player.current_song or self.player.random_song()
+            if song is None:
+                raise ApiError(404, "library is empty")
+            self.transport.play(song, body.get("mode"))
+        else:
+            getattr(self.transport, action)()
+        with self.player.lock.read:
+            return self.status(query, None)
+
+    #  HTTP
+    def dispatch(self, method, target, body):
+        parts = urlsplit(target)
+        path = parts.path.rstrip("/") or "/"
+        query = parse_qs(parts.query, keep_blank_values=True)
+        allowed = False
+        for route_method, pattern, fn in self.routes:
+            m = pattern.match(path)
+            if not m:
+                continue
+            allowed = True
+            if route_method == method:
+                if fn in self.unlocked:
+                    return fn(query, body, *(unquote(g) for g in m.groups()))
+                lock = self.player.lock.read if method == "GET" else self.player.lock.write
+                with lock:
+                    return fn(query, body, *(unquote(g) for g in m.groups()))
+        raise ApiError(405 if allowed else 404, f"{method} {path} not supported")
+
+    async def _read_request(self, reader):
+        line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise ApiError(400, "malformed request line")
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = h.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, "body too large")
+        body = None
+        if length:
+            raw = await reader.readexactly(length)
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                raise ApiError(400, "body must be JSON")
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method.upper(), target, body, keep_alive
+
+    @staticmethod
+    def _head(status, content_type, extra, keep_alive):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 f"Content-Type: {content_type}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"] + extra
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode()
+        writer.write(self._head(status, "application/json", [f"Content-Length: {len(data)}"], keep_alive) + data)
+        await writer.drain()
+
+    def _next_chunk(self, items):
+        with self.player.lock.read:
+            return list(itertools.islice(items, STREAM_CHUNK))
+
+    async def _send_stream(self, writer, items, keep_alive):
+        writer.write(self._head(200, "application/x-ndjson", ["Transfer-Encoding: chunked"], keep_alive))
+        while True:
+            # batch diambil di thread pool supaya iterasi list besar tidak menahan event loop
+            batch = await self.loop.run_in_executor(self.executor, self._next_chunk, items)
+            if not batch:
+                break
+            data = "".join(json.dumps(item) + "\n" for item in batch).encode()
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()  # backpressure: tunggu klien lambat
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, body, keep_alive = request
+                    result = await self.loop.run_in_executor(self.executor, self.dispatch, method, target, body)
+                    status = 200
+                    if isinstance(result, tuple):
+                        status, result = result
+                    if isinstance(result, Streamed):
+                        await self._send_stream(writer, iter(result.items), keep_alive)
+                    else:
+                        await self._send_json(writer, status, result, keep_alive)
+                except ApiError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError,
+                        asyncio.CancelledError):
+                    # CancelledError: server dihentikan saat koneksi keep-alive masih terbuka
+                    break
+                except Exception as e:
+                    print("API request failed:", e)
+                    await self._send_json(writer, 500, {"error": str(e)}, False)
+                    break
+                if not keep_alive:
+                    break
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    #  lifecycle
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # port=0 -> port acak
+        self.player.start_fuzzy_index()  # index fuzzy dibangun di latar, tanpa menahan lock
+        return self._server
+
+    async def serve_forever(self):
+        server = await self.start()
+        self._ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self):
+        """Jalankan server di thread daemon (di samping GUI). Return port yang dipakai."""
+        def run():
+            try:
+                asyncio.run(self.serve_forever())
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                print("Failed to run API server:", e)
+            finally:
+                self._ready.set()
+        self._thread = threading.Thread(target=run, name="groovy-api", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        return self.port
+
+    def stop(self):
+        if self.loop is not None and self._server is not None:
+            self.loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Groovy Player HTTP/JSON API (headless).")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    player = MusicPlayer(args.data_dir)
+    player.enable_write_behind()
+    server = ApiServer(player, host=args.host, port=args.port)
+
+    async def serve():
+        await server.start()
+        print(f"Groovy API listening on http://{server.host}:{server.port}", file=sys.stderr)
+        async with server._server:
+            await server._server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        player.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())